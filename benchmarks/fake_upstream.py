@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass(frozen=True)
+class FakeUpstreamSettings:
+    latency_ms: float = 0.0
+    tokens_per_second: float | None = None
+    completion_tokens: int = 16
+    error_rate: float = 0.0
+    tool_calls: bool = False
+    seed: int | None = None
+
+
+@dataclass
+class FakeUpstreamStats:
+    calls: int = 0
+    errors: int = 0
+    busy_ms: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, *, busy_ms: float, error: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.busy_ms += busy_ms
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {"calls": self.calls, "errors": self.errors, "busy_ms": round(self.busy_ms, 3)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+            self.busy_ms = 0.0
+
+
+def _completion_message(payload: dict[str, Any], settings: FakeUpstreamSettings) -> dict[str, Any]:
+    if payload.get("response_format") is not None:
+        return {"role": "assistant", "content": '{"decision":"lgtm"}'}
+    tools = payload.get("tools")
+    if settings.tool_calls and isinstance(tools, list) and tools:
+        name = tools[0].get("function", {}).get("name", "tool")
+        return {
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [
+                {"id": "call_fake", "type": "function", "function": {"name": name, "arguments": "{}"}},
+            ],
+        }
+    return {"role": "assistant", "content": " ".join(["ok"] * settings.completion_tokens)}
+
+
+def _usage(settings: FakeUpstreamSettings) -> dict[str, int]:
+    return {
+        "prompt_tokens": 8,
+        "completion_tokens": settings.completion_tokens,
+        "total_tokens": 8 + settings.completion_tokens,
+    }
+
+
+def create_fake_upstream(
+    settings: FakeUpstreamSettings | None = None,
+    stats: FakeUpstreamStats | None = None,
+) -> FastAPI:
+    resolved = settings if settings is not None else FakeUpstreamSettings(completion_tokens=1)
+    recorder = stats if stats is not None else FakeUpstreamStats()
+    rng = random.Random(resolved.seed)
+    token_delay = 1.0 / resolved.tokens_per_second if resolved.tokens_per_second else 0.0
+    app = FastAPI()
+
+    @app.get("/v1/models")
+    async def models() -> dict[str, Any]:
+        return {"object": "list", "data": [{"id": "fake-model"}]}
+
+    @app.post("/v1/chat/completions", response_model=None)
+    async def chat(payload: dict[str, Any]) -> dict[str, Any] | JSONResponse | StreamingResponse:
+        started = time.perf_counter()
+        if resolved.latency_ms > 0:
+            await asyncio.sleep(resolved.latency_ms / 1000)
+        if rng.random() < resolved.error_rate:
+            recorder.record(busy_ms=(time.perf_counter() - started) * 1000, error=True)
+            return JSONResponse(status_code=503, content={"error": {"message": "fake upstream overloaded"}})
+
+        message = _completion_message(payload, resolved)
+        finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+        if payload.get("stream") is True:
+
+            async def events() -> AsyncIterator[bytes]:
+                for index, token in enumerate(message["content"].split(" ") if message["content"] else []):
+                    if token_delay:
+                        await asyncio.sleep(token_delay)
+                    delta = {"content": token if index == 0 else f" {token}"}
+                    yield _sse({"choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                if message.get("tool_calls"):
+                    tool_calls = [{"index": 0, **message["tool_calls"][0]}]
+                    yield _sse({"choices": [{"index": 0, "delta": {"tool_calls": tool_calls}, "finish_reason": None}]})
+                yield _sse({"choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]})
+                yield _sse({"choices": [], "usage": _usage(resolved)})
+                yield b"data: [DONE]\n\n"
+                recorder.record(busy_ms=(time.perf_counter() - started) * 1000, error=False)
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        if token_delay:
+            await asyncio.sleep(token_delay * resolved.completion_tokens)
+        recorder.record(busy_ms=(time.perf_counter() - started) * 1000, error=False)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": 0,
+            "model": payload.get("model", "fake-model"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": _usage(resolved),
+        }
+
+    return app
+
+
+def _sse(chunk: dict[str, Any]) -> bytes:
+    return f"data: {json.dumps(chunk)}\n\n".encode()
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+@contextmanager
+def serve_in_thread(app: FastAPI, *, host: str = "127.0.0.1", port: int | None = None) -> Iterator[str]:
+    bound_port = port if port is not None else free_port(host)
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=bound_port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10.0
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"server on {host}:{bound_port} did not start")
+        time.sleep(0.01)
+    try:
+        yield f"http://{host}:{bound_port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10.0)
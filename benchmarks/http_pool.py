@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from loguru import logger
+
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.http_gateway import OpenAICompatibleHttpGateway
+
+from .fake_upstream import create_fake_upstream, serve_in_thread
+from .stats import latency_summary
+
+MESSAGES = [ChatMessage(role="user", content="hello")]
+
+
+async def _per_call_client(base_url: str, iterations: int) -> list[float]:
+    durations: list[float] = []
+    payload = {"model": "fake-model", "messages": [message.model_dump() for message in MESSAGES]}
+    for _ in range(iterations):
+        started = time.perf_counter()
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.post(f"{base_url}/chat/completions", json=payload)
+            response.raise_for_status()
+            response.json()
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+async def _pooled_gateway(base_url: str, iterations: int) -> list[float]:
+    gateway = OpenAICompatibleHttpGateway(api_key="dummy", timeout_seconds=30.0)
+    gateway.open_pools([base_url])
+    durations: list[float] = []
+    try:
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await gateway.complete(model="fake-model", base_url=base_url, messages=MESSAGES)
+            durations.append((time.perf_counter() - started) * 1000)
+    finally:
+        await gateway.aclose()
+    return durations
+
+
+async def _run(base_url: str, iterations: int, warmup: int) -> dict[str, dict[str, float]]:
+    await _per_call_client(base_url, warmup)
+    await _pooled_gateway(base_url, warmup)
+    return {
+        "per_call_client": latency_summary(await _per_call_client(base_url, iterations)),
+        "pooled_gateway": latency_summary(await _pooled_gateway(base_url, iterations)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-call httpx clients with the pooled gateway")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+    logger.remove()
+
+    with serve_in_thread(create_fake_upstream()) as upstream_url:
+        results = asyncio.run(_run(f"{upstream_url}/v1", args.iterations, args.warmup))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
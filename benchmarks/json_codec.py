@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from adapter_critic.json_codec import HAS_ORJSON, dumps, loads
+
+from .stats import latency_summary
+
+
+def _conversation(turns: int, argument_bytes: int) -> dict[str, Any]:
+    messages: list[dict[str, Any]] = [{"role": "system", "content": "You are a careful assistant. " * 20}]
+    for turn in range(turns):
+        messages.append({"role": "user", "content": f"step {turn}: " + "please inspect the workspace " * 8})
+        messages.append(
+            {
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [
+                    {
+                        "id": f"call_{turn}",
+                        "type": "function",
+                        "function": {"name": "read_file", "arguments": json.dumps({"path": "x" * argument_bytes})},
+                    }
+                ],
+            }
+        )
+        messages.append({"role": "tool", "tool_call_id": f"call_{turn}", "content": "file body " * 64})
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": f"tool_{index}",
+                "description": "Reads or writes workspace state. " * 4,
+                "parameters": {"type": "object", "properties": {"path": {"type": "string"}}},
+            },
+        }
+        for index in range(24)
+    ]
+    return {"model": "fake-model", "messages": messages, "tools": tools, "temperature": 0}
+
+
+def _response(payload: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "choices": [{"index": 0, "message": payload["messages"][-2], "finish_reason": "tool_calls"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        "adapter_critic": {"intermediate": {"api_draft": "x" * 4096}},
+    }
+
+
+def _stdlib_request(payload: dict[str, Any]) -> bytes:
+    json.dumps(payload["messages"], default=str, separators=(",", ":"))
+    json.dumps({key: value for key, value in payload.items() if key != "messages"}, default=str, separators=(",", ":"))
+    return json.dumps(payload).encode()
+
+
+def _stdlib_encode(value: Any) -> bytes:
+    return json.dumps(value).encode()
+
+
+def _time(operation: Callable[[Any], Any], value: Any, iterations: int) -> dict[str, float]:
+    durations: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        operation(value)
+        durations.append((time.perf_counter() - started) * 1000)
+    return latency_summary(durations)
+
+
+def run_benchmark(*, turns: list[int], argument_bytes: int, iterations: int) -> dict[str, Any]:
+    results: dict[str, Any] = {"meta": {"orjson": HAS_ORJSON, "iterations": iterations}, "sizes": {}}
+    for turn_count in turns:
+        payload = _conversation(turn_count, argument_bytes)
+        response = _response(payload)
+        encoded_request = dumps(payload)
+        results["sizes"][str(turn_count)] = {
+            "request_bytes": len(encoded_request),
+            "encode_request": {
+                "stdlib_with_char_len_metric": _time(_stdlib_request, payload, iterations),
+                "codec": _time(dumps, payload, iterations),
+            },
+            "decode_request": {
+                "stdlib": _time(json.loads, encoded_request, iterations),
+                "codec": _time(loads, encoded_request, iterations),
+            },
+            "encode_response": {
+                "stdlib": _time(_stdlib_encode, response, iterations),
+                "codec": _time(dumps, response, iterations),
+            },
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare stdlib json with the adapter_critic JSON codec")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 400], help="Tool-call turns per conversation")
+    parser.add_argument("--argument-bytes", type=int, default=512, help="Size of each tool call's arguments")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    results = run_benchmark(turns=args.turns, argument_bytes=args.argument_bytes, iterations=args.iterations)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from adapter_critic.app import create_app
+from adapter_critic.config import AppConfig
+from adapter_critic.http_gateway import OpenAICompatibleHttpGateway
+
+from .fake_upstream import FakeUpstreamSettings, FakeUpstreamStats, create_fake_upstream, serve_in_thread
+from .stats import latency_summary
+
+MODES = ("direct", "adapter", "critic", "advisor")
+TOOLS = [{"type": "function", "function": {"name": "lookup", "parameters": {"type": "object", "properties": {}}}}]
+
+
+def _proxy_config(upstream_base_url: str) -> AppConfig:
+    target = {"model": "fake-model", "base_url": upstream_base_url}
+    return AppConfig.model_validate(
+        {
+            "served_models": {
+                f"bench-{mode}": {
+                    "mode": mode,
+                    "api": target,
+                    "adapter": target,
+                    "critic": target,
+                    "advisor": target,
+                }
+                for mode in MODES
+            }
+        }
+    )
+
+
+def _git_commit() -> str | None:
+    try:
+        completed = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def _process_max_rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+async def _drive(
+    proxy_url: str,
+    *,
+    served_model: str,
+    requests: int,
+    concurrency: int,
+    stream: bool,
+    tools: bool,
+) -> tuple[list[float], int, float]:
+    payload: dict[str, Any] = {
+        "model": served_model,
+        "messages": [{"role": "user", "content": "hello"}],
+        "temperature": 0,
+    }
+    if stream:
+        payload["stream"] = True
+    if tools:
+        payload["tools"] = TOOLS
+
+    durations: list[float] = []
+    errors = 0
+    remaining = requests
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=proxy_url, timeout=120.0, limits=limits) as client:
+
+        async def worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/v1/chat/completions", json=payload)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if response.status_code != 200 or b'"error"' in response.content[-256:]:
+                    errors += 1
+                    continue
+                durations.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return durations, errors, elapsed
+
+
+def _mode_report(
+    durations: list[float],
+    *,
+    errors: int,
+    elapsed: float,
+    upstream: dict[str, float],
+) -> dict[str, Any]:
+    latency = latency_summary(durations)
+    upstream_ms = upstream["busy_ms"] / len(durations) if durations else 0.0
+    return {
+        "requests": len(durations) + errors,
+        "errors": errors,
+        "rps": round(len(durations) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency": latency,
+        "upstream_calls": upstream["calls"],
+        "upstream_ms_per_request": round(upstream_ms, 3),
+        # Mean client latency minus the upstream time each request spent, summed over its upstream calls.
+        # Calls that overlap within a request (a streaming advisor beside the API draft, hedges) are counted
+        # twice, so this can go negative.
+        "proxy_overhead_ms": round(latency["mean_ms"] - upstream_ms, 3),
+        "process_max_rss_mb": _process_max_rss_mb(),
+    }
+
+
+def _compare(current: dict[str, Any], baseline: dict[str, Any]) -> dict[str, dict[str, float]]:
+    comparison: dict[str, dict[str, float]] = {}
+    for mode, report in current["modes"].items():
+        previous = baseline.get("modes", {}).get(mode)
+        if previous is None:
+            continue
+        comparison[mode] = {
+            "rps_ratio": round(report["rps"] / previous["rps"], 3) if previous["rps"] else 0.0,
+            "p50_delta_ms": round(report["latency"]["p50_ms"] - previous["latency"]["p50_ms"], 3),
+            "p95_delta_ms": round(report["latency"]["p95_ms"] - previous["latency"]["p95_ms"], 3),
+            "overhead_delta_ms": round(report["proxy_overhead_ms"] - previous["proxy_overhead_ms"], 3),
+        }
+    return comparison
+
+
+def run_load_test(
+    *,
+    modes: list[str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    stream: bool,
+    settings: FakeUpstreamSettings,
+) -> dict[str, Any]:
+    upstream_stats = FakeUpstreamStats()
+    results: dict[str, Any] = {
+        "meta": {
+            "git_commit": _git_commit(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "requests": requests,
+            "concurrency": concurrency,
+            "stream": stream,
+            "upstream": {
+                "latency_ms": settings.latency_ms,
+                "tokens_per_second": settings.tokens_per_second,
+                "completion_tokens": settings.completion_tokens,
+                "error_rate": settings.error_rate,
+                "tool_calls": settings.tool_calls,
+            },
+        },
+        "modes": {},
+    }
+    with serve_in_thread(create_fake_upstream(settings, upstream_stats)) as upstream_url:
+        upstream_base_url = f"{upstream_url}/v1"
+        config = _proxy_config(upstream_base_url)
+        gateway = OpenAICompatibleHttpGateway(
+            api_key="dummy",
+            timeout_seconds=120.0,
+            max_connections=max(concurrency * 2, 100),
+            max_keepalive_connections=max(concurrency * 2, 20),
+        )
+        gateway.open_pools([upstream_base_url])
+        with serve_in_thread(create_app(config=config, gateway=gateway)) as proxy_url:
+            for mode in modes:
+                drive_options: dict[str, Any] = {
+                    "served_model": f"bench-{mode}",
+                    "concurrency": concurrency,
+                    "stream": stream,
+                    "tools": settings.tool_calls,
+                }
+                if warmup > 0:
+                    asyncio.run(_drive(proxy_url, requests=warmup, **drive_options))
+                upstream_stats.reset()
+                durations, errors, elapsed = asyncio.run(_drive(proxy_url, requests=requests, **drive_options))
+                results["modes"][mode] = _mode_report(
+                    durations,
+                    errors=errors,
+                    elapsed=elapsed,
+                    upstream=upstream_stats.snapshot(),
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the proxy against a local fake OpenAI upstream")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per mode")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per mode")
+    parser.add_argument("--stream", action="store_true", help="Send stream=true requests")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake upstream time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="Fake upstream completion token rate")
+    parser.add_argument("--completion-tokens", type=int, default=16)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream calls that return 503")
+    parser.add_argument("--tool-calls", action="store_true", help="Send tools and answer with a tool call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Write results JSON to this path")
+    parser.add_argument("--baseline", type=Path, default=None, help="Previous results JSON to compare against")
+    args = parser.parse_args()
+    logger.remove()
+
+    results = run_load_test(
+        modes=args.modes,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        stream=args.stream,
+        settings=FakeUpstreamSettings(
+            latency_ms=args.latency_ms,
+            tokens_per_second=args.tokens_per_second,
+            completion_tokens=args.completion_tokens,
+            error_rate=args.error_rate,
+            tool_calls=args.tool_calls,
+            seed=args.seed,
+        ),
+    )
+    if args.baseline is not None:
+        results["comparison"] = _compare(results, json.loads(args.baseline.read_text()))
+
+    rendered = json.dumps(results, indent=2)
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(rendered + "\n")
+    print(rendered)
+
+
+if __name__ == "__main__":
+    main()
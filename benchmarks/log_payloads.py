@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.http_gateway import OpenAICompatibleHttpGateway
+
+BASE_URL = "http://bench.local/v1"
+
+
+def _conversation(message_count: int) -> list[ChatMessage]:
+    messages = [ChatMessage(role="system", content="You are a careful assistant. " * 20)]
+    for index in range(message_count - 1):
+        if index % 2 == 0:
+            messages.append(ChatMessage(role="user", content=f"step {index}: " + "inspect the workspace " * 12))
+        else:
+            messages.append(
+                ChatMessage.model_validate(
+                    {
+                        "role": "assistant",
+                        "content": "",
+                        "tool_calls": [
+                            {
+                                "id": f"call_{index}",
+                                "type": "function",
+                                "function": {"name": "read_file", "arguments": json.dumps({"path": "x" * 256})},
+                            }
+                        ],
+                    }
+                )
+            )
+    return messages
+
+
+def _upstream_response(request: httpx.Request) -> httpx.Response:
+    del request
+    return httpx.Response(
+        200,
+        json={
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "fake-model",
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": "ok " * 200}, "finish_reason": "stop"}
+            ],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        },
+    )
+
+
+class _MockedGateway(OpenAICompatibleHttpGateway):
+    def _client_for(self, base_url: str) -> httpx.AsyncClient:
+        client = self._clients.get(base_url)
+        if client is None:
+            client = httpx.AsyncClient(transport=httpx.MockTransport(_upstream_response))
+            self._clients[base_url] = client
+        return client
+
+
+async def _cpu_per_call_us(messages: list[ChatMessage], iterations: int) -> float:
+    gateway = _MockedGateway(api_key="dummy")
+    try:
+        for _ in range(10):
+            await gateway.complete(model="fake-model", base_url=BASE_URL, messages=messages)
+        started = time.process_time()
+        for _ in range(iterations):
+            await gateway.complete(model="fake-model", base_url=BASE_URL, messages=messages)
+        return (time.process_time() - started) / iterations * 1_000_000
+    finally:
+        await gateway.aclose()
+
+
+def _measure(level: str, messages: list[ChatMessage], iterations: int) -> float:
+    def discard(message: Any) -> None:
+        del message
+
+    logger.remove()
+    sink_id = logger.add(discard, level=level)
+    try:
+        return asyncio.run(_cpu_per_call_us(messages, iterations))
+    finally:
+        logger.remove(sink_id)
+
+
+def run_benchmark(*, message_count: int, iterations: int) -> dict[str, Any]:
+    messages = _conversation(message_count)
+    info_us = _measure("INFO", messages, iterations)
+    debug_us = _measure("DEBUG", messages, iterations)
+    return {
+        "message_count": message_count,
+        "iterations": iterations,
+        "cpu_us_per_call": {"info": round(info_us, 1), "debug": round(debug_us, 1)},
+        "cpu_us_saved_at_info": round(debug_us - info_us, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-call CPU spent building gateway debug log payloads")
+    parser.add_argument("--messages", type=int, default=100, help="Messages per conversation")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(message_count=args.messages, iterations=args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from typing import Any
+
+from adapter_critic.contracts import ChatMessage, PromptLayout
+from adapter_critic.prompts import build_adapter_messages, build_critic_messages
+
+LAYOUTS: tuple[PromptLayout, ...] = ("standard", "prefix_cache")
+SYSTEM_PROMPT = "You are a coding agent. Use the tools to inspect and edit the workspace. " * 8
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": f"{name} in the workspace. " * 6,
+            "parameters": {"type": "object", "properties": {"path": {"type": "string"}}, "required": ["path"]},
+        },
+    }
+    for name in ("read_file", "write_file", "list_directory", "run_tests", "search")
+]
+
+
+class PrefixCacheStandIn:
+    def __init__(self, block_chars: int) -> None:
+        self._block_chars = block_chars
+        self._blocks: set[bytes] = set()
+
+    def admit(self, prompt: str) -> int:
+        encoded = prompt.encode()
+        digest = b""
+        reused = 0
+        matching = True
+        for end in range(self._block_chars, len(encoded) + 1, self._block_chars):
+            digest = hashlib.sha1(digest + encoded[end - self._block_chars : end]).digest()
+            if matching and digest in self._blocks:
+                reused = end
+            else:
+                matching = False
+                self._blocks.add(digest)
+        return reused
+
+
+def _chat_template(messages: list[ChatMessage]) -> str:
+    return "".join(f"<|im_start|>{message.role}\n{message.content or ''}<|im_end|>\n" for message in messages)
+
+
+def _conversation(turn: int) -> list[ChatMessage]:
+    messages = [
+        ChatMessage(role="system", content=SYSTEM_PROMPT),
+        ChatMessage(role="user", content="Fix the failing test in the parser package."),
+    ]
+    for step in range(turn):
+        arguments = json.dumps({"path": f"src/parser/module_{step}.py"})
+        messages.append(
+            ChatMessage.model_validate(
+                {
+                    "role": "assistant",
+                    "content": f"Reading module {step}.",
+                    "tool_calls": [
+                        {
+                            "id": f"call_{step}",
+                            "type": "function",
+                            "function": {"name": "read_file", "arguments": arguments},
+                        }
+                    ],
+                }
+            )
+        )
+        messages.append(
+            ChatMessage.model_validate(
+                {"role": "tool", "tool_call_id": f"call_{step}", "content": f"def parse_{step}(value):\n    ...\n" * 12}
+            )
+        )
+    return messages
+
+
+def _request_options(turn: int, vary_tool_choice: bool) -> dict[str, Any]:
+    tool_choice: Any = "auto"
+    if vary_tool_choice and turn % 2 == 0:
+        tool_choice = "required"
+    return {"tools": TOOLS, "tool_choice": tool_choice}
+
+
+def _prompts(layout: PromptLayout, turn: int, vary_tool_choice: bool) -> list[str]:
+    messages = _conversation(turn)
+    request_options = _request_options(turn, vary_tool_choice)
+    draft = json.dumps({"content": f"Reading module {turn}.", "tool_calls": [{"name": "read_file"}]})
+    adapter = build_adapter_messages(messages=messages, draft=draft, request_options=request_options, layout=layout)
+    critic = build_critic_messages(
+        messages=messages,
+        system_prompt=SYSTEM_PROMPT,
+        draft=draft,
+        request_options=request_options,
+        layout=layout,
+    )
+    return [_chat_template(adapter), _chat_template(critic)]
+
+
+def run_benchmark(*, turns: int, block_chars: int, vary_tool_choice: bool) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for layout in LAYOUTS:
+        cache = PrefixCacheStandIn(block_chars)
+        prompt_chars = 0
+        reused_chars = 0
+        for turn in range(turns):
+            for prompt in _prompts(layout, turn, vary_tool_choice):
+                prompt_chars += len(prompt.encode())
+                reused_chars += cache.admit(prompt)
+        results[layout] = {
+            "prompt_chars": prompt_chars,
+            "reused_chars": reused_chars,
+            "prefix_reuse_ratio": round(reused_chars / prompt_chars, 4) if prompt_chars else 0.0,
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prefix-cache reuse of adapter/critic prompts across agent turns")
+    parser.add_argument("--turns", type=int, default=20, help="Agent turns per conversation")
+    parser.add_argument("--block-chars", type=int, default=64, help="Cache block size of the stand-in, in bytes")
+    args = parser.parse_args()
+    report = {
+        "meta": {"turns": args.turns, "block_chars": args.block_chars},
+        "fixed_tool_choice": run_benchmark(turns=args.turns, block_chars=args.block_chars, vary_tool_choice=False),
+        "varying_tool_choice": run_benchmark(turns=args.turns, block_chars=args.block_chars, vary_tool_choice=True),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any
+
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.json_codec import HAS_ORJSON
+from adapter_critic.prompts import RENDER_MEMO, RenderMemoStats, build_adapter_messages, build_critic_messages
+
+from .stats import latency_summary
+
+SYSTEM_PROMPT = "You are a coding agent. Use the tools to inspect and edit the workspace. " * 8
+
+
+def _tools(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": f"tool_{index}",
+                "description": "Reads or writes workspace state. " * 8,
+                "parameters": {
+                    "type": "object",
+                    "properties": {"path": {"type": "string"}, "content": {"type": "string"}},
+                    "required": ["path"],
+                },
+            },
+        }
+        for index in range(count)
+    ]
+
+
+def _conversation(turns: int) -> list[dict[str, Any]]:
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": "Fix the failing test in the parser package."},
+    ]
+    for turn in range(turns):
+        messages.append(
+            {
+                "role": "assistant",
+                "content": f"Reading module {turn}.",
+                "tool_calls": [
+                    {
+                        "id": f"call_{turn}",
+                        "type": "function",
+                        "function": {"name": "tool_0", "arguments": json.dumps({"path": f"src/module_{turn}.py"})},
+                    }
+                ],
+            }
+        )
+        messages.append(
+            {"role": "tool", "tool_call_id": f"call_{turn}", "content": "def parse(value):\n    ...\n" * 16}
+        )
+    return messages
+
+
+def _render(messages: list[ChatMessage], request_options: dict[str, Any]) -> None:
+    build_adapter_messages(messages=messages, draft="draft", request_options=request_options)
+    build_critic_messages(
+        messages=messages, system_prompt=SYSTEM_PROMPT, draft="draft", request_options=request_options
+    )
+
+
+def _agent_loop_ms(turns: int, tool_count: int, *, memoized: bool) -> list[float]:
+    conversation = _conversation(turns)
+    tools = _tools(tool_count)
+    durations: list[float] = []
+    RENDER_MEMO.clear()
+    RENDER_MEMO.stats = RenderMemoStats()
+    for turn in range(1, turns + 1):
+        payload = json.loads(json.dumps({"messages": conversation[: 2 + turn * 2], "tools": tools}))
+        messages = [ChatMessage.model_validate(message) for message in payload["messages"]]
+        request_options = {"tools": payload["tools"], "tool_choice": "auto"}
+        if not memoized:
+            RENDER_MEMO.clear()
+        started = time.perf_counter()
+        _render(messages, request_options)
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def run_benchmark(*, turns: int, tool_count: int) -> dict[str, Any]:
+    cold = _agent_loop_ms(turns, tool_count, memoized=False)
+    warm = _agent_loop_ms(turns, tool_count, memoized=True)
+    return {
+        "meta": {"turns": turns, "tools": tool_count, "orjson": HAS_ORJSON},
+        "per_turn_ms": {"unmemoized": latency_summary(cold), "memoized": latency_summary(warm)},
+        "total_ms": {"unmemoized": round(sum(cold), 3), "memoized": round(sum(warm), 3)},
+        "memo": {"entries": len(RENDER_MEMO), "hits": RENDER_MEMO.stats.hits, "misses": RENDER_MEMO.stats.misses},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Adapter/critic prompt rendering cost across an agent loop")
+    parser.add_argument("--turns", type=int, default=200, help="Agent turns; every turn renders both prompts")
+    parser.add_argument("--tools", type=int, default=24, help="Tool definitions sent with every request")
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(turns=args.turns, tool_count=args.tools), indent=2))
+
+
+if __name__ == "__main__":
+    main()
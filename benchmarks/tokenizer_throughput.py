@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any
+
+from adapter_critic.config import TokenizerConfig
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.token_counter import HAS_TIKTOKEN, Tokenizer
+
+from .stats import latency_summary
+
+CODE_RESULT = "def parse(value: str) -> dict[str, int]:\n    return {key: int(raw) for key, raw in split(value)}\n" * 24
+PROSE = "The parser rejects empty keys; check the tokenizer before the validator runs. " * 6
+NON_ENGLISH = "解析器拒绝空键。 Проверьте токенизатор перед валидатором. パーサーは空のキーを拒否します。" * 4
+
+
+def _conversation(turns: int) -> list[ChatMessage]:
+    messages = [ChatMessage(role="system", content=PROSE)]
+    for turn in range(turns):
+        messages.append(ChatMessage(role="user", content=f"Step {turn}: {NON_ENGLISH if turn % 3 == 0 else PROSE}"))
+        call = {
+            "id": f"call_{turn}",
+            "type": "function",
+            "function": {"name": "read_file", "arguments": json.dumps({"path": f"src/module_{turn}.py"})},
+        }
+        messages.append(ChatMessage.model_validate({"role": "assistant", "content": "", "tool_calls": [call]}))
+        result = {"role": "tool", "tool_call_id": f"call_{turn}", "content": CODE_RESULT}
+        messages.append(ChatMessage.model_validate(result))
+    return messages
+
+
+def _agent_loop(tokenizer: Tokenizer, conversation: list[ChatMessage], turns: int) -> dict[str, Any]:
+    durations: list[float] = []
+    messages_counted = 0
+    tokens = 0
+    for turn in range(1, turns + 1):
+        history = conversation[: 1 + turn * 3]
+        started = time.perf_counter()
+        tokens = tokenizer.count_messages(history)
+        durations.append((time.perf_counter() - started) * 1000)
+        messages_counted += len(history)
+    seconds = sum(durations) / 1000
+    return {
+        "per_turn_ms": latency_summary(durations),
+        "messages_per_second": round(messages_counted / seconds) if seconds else 0,
+        "final_history_tokens": tokens,
+        "cache": {"hits": tokenizer.stats.hits, "misses": tokenizer.stats.misses},
+    }
+
+
+def _tokenizers(bpe_file: str | None, cache_entries: int) -> dict[str, Tokenizer]:
+    tokenizers = {
+        "approx_uncached": Tokenizer(cache_entries=0),
+        "approx_cached": Tokenizer(cache_entries=cache_entries),
+    }
+    if bpe_file is not None and HAS_TIKTOKEN:
+        for name, entries in (("bpe_uncached", 0), ("bpe_cached", cache_entries)):
+            tokenizers[name] = Tokenizer.from_config(TokenizerConfig(bpe_file=bpe_file, cache_entries=entries))
+    return tokenizers
+
+
+def run_benchmark(*, turns: int, bpe_file: str | None, cache_entries: int) -> dict[str, Any]:
+    conversation = _conversation(turns)
+    results = {
+        name: _agent_loop(tokenizer, conversation, turns)
+        for name, tokenizer in _tokenizers(bpe_file, cache_entries).items()
+    }
+    return {
+        "meta": {
+            "turns": turns,
+            "messages": len(conversation),
+            "chars": sum(len(message.content or "") for message in conversation),
+            "tiktoken": HAS_TIKTOKEN,
+            "bpe_file": bpe_file,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Token counting throughput over a growing agent conversation")
+    parser.add_argument("--turns", type=int, default=300, help="Agent turns; every turn recounts the full history")
+    parser.add_argument("--bpe-file", default=None, help="Local .tiktoken rank file for the BPE backend")
+    parser.add_argument("--cache-entries", type=int, default=4096, help="Per-message count cache size")
+    args = parser.parse_args()
+    report = run_benchmark(turns=args.turns, bpe_file=args.bpe_file, cache_entries=args.cache_entries)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+import anyio
+from loguru import logger
+
+from .config import AppConfig, ConcurrencyLimitConfig, RuntimeConfig
+from .contracts import ChatMessage
+from .metrics import AppMetrics
+from .upstream import (
+    UpstreamDelta,
+    UpstreamGateway,
+    UpstreamResult,
+    UpstreamUnavailableError,
+    normalize_base_url,
+)
+
+AdmissionKey = tuple[str, str, str]
+RejectionReason = Literal["queue_full", "queue_timeout"]
+ADMISSION_ROLES = ("api", "adapter", "critic", "advisor")
+
+
+class AdmissionRejectedError(UpstreamUnavailableError):
+    def __init__(
+        self,
+        *,
+        role: str,
+        model: str,
+        base_url: str,
+        reason: RejectionReason,
+        retry_after_seconds: int,
+    ) -> None:
+        super().__init__(
+            f"{role} upstream saturated ({reason}) for model={model} base_url={base_url}",
+            model=model,
+            base_url=base_url,
+            retry_after_seconds=retry_after_seconds,
+        )
+        self.role = role
+        self.reason = reason
+        self.status_code = 429 if reason == "queue_full" else 503
+
+
+def runtime_concurrency(runtime: RuntimeConfig) -> dict[str, ConcurrencyLimitConfig]:
+    limits: dict[str, ConcurrencyLimitConfig] = {}
+    for role in ADMISSION_ROLES:
+        target = getattr(runtime, role)
+        if target is not None and target.concurrency is not None:
+            limits[role] = target.concurrency
+    return limits
+
+
+def configured_limits(config: AppConfig) -> dict[AdmissionKey, ConcurrencyLimitConfig]:
+    limits: dict[AdmissionKey, ConcurrencyLimitConfig] = {}
+    for served_model, served in config.served_models.items():
+        for role in ADMISSION_ROLES:
+            target = getattr(served, role)
+            if target is None or target.concurrency is None:
+                continue
+            key = (role, normalize_base_url(target.base_url), target.model)
+            existing = limits.get(key)
+            if existing is None:
+                limits[key] = target.concurrency
+            elif existing != target.concurrency:
+                raise ValueError(
+                    f"conflicting concurrency for {role} model={target.model} base_url={target.base_url} "
+                    f"at {served_model}.{role}"
+                )
+    return limits
+
+
+@dataclass
+class _Limiter:
+    limit: ConcurrencyLimitConfig
+    semaphore: anyio.Semaphore = field(init=False)
+    in_flight: int = 0
+    waiting: int = 0
+
+    def __post_init__(self) -> None:
+        self.semaphore = anyio.Semaphore(self.limit.max_concurrency)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        metrics: AppMetrics | None = None,
+        *,
+        limits: dict[AdmissionKey, ConcurrencyLimitConfig] | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._metrics = metrics
+        self._limits = limits or {}
+        self._clock = clock
+        self._limiters: dict[AdmissionKey, _Limiter] = {}
+
+    @classmethod
+    def from_config(cls, config: AppConfig, metrics: AppMetrics | None = None) -> AdmissionController | None:
+        limits = configured_limits(config)
+        if not limits:
+            return None
+        return cls(metrics, limits=limits)
+
+    def limit_for(
+        self, *, role: str, model: str, base_url: str, default: ConcurrencyLimitConfig | None = None
+    ) -> ConcurrencyLimitConfig | None:
+        return self._limits.get((role, normalize_base_url(base_url), model), default)
+
+    def _limiter(self, key: AdmissionKey, limit: ConcurrencyLimitConfig) -> _Limiter:
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._limiters[key] = _Limiter(limit)
+        return limiter
+
+    def queue_depth(self, *, role: str, model: str, base_url: str) -> int:
+        limiter = self._limiters.get((role, normalize_base_url(base_url), model))
+        return limiter.waiting if limiter is not None else 0
+
+    def in_flight(self, *, role: str, model: str, base_url: str) -> int:
+        limiter = self._limiters.get((role, normalize_base_url(base_url), model))
+        return limiter.in_flight if limiter is not None else 0
+
+    def _labels(self, metrics: AppMetrics, key: AdmissionKey) -> AdmissionKey:
+        role, base_url, model = key
+        return (role, metrics.base_url_label(base_url), model)
+
+    def _publish(self, key: AdmissionKey, limiter: _Limiter) -> None:
+        if self._metrics is not None:
+            labels = self._labels(self._metrics, key)
+            self._metrics.admission_queue_depth.set(limiter.waiting, labels)
+            self._metrics.admission_in_flight.set(limiter.in_flight, labels)
+
+    def _rejection(
+        self, key: AdmissionKey, limit: ConcurrencyLimitConfig, reason: RejectionReason
+    ) -> AdmissionRejectedError:
+        role, base_url, model = key
+        if self._metrics is not None:
+            self._metrics.admission_rejections.inc((*self._labels(self._metrics, key), reason))
+        logger.warning("admission rejected role={} model={} base_url={} reason={}", role, model, base_url, reason)
+        return AdmissionRejectedError(
+            role=role,
+            model=model,
+            base_url=base_url,
+            reason=reason,
+            retry_after_seconds=limit.retry_after_seconds,
+        )
+
+    @asynccontextmanager
+    async def slot(self, *, role: str, model: str, base_url: str, limit: ConcurrencyLimitConfig) -> AsyncIterator[None]:
+        key = (role, normalize_base_url(base_url), model)
+        limiter = self._limiter(key, limit)
+        started = self._clock()
+        if limiter.semaphore.value > 0:
+            limiter.semaphore.acquire_nowait()
+        else:
+            if limiter.waiting >= limit.max_queue:
+                raise self._rejection(key, limit, "queue_full")
+            limiter.waiting += 1
+            self._publish(key, limiter)
+            acquired = False
+            try:
+                with anyio.move_on_after(limit.max_queue_ms / 1000):
+                    await limiter.semaphore.acquire()
+                    acquired = True
+            finally:
+                limiter.waiting -= 1
+                self._publish(key, limiter)
+            if not acquired:
+                raise self._rejection(key, limit, "queue_timeout")
+        if self._metrics is not None:
+            self._metrics.admission_wait.observe(self._clock() - started, self._labels(self._metrics, key))
+        limiter.in_flight += 1
+        self._publish(key, limiter)
+        try:
+            yield
+        finally:
+            limiter.in_flight -= 1
+            limiter.semaphore.release()
+            self._publish(key, limiter)
+
+    def wrap(
+        self, gateway: UpstreamGateway, *, role: str, limit: ConcurrencyLimitConfig | None = None
+    ) -> AdmittedGateway:
+        return AdmittedGateway(gateway, self, role=role, limit=limit)
+
+
+class AdmittedGateway:
+    def __init__(
+        self,
+        gateway: UpstreamGateway,
+        controller: AdmissionController,
+        *,
+        role: str,
+        limit: ConcurrencyLimitConfig | None = None,
+    ) -> None:
+        self._gateway = gateway
+        self._controller = controller
+        self._role = role
+        self._limit = limit
+
+    def _slot(self, model: str, base_url: str) -> AbstractAsyncContextManager[None]:
+        limit = self._controller.limit_for(role=self._role, model=model, base_url=base_url, default=self._limit)
+        if limit is None:
+            return nullcontext()
+        return self._controller.slot(role=self._role, model=model, base_url=base_url, limit=limit)
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        async with self._slot(model, base_url):
+            return await self._gateway.complete(
+                model=model,
+                base_url=base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            )
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        async with self._slot(model, base_url):
+            async for delta in self._gateway.stream(
+                model=model,
+                base_url=base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            ):
+                yield delta
@@ -1,27 +1,45 @@
 from __future__ import annotations
 
-from collections.abc import Awaitable, Callable
-from typing import Any
+import math
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
 
 import httpx
 from fastapi import FastAPI, HTTPException, Request, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from loguru import logger
 from starlette.types import Message
 
-from .config import AppConfig, resolve_runtime_config
-from .contracts import parse_request_payload
-from .dispatcher import dispatch
+from .admission import runtime_concurrency
+from .config import AppConfig, RuntimeConfig, resolve_runtime_config
+from .contracts import ChatCompletionRequest, Mode, ParsedRequest, parse_request_payload
+from .deadlines import Deadline
+from .dispatcher import dispatch, dispatch_stream, replay_output
 from .health import run_healthcheck
 from .http_gateway import UpstreamResponseFormatError
+from .json_codec import FastJSONResponse
 from .logging_setup import is_debug_logging_enabled
-from .response_builder import build_response
+from .metrics import PROMETHEUS_CONTENT_TYPE, MeteredGateway
+from .response_builder import (
+    SSE_DONE,
+    build_final_stream_chunk,
+    build_response,
+    build_stream_chunk,
+    encode_sse_event,
+)
+from .response_cache import CacheStatus, ResponseCache, is_deterministic_request, response_cache_key
 from .runtime import RuntimeState, build_runtime_state
-from .upstream import UpstreamGateway
-from .usage import aggregate_usage
+from .timings import RECEIVED_AT_SCOPE_KEY, ReceivedAtMiddleware, RequestTimings
+from .token_counter import Tokenizer
+from .upstream import UpstreamGateway, UpstreamUnavailableError, close_gateway, start_gateway
+from .usage import TokenBreakdown, aggregate_usage
+from .workflows.direct import WorkflowEvent, WorkflowOutput
 
+BODY_PREVIEW_MAX_CHARS = 2000
 
-def _body_preview(body: bytes, *, max_chars: int | None = 2000) -> str:
+
+def _body_preview(body: bytes, *, max_chars: int | None = BODY_PREVIEW_MAX_CHARS) -> str:
     text = body.decode("utf-8", errors="replace")
     if max_chars is None or max_chars <= 0:
         return text
@@ -30,6 +48,214 @@ def _body_preview(body: bytes, *, max_chars: int | None = 2000) -> str:
     return f"{text[:max_chars]}..."
 
 
+class _BodyPreviewBuffer:
+    def __init__(self, max_chars: int = BODY_PREVIEW_MAX_CHARS) -> None:
+        self._max_chars = max_chars
+        self._limit = max_chars * 4 + 4
+        self._captured = bytearray()
+
+    def feed(self, chunk: bytes) -> None:
+        remaining = self._limit - len(self._captured)
+        if remaining > 0:
+            self._captured += chunk[:remaining]
+
+    def preview(self) -> str:
+        return _body_preview(bytes(self._captured), max_chars=self._max_chars)
+
+
+def _log_outgoing_response(request: Request, status_code: int, body_preview: str) -> None:
+    logger.debug(
+        "outgoing response method={} path={} status_code={} body={}",
+        request.method,
+        request.url.path,
+        status_code,
+        body_preview,
+    )
+
+
+async def _tee_response_body(
+    body_iterator: AsyncIterator[bytes],
+    request: Request,
+    status_code: int,
+) -> AsyncIterator[bytes]:
+    preview = _BodyPreviewBuffer()
+    try:
+        async for chunk in body_iterator:
+            preview.feed(chunk)
+            yield chunk
+    finally:
+        _log_outgoing_response(request, status_code, preview.preview())
+
+
+UpstreamFailure = UpstreamResponseFormatError | UpstreamUnavailableError | httpx.HTTPError
+
+
+def _failure_status(exc: Exception) -> str:
+    return "rejected" if isinstance(exc, UpstreamUnavailableError) else "upstream_error"
+
+
+def _upstream_http_exception(exc: UpstreamFailure) -> HTTPException:
+    if isinstance(exc, UpstreamUnavailableError):
+        logger.warning("upstream unavailable error_type={} detail={}", type(exc).__name__, str(exc))
+        return HTTPException(
+            status_code=exc.status_code,
+            detail=str(exc),
+            headers={"Retry-After": str(math.ceil(exc.retry_after_seconds))},
+        )
+    if isinstance(exc, UpstreamResponseFormatError):
+        logger.error(
+            "upstream response format error model={} base_url={} message_count={} status_code={} reason={} payload={}",
+            exc.model,
+            exc.base_url,
+            exc.message_count,
+            exc.status_code,
+            exc.reason,
+            exc.payload_preview,
+        )
+        return HTTPException(status_code=502, detail="upstream returned non-OpenAI response shape")
+
+    request_url = str(exc.request.url) if getattr(exc, "request", None) is not None else "unknown"
+    status_code = exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else "None"
+    response_body = _body_preview(exc.response.content) if isinstance(exc, httpx.HTTPStatusError) else "None"
+    logger.exception(
+        "upstream request failed request_url={} status_code={} error_type={} detail={} response_body={}",
+        request_url,
+        status_code,
+        type(exc).__name__,
+        str(exc),
+        response_body,
+    )
+    return HTTPException(status_code=502, detail="upstream request failed")
+
+
+def _context_window_exception(
+    runtime: RuntimeConfig, parsed: ParsedRequest, tokenizer: Tokenizer, context_window: int
+) -> HTTPException | None:
+    prompt_tokens = tokenizer.count_prompt(parsed.request.messages, parsed.request_options)
+    completion_tokens = parsed.request_options.get("max_completion_tokens", parsed.request_options.get("max_tokens"))
+    reserved_tokens = completion_tokens if isinstance(completion_tokens, int) else 0
+    if prompt_tokens + reserved_tokens <= context_window:
+        return None
+    if not tokenizer.exact:
+        logger.warning(
+            "approximate prompt count exceeds context window; forwarding without rejecting "
+            "served_model={} model={} prompt_tokens={} reserved_tokens={} context_window={}",
+            runtime.served_model,
+            runtime.api.model,
+            prompt_tokens,
+            reserved_tokens,
+            context_window,
+        )
+        return None
+    logger.info(
+        "request exceeds context window served_model={} model={} prompt_tokens={} reserved_tokens={} context_window={}",
+        runtime.served_model,
+        runtime.api.model,
+        prompt_tokens,
+        reserved_tokens,
+        context_window,
+    )
+    return HTTPException(
+        status_code=400,
+        detail=(
+            f"prompt of {prompt_tokens} tokens plus {reserved_tokens} completion tokens exceeds "
+            f"the {context_window}-token context window of {runtime.api.model}"
+        ),
+    )
+
+
+def _response_cache_policy(request: Request, parsed: ParsedRequest) -> tuple[bool, bool]:
+    directives = {directive.strip().lower() for directive in request.headers.get("cache-control", "").split(",")}
+    if parsed.overrides.response_cache is False or "no-store" in directives:
+        return False, False
+    if parsed.overrides.response_cache is not True and not is_deterministic_request(parsed.request_options):
+        return False, False
+    return "no-cache" not in directives, True
+
+
+async def _store_final_output(
+    events: AsyncGenerator[WorkflowEvent, None],
+    cache: ResponseCache,
+    key: str,
+) -> AsyncGenerator[WorkflowEvent, None]:
+    try:
+        async for event in events:
+            if isinstance(event, WorkflowOutput):
+                await cache.put(key, event)
+            yield event
+    finally:
+        await events.aclose()
+
+
+async def _stream_events(
+    request: ChatCompletionRequest,
+    *,
+    mode: Mode,
+    first_event: WorkflowEvent,
+    events: AsyncGenerator[WorkflowEvent, None],
+    response_id: str,
+    created: int,
+    metered: MeteredGateway,
+    started: float,
+    count_tokens: bool,
+    timings: RequestTimings,
+    adapter_streaming: str,
+) -> AsyncIterator[bytes]:
+    include_role = True
+    event = first_event
+    status = "cancelled"
+    tokens: TokenBreakdown | None = None
+    try:
+        while True:
+            if isinstance(event, WorkflowOutput):
+                tokens = aggregate_usage(event.stage_usage)
+                with timings.measure("response_building"):
+                    final_chunk = build_final_stream_chunk(
+                        request,
+                        mode=mode,
+                        intermediate=event.intermediate,
+                        tokens=tokens,
+                        response_id=response_id,
+                        created=created,
+                        final_tool_calls=event.final_tool_calls,
+                        finish_reason=event.finish_reason,
+                    )
+                final_chunk["adapter_critic"]["timings"] = timings.as_payload()
+                yield encode_sse_event(final_chunk)
+                break
+
+            chunk = build_stream_chunk(
+                request,
+                delta=event,
+                response_id=response_id,
+                created=created,
+                include_role=include_role,
+            )
+            if chunk is not None:
+                if include_role:
+                    first_chunk_ms = timings.mark_first_chunk()
+                    if count_tokens:
+                        metered.record_first_chunk(adapter_streaming=adapter_streaming, seconds=first_chunk_ms / 1000)
+                include_role = False
+                yield encode_sse_event(chunk)
+            event = await anext(events)
+    except (UpstreamResponseFormatError, UpstreamUnavailableError, httpx.HTTPError) as exc:
+        _upstream_http_exception(exc)
+        status = "upstream_error"
+        yield encode_sse_event({"error": {"message": "upstream request failed mid-stream", "type": "upstream_error"}})
+        return
+    finally:
+        await events.aclose()
+        metered.record_request(
+            stream=True,
+            status=status if tokens is None else "ok",
+            seconds=time.perf_counter() - started,
+            tokens=tokens if count_tokens else None,
+        )
+
+    yield SSE_DONE
+
+
 def create_app(
     config: AppConfig,
     gateway: UpstreamGateway,
@@ -37,7 +263,16 @@ def create_app(
     state: RuntimeState | None = None,
 ) -> FastAPI:
     runtime_state = state if state is not None else build_runtime_state(config=config, gateway=gateway)
-    app = FastAPI()
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        await start_gateway(runtime_state.gateway)
+        yield
+        await close_gateway(runtime_state.gateway)
+        if runtime_state.response_cache is not None:
+            runtime_state.response_cache.close()
+
+    app = FastAPI(lifespan=lifespan)
 
     @app.middleware("http")
     async def debug_request_response_middleware(
@@ -62,87 +297,165 @@ def create_app(
         request_with_body = Request(request.scope, receive)
         response = await call_next(request_with_body)
 
-        response_body = b""
         body_iterator = getattr(response, "body_iterator", None)
-        if body_iterator is not None:
-            async for chunk in body_iterator:
-                response_body += chunk
-        else:
-            response_body = bytes(response.body)
-
-        logger.debug(
-            "outgoing response method={} path={} status_code={} body={}",
-            request.method,
-            request.url.path,
-            response.status_code,
-            _body_preview(response_body),
-        )
+        if body_iterator is None:
+            _log_outgoing_response(request, response.status_code, _body_preview(bytes(response.body)))
+            return response
 
-        return Response(
-            content=response_body,
+        return StreamingResponse(
+            _tee_response_body(body_iterator, request, response.status_code),
             status_code=response.status_code,
             headers=dict(response.headers),
             media_type=response.media_type,
             background=response.background,
         )
 
-    @app.post("/v1/chat/completions")
-    async def chat_completions(request: Request) -> dict[str, Any]:
-        payload = await request.json()
-        parsed = parse_request_payload(payload)
-        runtime = resolve_runtime_config(runtime_state.config, parsed.request.model, parsed.overrides)
+    app.add_middleware(ReceivedAtMiddleware)
+
+    @app.post("/v1/chat/completions", response_model=None)
+    async def chat_completions(request: Request) -> Response:
+        started = time.perf_counter()
+        timings = RequestTimings(started=started, received_at=request.scope.get(RECEIVED_AT_SCOPE_KEY))
+        with timings.measure("parse"):
+            payload = await request.json()
+            parsed = parse_request_payload(payload)
+        with timings.measure("config_resolution"):
+            runtime = resolve_runtime_config(runtime_state.config, parsed.request.model, parsed.overrides)
         if runtime is None:
             raise HTTPException(status_code=400, detail="invalid model routing or overrides")
+        if runtime.api.context_window is not None:
+            with timings.measure("preflight"):
+                context_error = _context_window_exception(
+                    runtime, parsed, runtime_state.tokenizer, runtime.api.context_window
+                )
+            if context_error is not None:
+                raise context_error
+        deadline = Deadline.from_runtime(runtime, started=started)
+        metered = MeteredGateway(
+            runtime_state.gateway,
+            runtime_state.metrics,
+            served_model=runtime.served_model,
+            mode=runtime.mode,
+            timings=timings,
+            hedger=runtime_state.hedger,
+            hedging=runtime.hedging,
+            admission=runtime_state.admission,
+            concurrency=runtime_concurrency(runtime),
+        )
 
-        try:
-            workflow_output = await dispatch(
-                runtime=runtime,
-                messages=parsed.request.messages,
-                gateway=runtime_state.gateway,
-                request_options=parsed.request_options,
-            )
-        except UpstreamResponseFormatError as exc:
-            logger.error(
-                "upstream response format error model={} base_url={} "
-                "message_count={} status_code={} reason={} payload={}",
-                exc.model,
-                exc.base_url,
-                exc.message_count,
-                exc.status_code,
-                exc.reason,
-                exc.payload_preview,
-            )
-            raise HTTPException(status_code=502, detail="upstream returned non-OpenAI response shape") from exc
-        except httpx.HTTPError as exc:
-            request_url = str(exc.request.url) if getattr(exc, "request", None) is not None else "unknown"
-            status_code = exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else "None"
-            response_body = _body_preview(exc.response.content) if isinstance(exc, httpx.HTTPStatusError) else "None"
-            logger.exception(
-                "upstream request failed request_url={} status_code={} error_type={} detail={} response_body={}",
-                request_url,
-                status_code,
-                type(exc).__name__,
-                str(exc),
-                response_body,
+        cache = runtime_state.response_cache
+        cache_key: str | None = None
+        cached_output: WorkflowOutput | None = None
+        cache_status: CacheStatus = "bypass"
+        if cache is not None:
+            lookup, store = _response_cache_policy(request, parsed)
+            if lookup or store:
+                cache_key = response_cache_key(runtime, parsed.request.messages, parsed.request_options)
+            if lookup and cache_key is not None:
+                cached_output = await cache.get(cache_key)
+                cache_status = "hit" if cached_output is not None else "miss"
+            else:
+                cache.record_bypass()
+            if not store:
+                cache_key = None
+        cache_headers = {"X-Adapter-Critic-Cache": cache_status} if cache is not None else {}
+
+        if parsed.stream:
+            if cached_output is not None:
+                events = replay_output(cached_output)
+            else:
+                events = dispatch_stream(
+                    runtime=runtime,
+                    messages=parsed.request.messages,
+                    gateway=metered,
+                    request_options=parsed.request_options,
+                    stage_cache=runtime_state.stage_cache,
+                    timings=timings,
+                    deadline=deadline,
+                    tokenizer=runtime_state.tokenizer,
+                )
+                if cache is not None and cache_key is not None:
+                    events = _store_final_output(events, cache, cache_key)
+            try:
+                first_event = await anext(events)
+            except (UpstreamResponseFormatError, UpstreamUnavailableError, httpx.HTTPError) as exc:
+                await events.aclose()
+                metered.record_request(
+                    stream=True, status=_failure_status(exc), seconds=time.perf_counter() - started, tokens=None
+                )
+                raise _upstream_http_exception(exc) from exc
+
+            return StreamingResponse(
+                _stream_events(
+                    parsed.request,
+                    mode=runtime.mode,
+                    first_event=first_event,
+                    events=events,
+                    response_id=runtime_state.id_provider(),
+                    created=runtime_state.time_provider(),
+                    metered=metered,
+                    started=started,
+                    count_tokens=cached_output is None,
+                    timings=timings,
+                    adapter_streaming=runtime.adapter_streaming if runtime.mode == "adapter" else "none",
+                ),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", **cache_headers},
             )
-            raise HTTPException(status_code=502, detail="upstream request failed") from exc
+
+        if cached_output is not None:
+            workflow_output = cached_output
+        else:
+            try:
+                workflow_output = await dispatch(
+                    runtime=runtime,
+                    messages=parsed.request.messages,
+                    gateway=metered,
+                    request_options=parsed.request_options,
+                    stage_cache=runtime_state.stage_cache,
+                    timings=timings,
+                    deadline=deadline,
+                    tokenizer=runtime_state.tokenizer,
+                )
+            except (UpstreamResponseFormatError, UpstreamUnavailableError, httpx.HTTPError) as exc:
+                metered.record_request(
+                    stream=False, status=_failure_status(exc), seconds=time.perf_counter() - started, tokens=None
+                )
+                raise _upstream_http_exception(exc) from exc
+            if cache is not None and cache_key is not None:
+                await cache.put(cache_key, workflow_output)
 
         tokens = aggregate_usage(workflow_output.stage_usage)
-        return build_response(
-            parsed.request,
-            mode=runtime.mode,
-            final_text=workflow_output.final_text,
-            intermediate=workflow_output.intermediate,
-            tokens=tokens,
-            response_id=runtime_state.id_provider(),
-            created=runtime_state.time_provider(),
-            final_tool_calls=workflow_output.final_tool_calls,
-            finish_reason=workflow_output.finish_reason,
+        metered.record_request(
+            stream=False,
+            status="ok",
+            seconds=time.perf_counter() - started,
+            tokens=tokens if cached_output is None else None,
         )
+        with timings.measure("response_building"):
+            body = build_response(
+                parsed.request,
+                mode=runtime.mode,
+                final_text=workflow_output.final_text,
+                intermediate=workflow_output.intermediate,
+                tokens=tokens,
+                response_id=runtime_state.id_provider(),
+                created=runtime_state.time_provider(),
+                final_tool_calls=workflow_output.final_tool_calls,
+                finish_reason=workflow_output.finish_reason,
+            )
+        body["adapter_critic"]["timings"] = timings.as_payload()
+        return FastJSONResponse(body, headers=cache_headers)
+
+    @app.get("/metrics")
+    async def metrics() -> Response:
+        return Response(content=runtime_state.metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
     @app.get("/healthz")
     async def healthz() -> Response:
         payload = await run_healthcheck(runtime_state.config)
+        if runtime_state.load_balancer is not None:
+            runtime_state.load_balancer.apply_health(payload["targets"])
         status_code = 200 if payload["status"] == "ok" else 503
         return JSONResponse(status_code=status_code, content=payload)
 
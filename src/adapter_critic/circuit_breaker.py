@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import httpx
+from loguru import logger
+
+from .config import CircuitBreakerConfig
+from .contracts import ChatMessage
+from .http_gateway import UpstreamResponseFormatError
+from .upstream import (
+    UpstreamDelta,
+    UpstreamGateway,
+    UpstreamResult,
+    UpstreamUnavailableError,
+    close_gateway,
+    normalize_base_url,
+    start_gateway,
+)
+
+CircuitState = Literal["closed", "open", "half_open"]
+CircuitKey = tuple[str, str]
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    def __init__(self, *, model: str, base_url: str, retry_after_seconds: float) -> None:
+        super().__init__(
+            f"circuit open for model={model} base_url={base_url}",
+            model=model,
+            base_url=base_url,
+            retry_after_seconds=retry_after_seconds,
+        )
+
+
+def is_breaker_failure(exc: BaseException) -> bool:
+    if isinstance(exc, UpstreamUnavailableError):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, httpx.HTTPError | UpstreamResponseFormatError)
+
+
+@dataclass
+class _Circuit:
+    state: CircuitState = "closed"
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    probes_in_flight: int = 0
+
+
+class CircuitBreakerGateway:
+    def __init__(
+        self,
+        gateway: UpstreamGateway,
+        *,
+        failure_threshold: int = 5,
+        latency_threshold_seconds: float | None = None,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._gateway = gateway
+        self._failure_threshold = failure_threshold
+        self._latency_threshold_seconds = latency_threshold_seconds
+        self._open_seconds = open_seconds
+        self._half_open_probes = half_open_probes
+        self._clock = clock
+        self._circuits: dict[CircuitKey, _Circuit] = {}
+
+    @classmethod
+    def from_config(cls, gateway: UpstreamGateway, config: CircuitBreakerConfig) -> CircuitBreakerGateway:
+        return cls(
+            gateway,
+            failure_threshold=config.failure_threshold,
+            latency_threshold_seconds=config.latency_threshold_seconds,
+            open_seconds=config.open_seconds,
+            half_open_probes=config.half_open_probes,
+        )
+
+    def state(self, *, model: str, base_url: str) -> CircuitState:
+        circuit = self._circuits.get((normalize_base_url(base_url), model))
+        return circuit.state if circuit is not None else "closed"
+
+    def _acquire(self, model: str, base_url: str) -> tuple[_Circuit, bool]:
+        key = (normalize_base_url(base_url), model)
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = self._circuits[key] = _Circuit()
+        if circuit.state == "open":
+            remaining = circuit.opened_at + self._open_seconds - self._clock()
+            if remaining > 0:
+                raise CircuitOpenError(model=model, base_url=base_url, retry_after_seconds=remaining)
+            circuit.state = "half_open"
+            logger.info("circuit half-open model={} base_url={}", model, base_url)
+        if circuit.state == "half_open":
+            if circuit.probes_in_flight >= self._half_open_probes:
+                raise CircuitOpenError(model=model, base_url=base_url, retry_after_seconds=0.0)
+            circuit.probes_in_flight += 1
+            return circuit, True
+        return circuit, False
+
+    def _record(self, circuit: _Circuit, *, probe: bool, failed: bool, model: str, base_url: str) -> None:
+        if probe:
+            circuit.probes_in_flight -= 1
+        if not failed:
+            if probe and circuit.state == "half_open":
+                logger.info("circuit closed model={} base_url={}", model, base_url)
+                circuit.state = "closed"
+            if circuit.state == "closed":
+                circuit.consecutive_failures = 0
+            return
+        circuit.consecutive_failures += 1
+        if circuit.state == "half_open" or circuit.consecutive_failures >= self._failure_threshold:
+            if circuit.state != "open":
+                logger.warning(
+                    "circuit opened model={} base_url={} consecutive_failures={}",
+                    model,
+                    base_url,
+                    circuit.consecutive_failures,
+                )
+            circuit.state = "open"
+            circuit.opened_at = self._clock()
+
+    def _latency_breached(self, started: float, finished: float) -> bool:
+        return self._latency_threshold_seconds is not None and finished - started > self._latency_threshold_seconds
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        circuit, probe = self._acquire(model, base_url)
+        started = self._clock()
+        failed: bool | None = None
+        try:
+            result = await self._gateway.complete(
+                model=model,
+                base_url=base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            )
+            failed = self._latency_breached(started, self._clock())
+            return result
+        except Exception as exc:
+            failed = is_breaker_failure(exc)
+            raise
+        finally:
+            if failed is not None:
+                self._record(circuit, probe=probe, failed=failed, model=model, base_url=base_url)
+            elif probe:
+                circuit.probes_in_flight -= 1
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        circuit, probe = self._acquire(model, base_url)
+        started = self._clock()
+        first_delta_at: float | None = None
+        failed: bool | None = None
+        try:
+            async for delta in self._gateway.stream(
+                model=model,
+                base_url=base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            ):
+                if first_delta_at is None:
+                    first_delta_at = self._clock()
+                yield delta
+            failed = self._latency_breached(started, first_delta_at if first_delta_at is not None else self._clock())
+        except Exception as exc:
+            failed = is_breaker_failure(exc)
+            raise
+        finally:
+            if failed is not None:
+                self._record(circuit, probe=probe, failed=failed, model=model, base_url=base_url)
+            elif probe:
+                circuit.probes_in_flight -= 1
+
+    async def start(self) -> None:
+        await start_gateway(self._gateway)
+
+    async def aclose(self) -> None:
+        await close_gateway(self._gateway)
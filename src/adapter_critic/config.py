@@ -1,14 +1,46 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
-from .contracts import AdapterCriticOverrides, Mode
+from .contracts import AdapterCriticOverrides, AdapterStreaming, AdvisorStrategy, ContextStrategy, Mode, PromptLayout
 from .prompts import ADAPTER_SYSTEM_PROMPT, ADVISOR_SYSTEM_PROMPT, CRITIC_SYSTEM_PROMPT
 
 
+class ReplicaTarget(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    base_url: str
+    weight: float = Field(default=1.0, gt=0)
+
+
+class ContextBudgetConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    max_tokens: int = Field(gt=0)
+    strategy: ContextStrategy = "last_turns"
+    keep_last_turns: int | None = Field(default=None, ge=1)
+    tool_result_max_tokens: int = Field(default=128, ge=0)
+    head_messages: int = Field(default=1, ge=0)
+
+
+class ConcurrencyLimitConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    max_concurrency: int = Field(gt=0)
+    max_queue: int = Field(default=0, ge=0)
+    max_queue_ms: int = Field(default=1000, ge=0)
+    retry_after_seconds: int = Field(default=1, ge=0)
+
+
 class StageTarget(BaseModel):
     model: str
     base_url: str
+    replicas: list[ReplicaTarget] = Field(default_factory=list)
+    context_budget: ContextBudgetConfig | None = None
+    context_window: int | None = Field(default=None, gt=0)
+    concurrency: ConcurrencyLimitConfig | None = None
     api_key_env: str | None = Field(
         default=None,
         validation_alias=AliasChoices("api_key_env", "api_key_var"),
@@ -16,6 +48,20 @@ class StageTarget(BaseModel):
     )
 
 
+HedgedStage = Literal["api", "api_draft", "api_final", "api_unguided", "adapter", "critic", "advisor"]
+
+
+class HedgeConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    percentile: float = Field(default=95.0, gt=0, lt=100)
+    initial_delay_ms: int = Field(default=1000, ge=0)
+    min_delay_ms: int = Field(default=50, ge=0)
+    min_samples: int = Field(default=20, ge=1)
+    max_hedge_rate: float = Field(default=0.1, gt=0, le=1)
+    target: StageTarget | None = None
+
+
 class ServedModelConfig(BaseModel):
     mode: Mode
     api: StageTarget
@@ -23,15 +69,76 @@ class ServedModelConfig(BaseModel):
     critic: StageTarget | None = None
     advisor: StageTarget | None = None
     max_adapter_retries: int = Field(default=0, ge=0)
+    adapter_streaming: AdapterStreaming = "blocking"
+    adapter_speculative_release_ms: int | None = Field(default=None, ge=0)
+    advisor_strategy: AdvisorStrategy = "sequential"
+    latency_budget_ms: int | None = Field(default=None, gt=0)
+    min_stage_budget_ms: int = Field(default=0, ge=0)
+    hedging: dict[HedgedStage, HedgeConfig] = Field(default_factory=dict)
+    prompt_layout: PromptLayout = "standard"
     adapter_system_prompt: str | None = None
     critic_system_prompt: str | None = None
     advisor_system_prompt: str | None = None
 
 
+class UpstreamPoolConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    max_connections: int | None = Field(default=None, ge=1)
+    max_keepalive_connections: int | None = Field(default=None, ge=0)
+    keepalive_expiry_seconds: float | None = Field(default=None, ge=0)
+
+
+class ResponseCacheConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    max_entries: int = Field(default=1024, ge=1)
+    ttl_seconds: float = Field(default=300.0, gt=0)
+    sqlite_path: str | None = None
+
+
+class StageCacheConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    max_entries: int = Field(default=1024, ge=1)
+
+
+class TokenizerConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    bpe_file: str | None = None
+    pattern: str | None = None
+    cache_entries: int = Field(default=4096, ge=0)
+
+
+class CircuitBreakerConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    failure_threshold: int = Field(default=5, ge=1)
+    latency_threshold_seconds: float | None = Field(default=None, gt=0)
+    open_seconds: float = Field(default=30.0, gt=0)
+    half_open_probes: int = Field(default=1, ge=1)
+
+
+class LoadBalancerConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    ewma_alpha: float = Field(default=0.3, gt=0, le=1)
+    eject_seconds: float = Field(default=10.0, ge=0)
+    health_interval_seconds: float | None = Field(default=30.0, gt=0)
+    health_timeout_seconds: float = Field(default=5.0, gt=0)
+
+
 class AppConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     served_models: dict[str, ServedModelConfig]
+    upstream_pools: dict[str, UpstreamPoolConfig] = Field(default_factory=dict)
+    response_cache: ResponseCacheConfig | None = None
+    stage_cache: StageCacheConfig | None = None
+    circuit_breaker: CircuitBreakerConfig | None = None
+    load_balancer: LoadBalancerConfig = Field(default_factory=LoadBalancerConfig)
+    tokenizer: TokenizerConfig = Field(default_factory=TokenizerConfig)
 
 
 class RuntimeConfig(BaseModel):
@@ -42,6 +149,13 @@ class RuntimeConfig(BaseModel):
     critic: StageTarget | None = None
     advisor: StageTarget | None = None
     max_adapter_retries: int = 0
+    adapter_streaming: AdapterStreaming = "blocking"
+    adapter_speculative_release_ms: int | None = None
+    advisor_strategy: AdvisorStrategy = "sequential"
+    latency_budget_ms: int | None = None
+    min_stage_budget_ms: int = 0
+    hedging: dict[HedgedStage, HedgeConfig] = Field(default_factory=dict)
+    prompt_layout: PromptLayout = "standard"
     adapter_system_prompt: str
     critic_system_prompt: str
     advisor_system_prompt: str
@@ -53,9 +167,21 @@ def _resolve_stage(base: StageTarget | None, model: str | None, base_url: str |
     resolved_model = model if model is not None else (base.model if base is not None else None)
     resolved_base_url = base_url if base_url is not None else (base.base_url if base is not None else None)
     resolved_api_key_env = base.api_key_env if base is not None else None
+    resolved_replicas = base.replicas if base is not None and base_url is None else []
+    resolved_context_budget = base.context_budget if base is not None else None
+    resolved_context_window = base.context_window if base is not None else None
+    resolved_concurrency = base.concurrency if base is not None and base_url is None else None
     if resolved_model is None or resolved_base_url is None:
         return None
-    return StageTarget(model=resolved_model, base_url=resolved_base_url, api_key_env=resolved_api_key_env)
+    return StageTarget(
+        model=resolved_model,
+        base_url=resolved_base_url,
+        api_key_env=resolved_api_key_env,
+        replicas=resolved_replicas,
+        context_budget=resolved_context_budget,
+        context_window=resolved_context_window,
+        concurrency=resolved_concurrency,
+    )
 
 
 def resolve_runtime_config(
@@ -103,6 +229,25 @@ def resolve_runtime_config(
         max_adapter_retries=(
             overrides.max_adapter_retries if overrides.max_adapter_retries is not None else served.max_adapter_retries
         ),
+        adapter_streaming=(
+            overrides.adapter_streaming if overrides.adapter_streaming is not None else served.adapter_streaming
+        ),
+        adapter_speculative_release_ms=(
+            overrides.adapter_speculative_release_ms
+            if overrides.adapter_speculative_release_ms is not None
+            else served.adapter_speculative_release_ms
+        ),
+        advisor_strategy=(
+            overrides.advisor_strategy if overrides.advisor_strategy is not None else served.advisor_strategy
+        ),
+        latency_budget_ms=(
+            overrides.latency_budget_ms if overrides.latency_budget_ms is not None else served.latency_budget_ms
+        ),
+        min_stage_budget_ms=(
+            overrides.min_stage_budget_ms if overrides.min_stage_budget_ms is not None else served.min_stage_budget_ms
+        ),
+        hedging=served.hedging,
+        prompt_layout=overrides.prompt_layout if overrides.prompt_layout is not None else served.prompt_layout,
         adapter_system_prompt=(
             served.adapter_system_prompt if served.adapter_system_prompt is not None else ADAPTER_SYSTEM_PROMPT
         ),
@@ -5,6 +5,10 @@ from typing import Any, Literal
 from pydantic import BaseModel, ConfigDict, Field
 
 Mode = Literal["direct", "adapter", "critic", "advisor"]
+AdapterStreaming = Literal["blocking", "speculative"]
+AdvisorStrategy = Literal["sequential", "parallel"]
+PromptLayout = Literal["standard", "prefix_cache"]
+ContextStrategy = Literal["last_turns", "summarize_tool_results", "head_tail"]
 
 
 class ChatMessage(BaseModel):
@@ -27,6 +31,13 @@ class AdapterCriticOverrides(BaseModel):
     advisor_model: str | None = None
     advisor_base_url: str | None = None
     max_adapter_retries: int | None = Field(default=None, ge=0)
+    adapter_streaming: AdapterStreaming | None = None
+    adapter_speculative_release_ms: int | None = Field(default=None, ge=0)
+    advisor_strategy: AdvisorStrategy | None = None
+    latency_budget_ms: int | None = Field(default=None, gt=0)
+    min_stage_budget_ms: int | None = Field(default=None, ge=0)
+    prompt_layout: PromptLayout | None = None
+    response_cache: bool | None = None
 
 
 class ChatCompletionRequest(BaseModel):
@@ -41,6 +52,10 @@ class ParsedRequest(BaseModel):
     request: ChatCompletionRequest
     overrides: AdapterCriticOverrides
     request_options: dict[str, Any]
+    stream: bool = False
+
+
+_NON_FORWARDED_REQUEST_KEYS = {"x_adapter_critic", "stream", "stream_options"}
 
 
 def parse_request_payload(payload: dict[str, Any]) -> ParsedRequest:
@@ -49,5 +64,12 @@ def parse_request_payload(payload: dict[str, Any]) -> ParsedRequest:
     if override_payload is None:
         override_payload = request.extra_body.get("x_adapter_critic", {})
     overrides = AdapterCriticOverrides.model_validate(override_payload or {})
-    request_options = {key: value for key, value in (request.model_extra or {}).items() if key != "x_adapter_critic"}
-    return ParsedRequest(request=request, overrides=overrides, request_options=request_options)
+    request_options = {
+        key: value for key, value in (request.model_extra or {}).items() if key not in _NON_FORWARDED_REQUEST_KEYS
+    }
+    return ParsedRequest(
+        request=request,
+        overrides=overrides,
+        request_options=request_options,
+        stream=payload.get("stream") is True,
+    )
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+import anyio
+
+from .config import RuntimeConfig
+
+
+class Deadline:
+    def __init__(
+        self,
+        *,
+        budget_ms: int,
+        min_stage_ms: int = 0,
+        started: float | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.budget_ms = budget_ms
+        self.min_stage_ms = min_stage_ms
+        self._clock = clock
+        self._expires_at = (started if started is not None else clock()) + budget_ms / 1000
+
+    @classmethod
+    def from_runtime(cls, runtime: RuntimeConfig, *, started: float | None = None) -> Deadline | None:
+        if runtime.latency_budget_ms is None:
+            return None
+        return cls(budget_ms=runtime.latency_budget_ms, min_stage_ms=runtime.min_stage_budget_ms, started=started)
+
+    def remaining_seconds(self, *, reserve_stages: int = 0) -> float:
+        return self._expires_at - self._clock() - reserve_stages * self.min_stage_ms / 1000
+
+    def allows_stage(self, *, reserve_stages: int = 0) -> bool:
+        remaining_ms = self.remaining_seconds(reserve_stages=reserve_stages) * 1000
+        return remaining_ms > 0 and remaining_ms >= self.min_stage_ms
+
+
+def stage_allowed(deadline: Deadline | None, *, reserve_stages: int = 0) -> bool:
+    return deadline is None or deadline.allows_stage(reserve_stages=reserve_stages)
+
+
+def stage_scope(deadline: Deadline | None, *, reserve_stages: int = 0) -> anyio.CancelScope:
+    if deadline is None:
+        return anyio.CancelScope()
+    return anyio.move_on_after(max(0.0, deadline.remaining_seconds(reserve_stages=reserve_stages)))
+
+
+def budget_skip_reason(stage: str) -> str:
+    return f"{stage} skipped: latency budget exhausted"
@@ -1,12 +1,28 @@
 from __future__ import annotations
 
+from collections.abc import AsyncGenerator, AsyncIterator
 from typing import Any
 
 from .config import RuntimeConfig
 from .contracts import ChatMessage
-from .upstream import UpstreamGateway
-from .workflows import run_adapter, run_advisor, run_critic, run_direct
-from .workflows.direct import WorkflowOutput
+from .deadlines import Deadline
+from .stage_cache import StageCache
+from .streaming import deltas_from_result
+from .timings import RequestTimings
+from .token_counter import Tokenizer
+from .upstream import TokenUsage, UpstreamGateway, UpstreamResult
+from .workflows import (
+    run_adapter,
+    run_advisor,
+    run_critic,
+    run_direct,
+    run_parallel_advisor,
+    stream_adapter,
+    stream_advisor,
+    stream_critic,
+    stream_direct,
+)
+from .workflows.direct import WorkflowEvent, WorkflowOutput
 
 
 async def dispatch(
@@ -14,6 +30,10 @@ async def dispatch(
     messages: list[ChatMessage],
     gateway: UpstreamGateway,
     request_options: dict[str, Any],
+    stage_cache: StageCache | None = None,
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
 ) -> WorkflowOutput:
     if runtime.mode == "direct":
         return await run_direct(
@@ -28,17 +48,111 @@ async def dispatch(
             messages=messages,
             gateway=gateway,
             request_options=request_options,
+            stage_cache=stage_cache,
+            timings=timings,
+            deadline=deadline,
+            tokenizer=tokenizer,
         )
     if runtime.mode == "advisor":
-        return await run_advisor(
+        advisor_workflow = run_parallel_advisor if runtime.advisor_strategy == "parallel" else run_advisor
+        return await advisor_workflow(
             runtime=runtime,
             messages=messages,
             gateway=gateway,
             request_options=request_options,
+            timings=timings,
+            deadline=deadline,
+            tokenizer=tokenizer,
         )
     return await run_critic(
         runtime=runtime,
         messages=messages,
         gateway=gateway,
         request_options=request_options,
+        stage_cache=stage_cache,
+        timings=timings,
+        deadline=deadline,
+        tokenizer=tokenizer,
     )
+
+
+async def dispatch_stream(
+    runtime: RuntimeConfig,
+    messages: list[ChatMessage],
+    gateway: UpstreamGateway,
+    request_options: dict[str, Any],
+    stage_cache: StageCache | None = None,
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> AsyncGenerator[WorkflowEvent, None]:
+    events: AsyncIterator[WorkflowEvent] | None = None
+    if runtime.mode == "direct":
+        events = stream_direct(
+            runtime=runtime,
+            messages=messages,
+            gateway=gateway,
+            request_options=request_options,
+        )
+    elif runtime.mode == "adapter" and runtime.adapter_streaming == "speculative":
+        events = stream_adapter(
+            runtime=runtime,
+            messages=messages,
+            gateway=gateway,
+            request_options=request_options,
+            stage_cache=stage_cache,
+            timings=timings,
+            deadline=deadline,
+            tokenizer=tokenizer,
+        )
+    elif runtime.mode == "critic":
+        events = stream_critic(
+            runtime=runtime,
+            messages=messages,
+            gateway=gateway,
+            request_options=request_options,
+            stage_cache=stage_cache,
+            timings=timings,
+            deadline=deadline,
+            tokenizer=tokenizer,
+        )
+    elif runtime.mode == "advisor" and runtime.advisor_strategy == "sequential":
+        events = stream_advisor(
+            runtime=runtime,
+            messages=messages,
+            gateway=gateway,
+            request_options=request_options,
+            timings=timings,
+            deadline=deadline,
+            tokenizer=tokenizer,
+        )
+
+    if events is not None:
+        async for event in events:
+            yield event
+        return
+
+    output = await dispatch(
+        runtime=runtime,
+        messages=messages,
+        gateway=gateway,
+        request_options=request_options,
+        stage_cache=stage_cache,
+        timings=timings,
+        deadline=deadline,
+        tokenizer=tokenizer,
+    )
+    async for event in replay_output(output):
+        yield event
+
+
+async def replay_output(output: WorkflowOutput) -> AsyncGenerator[WorkflowEvent, None]:
+    final_result = UpstreamResult(
+        content=output.final_text,
+        usage=TokenUsage(),
+        tool_calls=output.final_tool_calls,
+        finish_reason=output.finish_reason,
+    )
+    for delta in deltas_from_result(final_result):
+        yield delta
+    yield output
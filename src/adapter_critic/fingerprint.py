@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from .contracts import ChatMessage
+
+
+def canonical_messages(messages: list[ChatMessage]) -> list[dict[str, Any]]:
+    return [message.model_dump(mode="json") for message in messages]
+
+
+def fingerprint(payload: Any) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -21,8 +21,10 @@ class HealthTarget:
     used_by: tuple[str, ...] = field(default_factory=tuple)
 
 
-def _target_key(target: StageTarget) -> tuple[str, str, str | None]:
-    return (target.base_url.rstrip("/"), target.model, target.api_key_env)
+def _target_urls(target: StageTarget) -> list[str]:
+    if target.replicas:
+        return [replica.base_url.rstrip("/") for replica in target.replicas]
+    return [target.base_url.rstrip("/")]
 
 
 def collect_health_targets(config: AppConfig) -> list[HealthTarget]:
@@ -34,18 +36,19 @@ def collect_health_targets(config: AppConfig) -> list[HealthTarget]:
             if stage is None:
                 continue
 
-            key = _target_key(stage)
-            entry = by_key.get(key)
             used_by = f"{served_model}.{stage_name}"
-            if entry is None:
-                by_key[key] = {
-                    "model": stage.model,
-                    "base_url": stage.base_url.rstrip("/"),
-                    "api_key_env": stage.api_key_env,
-                    "used_by": [used_by],
-                }
-            else:
-                entry["used_by"].append(used_by)
+            for base_url in _target_urls(stage):
+                key = (base_url, stage.model, stage.api_key_env)
+                entry = by_key.get(key)
+                if entry is None:
+                    by_key[key] = {
+                        "model": stage.model,
+                        "base_url": base_url,
+                        "api_key_env": stage.api_key_env,
+                        "used_by": [used_by],
+                    }
+                else:
+                    entry["used_by"].append(used_by)
 
     targets: list[HealthTarget] = []
     for item in by_key.values():
@@ -145,9 +148,7 @@ async def _check_target(target: HealthTarget, timeout_seconds: float) -> dict[st
     }
 
 
-async def run_healthcheck(config: AppConfig, *, timeout_seconds: float = 5.0) -> dict[str, Any]:
-    started = time.perf_counter()
-    targets = collect_health_targets(config)
+async def probe_targets(targets: list[HealthTarget], *, timeout_seconds: float = 5.0) -> list[dict[str, Any]]:
     raw_results = await asyncio.gather(
         *[_check_target(target, timeout_seconds=timeout_seconds) for target in targets],
         return_exceptions=True,
@@ -171,6 +172,12 @@ async def run_healthcheck(config: AppConfig, *, timeout_seconds: float = 5.0) ->
         else:
             results.append(raw)
 
+    return results
+
+
+async def run_healthcheck(config: AppConfig, *, timeout_seconds: float = 5.0) -> dict[str, Any]:
+    started = time.perf_counter()
+    results = await probe_targets(collect_health_targets(config), timeout_seconds=timeout_seconds)
     healthy_count = sum(1 for item in results if item.get("ok") is True)
     total_count = len(results)
     status = "ok" if healthy_count == total_count else "degraded"
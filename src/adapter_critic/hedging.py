@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import anyio
+from loguru import logger
+
+from .config import HedgeConfig
+from .contracts import ChatMessage
+from .metrics import AppMetrics
+from .upstream import UpstreamDelta, UpstreamGateway, UpstreamResult, hedged_call
+
+HedgeKey = tuple[str, str]
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0
+    hedges_fired: int = 0
+    hedges_won: int = 0
+
+
+@dataclass
+class _Race:
+    result: UpstreamResult | None = None
+    primary_error: Exception | None = None
+    hedge_error: Exception | None = None
+    hedge_fired: bool = False
+
+
+def latency_percentile(samples: Iterable[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    index = max(0, math.ceil(percentile / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class Hedger:
+    def __init__(
+        self,
+        metrics: AppMetrics | None = None,
+        *,
+        window_size: int = 512,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._metrics = metrics
+        self._window_size = window_size
+        self._clock = clock
+        self._latencies: dict[HedgeKey, deque[float]] = {}
+        self._stats: dict[HedgeKey, HedgeStats] = {}
+
+    def stats(self, *, served_model: str, stage: str) -> HedgeStats:
+        return self._stats.setdefault((served_model, stage), HedgeStats())
+
+    def delay_seconds(self, policy: HedgeConfig, *, served_model: str, stage: str) -> float:
+        samples = self._latencies.get((served_model, stage))
+        if samples is None or len(samples) < policy.min_samples:
+            return policy.initial_delay_ms / 1000
+        return max(policy.min_delay_ms / 1000, latency_percentile(samples, policy.percentile))
+
+    def _record_latency(self, key: HedgeKey, seconds: float) -> None:
+        samples = self._latencies.get(key)
+        if samples is None:
+            samples = self._latencies[key] = deque(maxlen=self._window_size)
+        samples.append(seconds)
+
+    def wrap(self, gateway: UpstreamGateway, *, served_model: str, stage: str, policy: HedgeConfig) -> HedgedGateway:
+        return HedgedGateway(gateway, self, served_model=served_model, stage=stage, policy=policy)
+
+    async def complete(
+        self,
+        gateway: UpstreamGateway,
+        *,
+        served_model: str,
+        stage: str,
+        policy: HedgeConfig,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        key = (served_model, stage)
+        stats = self.stats(served_model=served_model, stage=stage)
+        stats.calls += 1
+        delay = self.delay_seconds(policy, served_model=served_model, stage=stage)
+        hedge_target = policy.target
+        race = _Race()
+        started = self._clock()
+
+        async with anyio.create_task_group() as task_group:
+
+            async def run_primary() -> None:
+                try:
+                    result = await gateway.complete(
+                        model=model,
+                        base_url=base_url,
+                        messages=messages,
+                        api_key_env=api_key_env,
+                        request_options=request_options,
+                    )
+                except Exception as exc:
+                    race.primary_error = exc
+                    if race.hedge_fired:
+                        return
+                else:
+                    self._record_latency(key, self._clock() - started)
+                    if race.result is None:
+                        race.result = result
+                task_group.cancel_scope.cancel()
+
+            async def run_hedge() -> None:
+                await anyio.sleep(delay)
+                if stats.hedges_fired >= policy.max_hedge_rate * stats.calls:
+                    return
+                race.hedge_fired = True
+                hedged_call.set(True)
+                stats.hedges_fired += 1
+                if self._metrics is not None:
+                    self._metrics.hedges_fired.inc(key)
+                logger.debug(
+                    "hedging upstream call served_model={} stage={} delay_ms={:.1f}", served_model, stage, delay * 1000
+                )
+                try:
+                    result = await gateway.complete(
+                        model=hedge_target.model if hedge_target is not None else model,
+                        base_url=hedge_target.base_url if hedge_target is not None else base_url,
+                        messages=messages,
+                        api_key_env=hedge_target.api_key_env if hedge_target is not None else api_key_env,
+                        request_options=request_options,
+                    )
+                except Exception as exc:
+                    race.hedge_error = exc
+                    return
+                if race.result is None:
+                    race.result = result
+                    stats.hedges_won += 1
+                    if self._metrics is not None:
+                        self._metrics.hedges_won.inc(key)
+                task_group.cancel_scope.cancel()
+
+            task_group.start_soon(run_primary)
+            task_group.start_soon(run_hedge)
+
+        if race.result is None:
+            error = race.primary_error if race.primary_error is not None else race.hedge_error
+            assert error is not None
+            raise error
+        return race.result
+
+
+class HedgedGateway:
+    def __init__(
+        self,
+        gateway: UpstreamGateway,
+        hedger: Hedger,
+        *,
+        served_model: str,
+        stage: str,
+        policy: HedgeConfig,
+    ) -> None:
+        self._gateway = gateway
+        self._hedger = hedger
+        self._served_model = served_model
+        self._stage = stage
+        self._policy = policy
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        return await self._hedger.complete(
+            self._gateway,
+            served_model=self._served_model,
+            stage=self._stage,
+            policy=self._policy,
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        )
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        async for delta in self._gateway.stream(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        ):
+            yield delta
@@ -1,19 +1,23 @@
 from __future__ import annotations
 
-import json
 import os
+from collections.abc import AsyncIterator, Iterable, Mapping
 from typing import Any
 
 import httpx
 from loguru import logger
 
+from .config import UpstreamPoolConfig
 from .contracts import ChatMessage
-from .upstream import TokenUsage, UpstreamResult
+from .json_codec import dumps, dumps_str, loads
+from .logging_setup import LazyLogArg
+from .metrics import APP_METRICS, AppMetrics
+from .upstream import TokenUsage, UpstreamDelta, UpstreamResult, normalize_base_url
 
 
 def _payload_preview(payload: Any, *, max_chars: int | None = 400) -> str:
     try:
-        serialized = json.dumps(payload, default=str)
+        serialized = dumps_str(payload)
     except TypeError:
         serialized = str(payload)
     if max_chars is None or max_chars <= 0:
@@ -24,13 +28,32 @@ def _payload_preview(payload: Any, *, max_chars: int | None = 400) -> str:
 
 
 def _json_char_len(value: Any) -> int:
-    return len(json.dumps(value, default=str, separators=(",", ":")))
+    return len(dumps_str(value))
+
+
+def _request_size_fields(payload: dict[str, Any]) -> str:
+    messages_char_len = _json_char_len(payload["messages"])
+    request_options_char_len = _json_char_len(
+        {key: value for key, value in payload.items() if key not in {"model", "messages"}}
+    )
+    approx_prompt_tokens = _approx_token_count(messages_char_len + request_options_char_len)
+    return (
+        f"messages_char_len={messages_char_len} request_options_char_len={request_options_char_len} "
+        f"approx_prompt_tokens={approx_prompt_tokens}"
+    )
 
 
 def _approx_token_count(char_len: int) -> int:
     return max(1, (char_len + 3) // 4)
 
 
+def _has_assistant_tool_calls(messages: list[ChatMessage]) -> bool:
+    return any(
+        message.role == "assistant" and message.model_extra is not None and "tool_calls" in message.model_extra
+        for message in messages
+    )
+
+
 def _malformed_tool_call_issues(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
     issues: list[dict[str, Any]] = []
 
@@ -91,6 +114,56 @@ def _malformed_tool_call_issues(messages: list[dict[str, Any]]) -> list[dict[str
     return issues
 
 
+def _request_payload(
+    *,
+    model: str,
+    messages: list[ChatMessage],
+    request_options: dict[str, Any] | None,
+) -> dict[str, Any]:
+    payload: dict[str, Any] = {
+        "model": model,
+        "messages": [message.model_dump(exclude_none=True) for message in messages],
+    }
+    if request_options is not None:
+        for key, value in request_options.items():
+            if key not in {"model", "messages"}:
+                payload[key] = value
+    return payload
+
+
+def _parse_stream_delta(chunk: dict[str, Any]) -> UpstreamDelta | None:
+    raw_usage = chunk.get("usage")
+    usage = (
+        TokenUsage(
+            prompt_tokens=int(raw_usage.get("prompt_tokens", 0)),
+            completion_tokens=int(raw_usage.get("completion_tokens", 0)),
+            total_tokens=int(raw_usage.get("total_tokens", 0)),
+        )
+        if isinstance(raw_usage, dict)
+        else None
+    )
+
+    choices = chunk.get("choices")
+    first_choice = choices[0] if isinstance(choices, list) and len(choices) > 0 else None
+    if not isinstance(first_choice, dict):
+        return UpstreamDelta(usage=usage) if usage is not None else None
+
+    delta = first_choice.get("delta")
+    delta = delta if isinstance(delta, dict) else {}
+    content_value = delta.get("content")
+    tool_calls_value = delta.get("tool_calls")
+    tool_calls = (
+        [item for item in tool_calls_value if isinstance(item, dict)] if isinstance(tool_calls_value, list) else []
+    )
+    finish_reason_value = first_choice.get("finish_reason")
+    return UpstreamDelta(
+        content=content_value if isinstance(content_value, str) else "",
+        tool_calls=tool_calls if len(tool_calls) > 0 else None,
+        finish_reason=finish_reason_value if isinstance(finish_reason_value, str) else None,
+        usage=usage,
+    )
+
+
 def _is_empty_assistant_edge_case(*, content_value: Any, tool_calls_value: Any) -> bool:
     content_is_empty_shape = content_value is None or (isinstance(content_value, list) and len(content_value) == 0)
     tool_calls_is_empty_shape = tool_calls_value is None or (
@@ -131,10 +204,53 @@ class OpenAICompatibleHttpGateway:
         api_key: str | None = None,
         default_api_key_env: str | None = "OPENAI_API_KEY",
         timeout_seconds: float = 120.0,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry_seconds: float | None = 5.0,
+        upstream_pools: Mapping[str, UpstreamPoolConfig] | None = None,
+        metrics: AppMetrics | None = None,
     ) -> None:
         self._api_key = api_key
         self._default_api_key_env = default_api_key_env
         self._timeout_seconds = timeout_seconds
+        self._default_pool = UpstreamPoolConfig(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry_seconds=keepalive_expiry_seconds,
+        )
+        self._upstream_pools = {normalize_base_url(base_url): pool for base_url, pool in (upstream_pools or {}).items()}
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._metrics = metrics if metrics is not None else APP_METRICS
+
+    def _pool_limits(self, pool_key: str) -> httpx.Limits:
+        override = self._upstream_pools.get(pool_key)
+        merged = self._default_pool.model_copy(
+            update=override.model_dump(exclude_none=True) if override is not None else {}
+        )
+        return httpx.Limits(
+            max_connections=merged.max_connections,
+            max_keepalive_connections=merged.max_keepalive_connections,
+            keepalive_expiry=merged.keepalive_expiry_seconds,
+        )
+
+    def _client_for(self, base_url: str) -> httpx.AsyncClient:
+        pool_key = normalize_base_url(base_url)
+        client = self._clients.get(pool_key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(timeout=self._timeout_seconds, limits=self._pool_limits(pool_key))
+            self._clients[pool_key] = client
+            logger.debug("opened upstream connection pool base_url={}", pool_key)
+        return client
+
+    def open_pools(self, base_urls: Iterable[str]) -> None:
+        for base_url in base_urls:
+            self._client_for(base_url)
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
 
     def _resolve_api_key(self, api_key_env: str | None) -> str | None:
         if self._api_key is not None and self._api_key != "":
@@ -145,6 +261,13 @@ class OpenAICompatibleHttpGateway:
             return None
         return os.environ.get(key_env)
 
+    def _request_headers(self, api_key_env: str | None) -> dict[str, str]:
+        headers: dict[str, str] = {"Content-Type": "application/json"}
+        resolved_api_key = self._resolve_api_key(api_key_env)
+        if resolved_api_key is not None and resolved_api_key != "":
+            headers["Authorization"] = f"Bearer {resolved_api_key}"
+        return headers
+
     async def complete(
         self,
         *,
@@ -154,27 +277,12 @@ class OpenAICompatibleHttpGateway:
         api_key_env: str | None = None,
         request_options: dict[str, Any] | None = None,
     ) -> UpstreamResult:
-        headers: dict[str, str] = {"Content-Type": "application/json"}
-        resolved_api_key = self._resolve_api_key(api_key_env)
-        if resolved_api_key is not None and resolved_api_key != "":
-            headers["Authorization"] = f"Bearer {resolved_api_key}"
+        headers = self._request_headers(api_key_env)
+        payload = _request_payload(model=model, messages=messages, request_options=request_options)
 
-        payload: dict[str, Any] = {
-            "model": model,
-            "messages": [message.model_dump(exclude_none=True) for message in messages],
-        }
-        if request_options is not None:
-            for key, value in request_options.items():
-                if key not in {"model", "messages"}:
-                    payload[key] = value
-
-        messages_char_len = _json_char_len(payload["messages"])
-        request_options_char_len = _json_char_len(
-            {key: value for key, value in payload.items() if key not in {"model", "messages"}}
+        malformed_issues = (
+            _malformed_tool_call_issues(payload["messages"]) if _has_assistant_tool_calls(messages) else []
         )
-        approx_prompt_tokens = _approx_token_count(messages_char_len + request_options_char_len)
-
-        malformed_issues = _malformed_tool_call_issues(payload["messages"])
         if len(malformed_issues) > 0:
             logger.warning(
                 "detected malformed assistant tool calls before upstream request "
@@ -182,40 +290,39 @@ class OpenAICompatibleHttpGateway:
                 model,
                 base_url,
                 len(malformed_issues),
-                _payload_preview(malformed_issues, max_chars=0),
+                LazyLogArg(_payload_preview, malformed_issues, max_chars=0),
             )
 
         logger.debug(
-            "upstream request model={} base_url={} message_count={} messages_char_len={} "
-            "request_options_char_len={} approx_prompt_tokens={}",
+            "upstream request model={} base_url={} message_count={} {}",
             model,
             base_url,
             len(messages),
-            messages_char_len,
-            request_options_char_len,
-            approx_prompt_tokens,
+            LazyLogArg(_request_size_fields, payload),
         )
 
+        body = dumps(payload)
+
         max_empty_assistant_attempts = 2
         for attempt in range(1, max_empty_assistant_attempts + 1):
-            async with httpx.AsyncClient(timeout=self._timeout_seconds) as client:
-                response = await client.post(
-                    f"{base_url.rstrip('/')}/chat/completions",
-                    headers=headers,
-                    json=payload,
-                )
-                response.raise_for_status()
-                try:
-                    data = response.json()
-                except ValueError as exc:
-                    raise UpstreamResponseFormatError(
-                        reason="response body is not valid JSON",
-                        model=model,
-                        base_url=base_url,
-                        message_count=len(messages),
-                        status_code=response.status_code,
-                        response_body=response.text,
-                    ) from exc
+            client = self._client_for(base_url)
+            response = await client.post(
+                f"{base_url.rstrip('/')}/chat/completions",
+                headers=headers,
+                content=body,
+            )
+            response.raise_for_status()
+            try:
+                data = loads(response.content)
+            except ValueError as exc:
+                raise UpstreamResponseFormatError(
+                    reason="response body is not valid JSON",
+                    model=model,
+                    base_url=base_url,
+                    message_count=len(messages),
+                    status_code=response.status_code,
+                    response_body=response.text,
+                ) from exc
 
             logger.debug(
                 "upstream raw response model={} base_url={} status={} attempt={}/{} message={}",
@@ -224,7 +331,7 @@ class OpenAICompatibleHttpGateway:
                 response.status_code,
                 attempt,
                 max_empty_assistant_attempts,
-                _payload_preview(data, max_chars=2000),
+                LazyLogArg(_payload_preview, data, max_chars=2000),
             )
 
             if not isinstance(data, dict):
@@ -308,7 +415,7 @@ class OpenAICompatibleHttpGateway:
                             response_body=data,
                         )
                     try:
-                        json.loads(arguments)
+                        loads(arguments)
                     except ValueError as exc:
                         raise UpstreamResponseFormatError(
                             reason=(
@@ -349,6 +456,7 @@ class OpenAICompatibleHttpGateway:
                             type(content_value).__name__,
                             type(tool_calls_value).__name__,
                         )
+                        self._metrics.empty_assistant_retries.inc((self._metrics.base_url_label(base_url), model))
                         continue
                     logger.warning(
                         "empty assistant payload without tool calls persisted after retry; accepting empty content "
@@ -399,3 +507,92 @@ class OpenAICompatibleHttpGateway:
             )
 
         raise RuntimeError("unreachable: max_empty_assistant_attempts exhausted")
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        headers = self._request_headers(api_key_env)
+        headers["Accept"] = "text/event-stream"
+        payload = _request_payload(model=model, messages=messages, request_options=request_options)
+        payload["stream"] = True
+        stream_options = payload.get("stream_options")
+        payload["stream_options"] = {
+            **(stream_options if isinstance(stream_options, dict) else {}),
+            "include_usage": True,
+        }
+
+        logger.debug(
+            "upstream stream request model={} base_url={} message_count={}",
+            model,
+            base_url,
+            len(messages),
+        )
+
+        client = self._client_for(base_url)
+        async with client.stream(
+            "POST",
+            f"{base_url.rstrip('/')}/chat/completions",
+            headers=headers,
+            content=dumps(payload),
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+
+            content_type = response.headers.get("content-type", "")
+            if not content_type.startswith("text/event-stream"):
+                body = await response.aread()
+                raise UpstreamResponseFormatError(
+                    reason=f"streaming response content-type is not text/event-stream: {content_type}",
+                    model=model,
+                    base_url=base_url,
+                    message_count=len(messages),
+                    status_code=response.status_code,
+                    response_body=body.decode("utf-8", errors="replace"),
+                )
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = loads(data)
+                except ValueError as exc:
+                    raise UpstreamResponseFormatError(
+                        reason="stream chunk is not valid JSON",
+                        model=model,
+                        base_url=base_url,
+                        message_count=len(messages),
+                        status_code=response.status_code,
+                        response_body=data,
+                    ) from exc
+                if not isinstance(chunk, dict):
+                    raise UpstreamResponseFormatError(
+                        reason="stream chunk is not a JSON object",
+                        model=model,
+                        base_url=base_url,
+                        message_count=len(messages),
+                        status_code=response.status_code,
+                        response_body=chunk,
+                    )
+                if isinstance(chunk.get("error"), dict):
+                    raise UpstreamResponseFormatError(
+                        reason="upstream stream returned an error event",
+                        model=model,
+                        base_url=base_url,
+                        message_count=len(messages),
+                        status_code=response.status_code,
+                        response_body=chunk,
+                    )
+
+                delta = _parse_stream_delta(chunk)
+                if delta is not None:
+                    yield delta
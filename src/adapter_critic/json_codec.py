@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    HAS_ORJSON = False
+else:
+    HAS_ORJSON = True
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def dumps(value: Any, *, fast: bool = HAS_ORJSON) -> bytes:
+    if fast:
+        try:
+            return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return _stdlib_dumps(value)
+
+
+def dumps_str(value: Any, *, fast: bool = HAS_ORJSON) -> str:
+    return dumps(value, fast=fast).decode()
+
+
+def loads(data: str | bytes, *, fast: bool = HAS_ORJSON) -> Any:
+    if fast:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from .config import AppConfig, ReplicaTarget
+from .contracts import ChatMessage
+from .health import HealthTarget, collect_health_targets, probe_targets
+from .upstream import (
+    UpstreamDelta,
+    UpstreamGateway,
+    UpstreamResult,
+    UpstreamUnavailableError,
+    close_gateway,
+    normalize_base_url,
+    start_gateway,
+)
+
+
+@dataclass
+class ReplicaState:
+    base_url: str
+    weight: float = 1.0
+    in_flight: int = 0
+    requests: int = 0
+    ewma_seconds: float | None = None
+    probe_ok: bool = True
+    ejected_until: float = 0.0
+
+    def available(self, now: float) -> bool:
+        return self.probe_ok and now >= self.ejected_until
+
+    def load_score(self) -> tuple[float, float]:
+        latency = self.ewma_seconds if self.ewma_seconds is not None else 0.0
+        return ((self.in_flight + 1) * latency / self.weight, self.in_flight / self.weight)
+
+
+def replica_pools(config: AppConfig) -> dict[str, list[ReplicaTarget]]:
+    pools: dict[str, list[ReplicaTarget]] = {}
+    for served_model, served in config.served_models.items():
+        for stage_name in ("api", "adapter", "critic", "advisor"):
+            stage = getattr(served, stage_name)
+            if stage is None or not stage.replicas:
+                continue
+            key = normalize_base_url(stage.base_url)
+            existing = pools.get(key)
+            if existing is None:
+                pools[key] = stage.replicas
+            elif existing != stage.replicas:
+                raise ValueError(f"conflicting replicas for base_url={stage.base_url} at {served_model}.{stage_name}")
+    return pools
+
+
+def is_replica_failure(exc: BaseException) -> bool:
+    if isinstance(exc, UpstreamUnavailableError):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+class LoadBalancingGateway:
+    def __init__(
+        self,
+        gateway: UpstreamGateway,
+        pools: Mapping[str, list[ReplicaTarget]],
+        *,
+        ewma_alpha: float = 0.3,
+        eject_seconds: float = 10.0,
+        health_targets: list[HealthTarget] | None = None,
+        health_interval_seconds: float | None = None,
+        health_timeout_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        self._gateway = gateway
+        self._pools = {
+            normalize_base_url(base_url): [
+                ReplicaState(base_url=replica.base_url, weight=replica.weight) for replica in replicas
+            ]
+            for base_url, replicas in pools.items()
+            if replicas
+        }
+        self._ewma_alpha = ewma_alpha
+        self._eject_seconds = eject_seconds
+        self._health_targets = health_targets or []
+        self._health_interval_seconds = health_interval_seconds
+        self._health_timeout_seconds = health_timeout_seconds
+        self._health_task: asyncio.Task[None] | None = None
+        self._clock = clock
+        self._random = rng if rng is not None else random.Random()
+
+    @classmethod
+    def from_config(cls, gateway: UpstreamGateway, config: AppConfig) -> LoadBalancingGateway:
+        pools = replica_pools(config)
+        replica_urls = {normalize_base_url(replica.base_url) for replicas in pools.values() for replica in replicas}
+        return cls(
+            gateway,
+            pools,
+            ewma_alpha=config.load_balancer.ewma_alpha,
+            eject_seconds=config.load_balancer.eject_seconds,
+            health_interval_seconds=config.load_balancer.health_interval_seconds,
+            health_timeout_seconds=config.load_balancer.health_timeout_seconds,
+            health_targets=[
+                target
+                for target in collect_health_targets(config)
+                if normalize_base_url(target.base_url) in replica_urls
+            ],
+        )
+
+    def replicas(self, base_url: str) -> list[ReplicaState]:
+        return self._pools.get(normalize_base_url(base_url), [])
+
+    def pick(self, base_url: str) -> ReplicaState | None:
+        pool = self._pools.get(normalize_base_url(base_url))
+        if not pool:
+            return None
+        now = self._clock()
+        candidates = [replica for replica in pool if replica.available(now)]
+        if not candidates:
+            logger.warning("no healthy replicas base_url={} replica_count={}; using all", base_url, len(pool))
+            candidates = pool
+        if len(candidates) == 1:
+            return candidates[0]
+        first = self._random.choices(candidates, weights=[replica.weight for replica in candidates])[0]
+        rest = [replica for replica in candidates if replica is not first]
+        second = self._random.choices(rest, weights=[replica.weight for replica in rest])[0]
+        return min((first, second), key=ReplicaState.load_score)
+
+    def apply_health(self, results: Iterable[Mapping[str, Any]]) -> None:
+        status: dict[str, bool] = {}
+        for item in results:
+            key = normalize_base_url(str(item["base_url"]))
+            status[key] = status.get(key, True) and item.get("ok") is True
+        for pool in self._pools.values():
+            for replica in pool:
+                ok = status.get(normalize_base_url(replica.base_url))
+                if ok is None:
+                    continue
+                if ok != replica.probe_ok:
+                    logger.info("replica health changed base_url={} ok={}", replica.base_url, ok)
+                    replica.probe_ok = ok
+                if ok and replica.ejected_until > 0:
+                    logger.info("replica readmitted after passing health probe base_url={}", replica.base_url)
+                    replica.ejected_until = 0.0
+
+    async def refresh_health(self) -> None:
+        self.apply_health(await probe_targets(self._health_targets, timeout_seconds=self._health_timeout_seconds))
+
+    async def _refresh_health_loop(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.refresh_health()
+
+    def _observe(self, replica: ReplicaState, seconds: float) -> None:
+        if replica.ewma_seconds is None:
+            replica.ewma_seconds = seconds
+        else:
+            replica.ewma_seconds = self._ewma_alpha * seconds + (1 - self._ewma_alpha) * replica.ewma_seconds
+
+    def _eject(self, replica: ReplicaState, exc: BaseException) -> None:
+        replica.ejected_until = self._clock() + self._eject_seconds
+        logger.warning(
+            "replica ejected base_url={} seconds={} error_type={}",
+            replica.base_url,
+            self._eject_seconds,
+            type(exc).__name__,
+        )
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        replica = self.pick(base_url)
+        if replica is None:
+            return await self._gateway.complete(
+                model=model,
+                base_url=base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            )
+        replica.in_flight += 1
+        replica.requests += 1
+        started = self._clock()
+        try:
+            result = await self._gateway.complete(
+                model=model,
+                base_url=replica.base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            )
+            self._observe(replica, self._clock() - started)
+            return result
+        except Exception as exc:
+            if is_replica_failure(exc):
+                self._eject(replica, exc)
+            raise
+        finally:
+            replica.in_flight -= 1
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        replica = self.pick(base_url)
+        if replica is None:
+            async for delta in self._gateway.stream(
+                model=model,
+                base_url=base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            ):
+                yield delta
+            return
+        replica.in_flight += 1
+        replica.requests += 1
+        started = self._clock()
+        first_delta = True
+        try:
+            async for delta in self._gateway.stream(
+                model=model,
+                base_url=replica.base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            ):
+                if first_delta:
+                    first_delta = False
+                    self._observe(replica, self._clock() - started)
+                yield delta
+        except Exception as exc:
+            if is_replica_failure(exc):
+                self._eject(replica, exc)
+            raise
+        finally:
+            replica.in_flight -= 1
+
+    async def start(self) -> None:
+        await start_gateway(self._gateway)
+        interval_seconds = self._health_interval_seconds
+        if interval_seconds is None or not self._health_targets:
+            return
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._refresh_health_loop(interval_seconds))
+
+    async def aclose(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        await close_gateway(self._gateway)
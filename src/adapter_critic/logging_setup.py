@@ -2,19 +2,74 @@ from __future__ import annotations
 
 import os
 import sys
+import zlib
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
+if TYPE_CHECKING:
+    from loguru import Record
+
 DEFAULT_LOGGING_LEVEL = "INFO"
 LOGGING_LEVEL_ENV = "LOGGING_LEVEL"
+LOGGING_ENQUEUE_ENV = "LOGGING_ENQUEUE"
+LOGGING_ROTATION_ENV = "LOGGING_ROTATION"
+LOGGING_RETENTION_ENV = "LOGGING_RETENTION"
+LOGGING_COMPRESSION_ENV = "LOGGING_COMPRESSION"
+LOGGING_SAMPLE_RATES_ENV = "LOGGING_SAMPLE_RATES"
 LOG_FILE_PATH = Path("logs") / "adapter_critic.log"
 
 _VALID_LEVELS = {"TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
+_UNSAMPLED_LEVEL_NO = 30
+
+
+@dataclass(frozen=True)
+class LoggingSettings:
+    level: str = DEFAULT_LOGGING_LEVEL
+    enqueue: bool = True
+    rotation: str | None = "100 MB"
+    retention: str | int | None = 10
+    compression: str | None = "gz"
+    sample_rates: dict[str, float] = field(default_factory=dict)
+
+
+class SamplingFilter:
+    def __init__(self, sample_rates: Mapping[str, float]) -> None:
+        self._sample_rates = dict(sample_rates)
+
+    def __call__(self, record: Record) -> bool:
+        if record["level"].no >= _UNSAMPLED_LEVEL_NO:
+            return True
+        message = record["message"]
+        for prefix, rate in self._sample_rates.items():
+            if message.startswith(prefix):
+                return _sample_point(record) < rate
+        return True
+
+
+def _sample_point(record: Record) -> float:
+    key = f"{record['time'].timestamp()}|{record['thread'].id}|{record['message']}"
+    return zlib.crc32(key.encode()) / 2**32
+
+
+class LazyLogArg:
+    __slots__ = ("_args", "_func", "_kwargs")
+
+    def __init__(self, func: Callable[..., object], *args: Any, **kwargs: Any) -> None:
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+
+    def __str__(self) -> str:
+        return str(self._func(*self._args, **self._kwargs))
 
 
-def resolve_logging_level() -> str:
-    configured = os.environ.get(LOGGING_LEVEL_ENV, DEFAULT_LOGGING_LEVEL).upper()
+def resolve_logging_level(environ: Mapping[str, str] | None = None) -> str:
+    env = os.environ if environ is None else environ
+    configured = env.get(LOGGING_LEVEL_ENV, DEFAULT_LOGGING_LEVEL).upper()
     if configured in _VALID_LEVELS:
         return configured
     return DEFAULT_LOGGING_LEVEL
@@ -24,13 +79,87 @@ def is_debug_logging_enabled() -> bool:
     return resolve_logging_level() in {"TRACE", "DEBUG"}
 
 
-def configure_logging() -> str:
-    level = resolve_logging_level()
+def _optional_setting(environ: Mapping[str, str], name: str, default: str | None) -> str | None:
+    value = environ.get(name)
+    if value is None:
+        return default
+    value = value.strip()
+    if value == "" or value.lower() in {"none", "off", "false", "0"}:
+        return None
+    return value
+
+
+def _retention_setting(environ: Mapping[str, str]) -> str | int | None:
+    if LOGGING_RETENTION_ENV not in environ:
+        return LoggingSettings.retention
+    value = _optional_setting(environ, LOGGING_RETENTION_ENV, None)
+    return int(value) if value is not None and value.isdigit() else value
+
+
+def parse_sample_rates(raw: str) -> dict[str, float]:
+    rates: dict[str, float] = {}
+    for entry in raw.split(","):
+        prefix, separator, rate_text = entry.rpartition("=")
+        prefix = prefix.strip()
+        if separator == "" or prefix == "":
+            continue
+        try:
+            rate = float(rate_text)
+        except ValueError:
+            continue
+        rates[prefix] = min(1.0, max(0.0, rate))
+    return rates
+
+
+def resolve_logging_settings(environ: Mapping[str, str] | None = None) -> LoggingSettings:
+    env = os.environ if environ is None else environ
+    defaults = LoggingSettings()
+    return LoggingSettings(
+        level=resolve_logging_level(env),
+        enqueue=env.get(LOGGING_ENQUEUE_ENV, "true").strip().lower() not in {"0", "false", "no", "off"},
+        rotation=_optional_setting(env, LOGGING_ROTATION_ENV, defaults.rotation),
+        retention=_retention_setting(env),
+        compression=_optional_setting(env, LOGGING_COMPRESSION_ENV, defaults.compression),
+        sample_rates=parse_sample_rates(env.get(LOGGING_SAMPLE_RATES_ENV, "")),
+    )
+
+
+def configure_logging(settings: LoggingSettings | None = None) -> str:
+    resolved = settings if settings is not None else resolve_logging_settings()
     LOG_FILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    sampling_filter = SamplingFilter(resolved.sample_rates)
 
     logger.remove()
-    logger.add(sys.stdout, level=level, colorize=False)
-    logger.add(LOG_FILE_PATH, level=level, colorize=False)
+    logger.add(
+        sys.stdout,
+        level=resolved.level,
+        colorize=False,
+        enqueue=resolved.enqueue,
+        filter=sampling_filter,
+    )
+    logger.add(
+        LOG_FILE_PATH,
+        level=resolved.level,
+        colorize=False,
+        enqueue=resolved.enqueue,
+        filter=sampling_filter,
+        rotation=resolved.rotation,
+        retention=resolved.retention,
+        compression=resolved.compression,
+    )
+
+    logger.info(
+        "logging configured level={} file={} enqueue={} rotation={} retention={} compression={} sample_rates={}",
+        resolved.level,
+        LOG_FILE_PATH,
+        resolved.enqueue,
+        resolved.rotation,
+        resolved.retention,
+        resolved.compression,
+        resolved.sample_rates,
+    )
+    return resolved.level
 
-    logger.info("logging configured level={} file={}", level, LOG_FILE_PATH)
-    return level
+
+def shutdown_logging() -> None:
+    logger.remove()
@@ -0,0 +1,427 @@
+from __future__ import annotations
+
+import math
+import time
+from bisect import bisect_left
+from collections.abc import AsyncIterator, Iterable, Mapping
+from typing import TYPE_CHECKING, Any
+
+from .config import AppConfig, ConcurrencyLimitConfig, HedgeConfig, HedgedStage, StageTarget
+from .contracts import ChatMessage
+from .timings import RequestTimings
+from .upstream import (
+    UpstreamDelta,
+    UpstreamGateway,
+    UpstreamResult,
+    UpstreamUnavailableError,
+    normalize_base_url,
+)
+from .usage import TokenBreakdown
+
+if TYPE_CHECKING:
+    from .admission import AdmissionController
+    from .hedging import Hedger
+
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OVERRIDE_BASE_URL_LABEL = "override"
+
+LabelValues = tuple[str, ...]
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values, strict=True)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: LabelValues = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        self._values[labels] = value
+
+    def value(self, labels: LabelValues = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class _HistogramSeries:
+    __slots__ = ("bucket_counts", "count", "total")
+
+    def __init__(self, bucket_count: int) -> None:
+        self.bucket_counts = [0] * bucket_count
+        self.count = 0
+        self.total = 0.0
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS_SECONDS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = (*buckets, math.inf)
+        self._series: dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _HistogramSeries(len(self.buckets))
+        series.bucket_counts[bisect_left(self.buckets, value)] += 1
+        series.count += 1
+        series.total += value
+
+    def count(self, labels: LabelValues = ()) -> int:
+        series = self._series.get(labels)
+        return series.count if series is not None else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bucket_label_names = (*self.label_names, "le")
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series.bucket_counts, strict=True):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(bucket_label_names, (*labels, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            series_labels = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{series_labels} {_format_value(series.total)}")
+            lines.append(f"{self.name}_count{series_labels} {series.count}")
+        return lines
+
+
+def configured_base_urls(config: AppConfig) -> set[str]:
+    base_urls: set[str] = set()
+    for served in config.served_models.values():
+        targets: list[StageTarget | None] = [served.api, served.adapter, served.critic, served.advisor]
+        targets.extend(policy.target for policy in served.hedging.values())
+        for target in targets:
+            if target is None:
+                continue
+            base_urls.add(normalize_base_url(target.base_url))
+            base_urls.update(normalize_base_url(replica.base_url) for replica in target.replicas)
+    return base_urls
+
+
+class AppMetrics:
+    def __init__(self, base_urls: Iterable[str] = ()) -> None:
+        self._base_urls = {normalize_base_url(base_url) for base_url in base_urls}
+        self.request_duration = Histogram(
+            "adapter_critic_request_duration_seconds",
+            "End-to-end chat completion latency.",
+            ("served_model", "mode", "stream", "status"),
+        )
+        self.time_to_first_chunk = Histogram(
+            "adapter_critic_time_to_first_chunk_seconds",
+            "Time from request start to the first streamed content or tool call chunk.",
+            ("served_model", "mode", "adapter_streaming"),
+        )
+        self.upstream_call_duration = Histogram(
+            "adapter_critic_upstream_call_duration_seconds",
+            "Latency of each upstream gateway call.",
+            ("served_model", "mode", "stage", "base_url", "outcome"),
+        )
+        self.adapter_retries = Counter(
+            "adapter_critic_adapter_retries_total",
+            "Adapter stage calls beyond the first attempt.",
+            ("served_model",),
+        )
+        self.empty_assistant_retries = Counter(
+            "adapter_critic_empty_assistant_retries_total",
+            "Upstream calls retried because the assistant message was empty.",
+            ("base_url", "model"),
+        )
+        self.tokens = Counter(
+            "adapter_critic_tokens_total",
+            "Tokens reported per stage.",
+            ("served_model", "mode", "stage", "kind"),
+        )
+        self.hedges_fired = Counter(
+            "adapter_critic_hedges_fired_total",
+            "Duplicate upstream calls fired because the primary call was slow.",
+            ("served_model", "stage"),
+        )
+        self.hedges_won = Counter(
+            "adapter_critic_hedges_won_total",
+            "Hedged upstream calls that finished before the primary call.",
+            ("served_model", "stage"),
+        )
+        self.response_cache_events = Counter(
+            "adapter_critic_response_cache_events_total",
+            "Response cache lookups, stores, evictions and expirations.",
+            ("event",),
+        )
+        self.stage_cache_lookups = Counter(
+            "adapter_critic_stage_cache_lookups_total",
+            "Stage cache lookups by stage and result.",
+            ("stage", "result"),
+        )
+        self.singleflight_calls = Counter(
+            "adapter_critic_singleflight_calls_total",
+            "Upstream complete calls that went upstream (leader) or awaited an identical in-flight call (coalesced).",
+            ("role",),
+        )
+        self.admission_queue_depth = Gauge(
+            "adapter_critic_admission_queue_depth",
+            "Upstream calls waiting for a concurrency slot.",
+            ("role", "base_url", "model"),
+        )
+        self.admission_in_flight = Gauge(
+            "adapter_critic_admission_in_flight",
+            "Upstream calls holding a concurrency slot.",
+            ("role", "base_url", "model"),
+        )
+        self.admission_wait = Histogram(
+            "adapter_critic_admission_wait_seconds",
+            "Time spent waiting for a concurrency slot by admitted calls.",
+            ("role", "base_url", "model"),
+        )
+        self.admission_rejections = Counter(
+            "adapter_critic_admission_rejections_total",
+            "Upstream calls rejected because the concurrency queue was full or the wait timed out.",
+            ("role", "base_url", "model", "reason"),
+        )
+
+    def register_base_urls(self, base_urls: Iterable[str]) -> None:
+        self._base_urls.update(normalize_base_url(base_url) for base_url in base_urls)
+
+    def base_url_label(self, base_url: str) -> str:
+        normalized = normalize_base_url(base_url)
+        return normalized if normalized in self._base_urls else OVERRIDE_BASE_URL_LABEL
+
+    def record_tokens(self, *, served_model: str, mode: str, tokens: TokenBreakdown) -> None:
+        for stage, usage in tokens.stages.items():
+            self.tokens.inc((served_model, mode, stage, "prompt"), usage.prompt_tokens)
+            self.tokens.inc((served_model, mode, stage, "completion"), usage.completion_tokens)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in (
+            self.request_duration,
+            self.time_to_first_chunk,
+            self.upstream_call_duration,
+            self.adapter_retries,
+            self.empty_assistant_retries,
+            self.tokens,
+            self.hedges_fired,
+            self.hedges_won,
+            self.response_cache_events,
+            self.stage_cache_lookups,
+            self.singleflight_calls,
+            self.admission_queue_depth,
+            self.admission_in_flight,
+            self.admission_wait,
+            self.admission_rejections,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+APP_METRICS = AppMetrics()
+
+
+class _StageGateway:
+    def __init__(self, metered: MeteredGateway, stage: str) -> None:
+        self._metered = metered
+        self._stage = stage
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        started = time.perf_counter()
+        outcome = "cancelled"
+        try:
+            result = await self._metered.upstream_for(self._stage).complete(
+                model=model,
+                base_url=base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            )
+            outcome = "ok"
+            return result
+        except UpstreamUnavailableError:
+            outcome = "rejected"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self._metered.observe_call(self._stage, base_url, outcome, time.perf_counter() - started)
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        started = time.perf_counter()
+        outcome = "cancelled"
+        try:
+            async for delta in self._metered.upstream_for(self._stage).stream(
+                model=model,
+                base_url=base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            ):
+                yield delta
+            outcome = "ok"
+        except UpstreamUnavailableError:
+            outcome = "rejected"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self._metered.observe_call(self._stage, base_url, outcome, time.perf_counter() - started)
+
+
+class MeteredGateway:
+    def __init__(
+        self,
+        gateway: UpstreamGateway,
+        metrics: AppMetrics,
+        *,
+        served_model: str,
+        mode: str,
+        timings: RequestTimings | None = None,
+        hedger: Hedger | None = None,
+        hedging: Mapping[HedgedStage, HedgeConfig] | None = None,
+        admission: AdmissionController | None = None,
+        concurrency: Mapping[str, ConcurrencyLimitConfig] | None = None,
+    ) -> None:
+        self.gateway = gateway
+        self._metrics = metrics
+        self._served_model = served_model
+        self._mode = mode
+        self._timings = timings
+        self._hedger = hedger
+        self._hedging: dict[str, HedgeConfig] = dict(hedging.items()) if hedging is not None else {}
+        self._admission = admission
+        self._concurrency: dict[str, ConcurrencyLimitConfig] = dict(concurrency.items()) if concurrency else {}
+        self.stage_calls: dict[str, int] = {}
+
+    def upstream_for(self, stage: str) -> UpstreamGateway:
+        gateway: UpstreamGateway = self.gateway
+        if self._admission is not None:
+            role = "api" if stage == "api" or stage.startswith("api_") else stage
+            gateway = self._admission.wrap(gateway, role=role, limit=self._concurrency.get(role))
+        policy = self._hedging.get(stage)
+        if self._hedger is not None and policy is not None:
+            gateway = self._hedger.wrap(gateway, served_model=self._served_model, stage=stage, policy=policy)
+        return gateway
+
+    def observe_call(self, stage: str, base_url: str, outcome: str, seconds: float) -> None:
+        self.stage_calls[stage] = self.stage_calls.get(stage, 0) + 1
+        self._metrics.upstream_call_duration.observe(
+            seconds,
+            (self._served_model, self._mode, stage, self._metrics.base_url_label(base_url), outcome),
+        )
+        if self._timings is not None:
+            self._timings.record_stage(stage, seconds)
+
+    def for_stage(self, stage: str) -> _StageGateway:
+        return _StageGateway(self, stage)
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        return await self.for_stage("upstream").complete(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        )
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        async for delta in self.for_stage("upstream").stream(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        ):
+            yield delta
+
+    def record_first_chunk(self, *, adapter_streaming: str, seconds: float) -> None:
+        self._metrics.time_to_first_chunk.observe(seconds, (self._served_model, self._mode, adapter_streaming))
+
+    def record_request(self, *, stream: bool, status: str, seconds: float, tokens: TokenBreakdown | None) -> None:
+        self._metrics.request_duration.observe(
+            seconds,
+            (self._served_model, self._mode, "true" if stream else "false", status),
+        )
+        adapter_calls = self.stage_calls.get("adapter", 0)
+        if adapter_calls > 1:
+            self._metrics.adapter_retries.inc((self._served_model,), adapter_calls - 1)
+        if tokens is not None:
+            self._metrics.record_tokens(served_model=self._served_model, mode=self._mode, tokens=tokens)
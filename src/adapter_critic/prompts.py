@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from typing import Any
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
-from .contracts import ChatMessage
+from .contracts import ChatMessage, ContextStrategy, PromptLayout
+from .json_codec import dumps
+from .token_counter import DEFAULT_TOKENIZER, Tokenizer
+
+if TYPE_CHECKING:
+    from .config import ContextBudgetConfig
 
 ADAPTER_SYSTEM_PROMPT = (
     "You are a response editor running in JSON mode. Respond with valid JSON only. "
@@ -59,6 +67,180 @@ ADVISOR_GUIDANCE_OPEN_TAG = "[ADVISOR_GUIDANCE]"
 ADVISOR_GUIDANCE_CLOSE_TAG = "[/ADVISOR_GUIDANCE]"
 
 
+@dataclass
+class RenderMemoStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class RenderMemo:
+    def __init__(self, *, max_entries: int = 64) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, str] = OrderedDict()
+        self.stats = RenderMemoStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def render_json(self, value: Any) -> str:
+        key = hashlib.blake2b(dumps(value), digest_size=16).digest()
+        rendered = self._entries.get(key)
+        if rendered is not None:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return rendered
+        self.stats.misses += 1
+        rendered = json.dumps(value, indent=2, sort_keys=True, default=str)
+        self._entries[key] = rendered
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return rendered
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+RENDER_MEMO = RenderMemo()
+
+
+@dataclass(frozen=True)
+class HistoryFit:
+    strategy: ContextStrategy
+    max_tokens: int
+    history_tokens: int
+    kept_tokens: int
+    dropped_messages: int = 0
+    clipped_tool_results: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.history_tokens - self.kept_tokens
+
+    def telemetry(self) -> str:
+        return json.dumps(
+            {
+                "strategy": self.strategy,
+                "max_tokens": self.max_tokens,
+                "history_tokens": self.history_tokens,
+                "kept_tokens": self.kept_tokens,
+                "saved_tokens": self.saved_tokens,
+                "dropped_messages": self.dropped_messages,
+                "clipped_tool_results": self.clipped_tool_results,
+            },
+            sort_keys=True,
+        )
+
+
+def _split_turns(messages: list[ChatMessage]) -> list[list[int]]:
+    turns: list[list[int]] = []
+    for index, message in enumerate(messages):
+        if message.role == "system":
+            continue
+        if message.role == "user" or len(turns) == 0:
+            turns.append([])
+        turns[-1].append(index)
+    return turns
+
+
+def _keep_last_turns(
+    messages: list[ChatMessage], costs: list[int], max_tokens: int, keep_last_turns: int | None
+) -> set[int]:
+    turns = _split_turns(messages)
+    if keep_last_turns is not None:
+        turns = turns[-keep_last_turns:]
+    system_tokens = sum(cost for message, cost in zip(messages, costs, strict=True) if message.role == "system")
+    turn_tokens = [sum(costs[index] for index in turn) for turn in turns]
+    while len(turns) > 1 and system_tokens + sum(turn_tokens) > max_tokens:
+        turns.pop(0)
+        turn_tokens.pop(0)
+    kept = {index for index, message in enumerate(messages) if message.role == "system"}
+    kept.update(index for turn in turns for index in turn)
+    return kept
+
+
+def _keep_head_and_tail(messages: list[ChatMessage], costs: list[int], max_tokens: int, head_messages: int) -> set[int]:
+    system = [index for index, message in enumerate(messages) if message.role == "system"]
+    rest = [index for index, message in enumerate(messages) if message.role != "system"]
+    head_count = min(head_messages, len(rest))
+    while 0 < head_count < len(rest) and messages[rest[head_count]].role == "tool":
+        head_count += 1
+    head = rest[:head_count]
+    remaining = max_tokens - sum(costs[index] for index in system + head)
+    tail: list[int] = []
+    for index in reversed(rest[head_count:]):
+        if len(tail) > 0 and costs[index] > remaining:
+            break
+        tail.insert(0, index)
+        remaining -= costs[index]
+    while len(tail) > 1 and messages[tail[0]].role == "tool":
+        tail.pop(0)
+    return {*system, *head, *tail}
+
+
+def _clip_tool_results(
+    messages: list[ChatMessage],
+    costs: list[int],
+    max_tokens: int,
+    tool_result_max_tokens: int,
+    tokenizer: Tokenizer,
+) -> int:
+    turns = _split_turns(messages)
+    protected = set(turns[-1]) if len(turns) > 0 else set()
+    total = sum(costs)
+    clipped = 0
+    for index, message in enumerate(messages):
+        if total <= max_tokens:
+            break
+        if message.role != "tool" or index in protected:
+            continue
+        content = message.content or ""
+        head = tokenizer.truncate_text(content, tool_result_max_tokens)
+        if head == content:
+            continue
+        omitted = tokenizer.count_text(content) - tokenizer.count_text(head)
+        messages[index] = message.model_copy(
+            update={"content": f"{head}\n[tool result truncated: {omitted} tokens omitted]"}
+        )
+        clipped_cost = tokenizer.count_message(messages[index])
+        total -= costs[index] - clipped_cost
+        costs[index] = clipped_cost
+        clipped += 1
+    return clipped
+
+
+def fit_history(
+    messages: list[ChatMessage],
+    budget: ContextBudgetConfig | None,
+    tokenizer: Tokenizer | None = None,
+) -> tuple[list[ChatMessage], HistoryFit | None]:
+    if budget is None:
+        return messages, None
+
+    tokenizer = tokenizer if tokenizer is not None else DEFAULT_TOKENIZER
+    costs = [tokenizer.count_message(message) for message in messages]
+    history_tokens = sum(costs)
+    fitted = list(messages)
+    clipped = 0
+    if budget.strategy == "head_tail":
+        kept = set(range(len(fitted)))
+        if history_tokens > budget.max_tokens:
+            kept = _keep_head_and_tail(fitted, costs, budget.max_tokens, budget.head_messages)
+    else:
+        if budget.strategy == "summarize_tool_results":
+            clipped = _clip_tool_results(fitted, costs, budget.max_tokens, budget.tool_result_max_tokens, tokenizer)
+        kept = _keep_last_turns(fitted, costs, budget.max_tokens, budget.keep_last_turns)
+
+    history_fit = HistoryFit(
+        strategy=budget.strategy,
+        max_tokens=budget.max_tokens,
+        history_tokens=history_tokens,
+        kept_tokens=sum(cost for index, cost in enumerate(costs) if index in kept),
+        dropped_messages=len(fitted) - len(kept),
+        clipped_tool_results=clipped,
+    )
+    return [message for index, message in enumerate(fitted) if index in kept], history_fit
+
+
 def _render_history(messages: list[ChatMessage]) -> str:
     rendered = []
     for message in messages:
@@ -66,9 +248,13 @@ def _render_history(messages: list[ChatMessage]) -> str:
     return "\n".join(rendered)
 
 
-def _render_tool_contract(request_options: dict[str, Any] | None) -> str | None:
+def _render_json(value: Any) -> str:
+    return RENDER_MEMO.render_json(value)
+
+
+def _tool_contract(request_options: dict[str, Any] | None) -> dict[str, Any]:
     if request_options is None:
-        return None
+        return {}
 
     contract: dict[str, Any] = {}
     tools = request_options.get("tools")
@@ -78,10 +264,33 @@ def _render_tool_contract(request_options: dict[str, Any] | None) -> str | None:
     tool_choice = request_options.get("tool_choice")
     if tool_choice is not None:
         contract["tool_choice"] = tool_choice
+    return contract
 
+
+def _render_tool_contract(request_options: dict[str, Any] | None) -> str | None:
+    contract = _tool_contract(request_options)
     if len(contract) == 0:
         return None
-    return json.dumps(contract, indent=2, sort_keys=True, default=str)
+    return _render_json(contract)
+
+
+def _render_prefix_cache_request(
+    messages: list[ChatMessage],
+    draft: str,
+    request_options: dict[str, Any] | None,
+    system_prompt: str | None = None,
+) -> str:
+    contract = _tool_contract(request_options)
+    sections: list[str] = []
+    if "tools" in contract:
+        sections.append(f"Authoritative tool definitions for this conversation:\n{_render_json(contract['tools'])}")
+    if system_prompt is not None:
+        sections.append(f"System instructions:\n{system_prompt}")
+    sections.append(f"Conversation history:\n{_render_history(messages)}")
+    if "tool_choice" in contract:
+        sections.append(f"Tool choice for this request:\n{_render_json(contract['tool_choice'])}")
+    sections.append(f"Latest API draft:\n{draft}")
+    return "\n\n".join(sections)
 
 
 def build_adapter_messages(
@@ -89,7 +298,21 @@ def build_adapter_messages(
     draft: str,
     adapter_system_prompt: str = ADAPTER_SYSTEM_PROMPT,
     request_options: dict[str, Any] | None = None,
+    layout: PromptLayout = "standard",
 ) -> list[ChatMessage]:
+    if layout == "prefix_cache":
+        return [
+            ChatMessage(
+                role="system",
+                content=(
+                    f"{adapter_system_prompt}\n\n"
+                    "Tool definitions in the request, if any, are the authoritative tool contract. "
+                    "Never emit tool calls directly. Return only the structured JSON adapter response."
+                ),
+            ),
+            ChatMessage(role="user", content=_render_prefix_cache_request(messages, draft, request_options)),
+        ]
+
     tool_contract = _render_tool_contract(request_options)
     system_prompt_content = adapter_system_prompt
     if tool_contract is not None:
@@ -115,7 +338,24 @@ def build_critic_messages(
     draft: str,
     critic_system_prompt: str = CRITIC_SYSTEM_PROMPT,
     request_options: dict[str, Any] | None = None,
+    layout: PromptLayout = "standard",
 ) -> list[ChatMessage]:
+    if layout == "prefix_cache":
+        return [
+            ChatMessage(
+                role="system",
+                content=(
+                    f"{critic_system_prompt}\n\n"
+                    "Tool definitions in the request, if any, are the authoritative tool contract. "
+                    "Evaluate tool usage against this contract. Never emit tool calls yourself."
+                ),
+            ),
+            ChatMessage(
+                role="user",
+                content=_render_prefix_cache_request(messages, draft, request_options, system_prompt=system_prompt),
+            ),
+        ]
+
     tool_contract = _render_tool_contract(request_options)
     system_prompt_content = critic_system_prompt
     if tool_contract is not None:
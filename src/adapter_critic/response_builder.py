@@ -3,9 +3,29 @@ from __future__ import annotations
 from typing import Any
 
 from .contracts import ChatCompletionRequest, Mode
+from .json_codec import dumps
 from .response_shape import infer_finish_reason, normalize_tool_calls
+from .upstream import UpstreamDelta
 from .usage import TokenBreakdown
 
+SSE_DONE = b"data: [DONE]\n\n"
+
+
+def _adapter_critic_extension(
+    *,
+    mode: Mode,
+    intermediate: dict[str, str],
+    tokens: TokenBreakdown,
+) -> dict[str, Any]:
+    return {
+        "mode": mode,
+        "intermediate": intermediate,
+        "tokens": {
+            "stages": {name: usage.model_dump() for name, usage in tokens.stages.items()},
+            "total": tokens.total.model_dump(),
+        },
+    }
+
 
 def build_response(
     request: ChatCompletionRequest,
@@ -42,12 +62,62 @@ def build_response(
             }
         ],
         "usage": tokens.total.model_dump(),
-        "adapter_critic": {
-            "mode": mode,
-            "intermediate": intermediate,
-            "tokens": {
-                "stages": {name: usage.model_dump() for name, usage in tokens.stages.items()},
-                "total": tokens.total.model_dump(),
-            },
-        },
+        "adapter_critic": _adapter_critic_extension(mode=mode, intermediate=intermediate, tokens=tokens),
+    }
+
+
+def build_stream_chunk(
+    request: ChatCompletionRequest,
+    *,
+    delta: UpstreamDelta,
+    response_id: str,
+    created: int,
+    include_role: bool = False,
+) -> dict[str, Any] | None:
+    chunk_delta: dict[str, Any] = {}
+    if include_role:
+        chunk_delta["role"] = "assistant"
+    if delta.content != "" or include_role:
+        chunk_delta["content"] = delta.content
+    if delta.tool_calls is not None and len(delta.tool_calls) > 0:
+        chunk_delta["tool_calls"] = delta.tool_calls
+    if len(chunk_delta) == 0:
+        return None
+
+    return {
+        "id": response_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": request.model,
+        "choices": [{"index": 0, "delta": chunk_delta, "finish_reason": None}],
     }
+
+
+def build_final_stream_chunk(
+    request: ChatCompletionRequest,
+    *,
+    mode: Mode,
+    intermediate: dict[str, str],
+    tokens: TokenBreakdown,
+    response_id: str,
+    created: int,
+    final_tool_calls: list[dict[str, Any]] | None = None,
+    finish_reason: str = "stop",
+) -> dict[str, Any]:
+    response_finish_reason = infer_finish_reason(
+        finish_reason,
+        tool_calls=normalize_tool_calls(final_tool_calls),
+    )
+    return {
+        "id": response_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": request.model,
+        "choices": [{"index": 0, "delta": {}, "finish_reason": response_finish_reason}],
+        "usage": tokens.total.model_dump(),
+        "adapter_critic": _adapter_critic_extension(mode=mode, intermediate=intermediate, tokens=tokens),
+    }
+
+
+def encode_sse_event(payload: dict[str, Any]) -> bytes:
+    return b"data: " + dumps(payload) + b"\n\n"
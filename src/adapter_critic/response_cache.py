@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+import anyio
+
+from .config import ResponseCacheConfig, RuntimeConfig
+from .contracts import ChatMessage
+from .fingerprint import canonical_messages, fingerprint
+from .metrics import AppMetrics
+from .workflows.direct import WorkflowOutput
+
+CacheStatus = Literal["hit", "miss", "bypass"]
+CacheEvent = Literal["hit", "disk_hit", "miss", "bypass", "store", "eviction", "expiration"]
+
+_STATS_FIELDS: dict[CacheEvent, str] = {
+    "hit": "hits",
+    "disk_hit": "disk_hits",
+    "miss": "misses",
+    "bypass": "bypasses",
+    "store": "stores",
+    "eviction": "evictions",
+    "expiration": "expirations",
+}
+_NON_SEMANTIC_REQUEST_KEYS = {"user", "metadata", "store", "service_tier"}
+
+
+def response_cache_key(
+    runtime: RuntimeConfig,
+    messages: list[ChatMessage],
+    request_options: dict[str, Any],
+) -> str:
+    return fingerprint(
+        {
+            "runtime": runtime.model_dump(mode="json"),
+            "messages": canonical_messages(messages),
+            "request_options": {
+                key: value for key, value in request_options.items() if key not in _NON_SEMANTIC_REQUEST_KEYS
+            },
+        }
+    )
+
+
+def is_deterministic_request(request_options: dict[str, Any]) -> bool:
+    temperature = request_options.get("temperature")
+    return isinstance(temperature, int | float) and not isinstance(temperature, bool) and temperature == 0
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    bypasses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    disk_hits: int = 0
+
+
+class _SqliteTier:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache (key TEXT PRIMARY KEY, expires_at REAL, payload TEXT)"
+            )
+
+    def get(self, key: str, now: float) -> str | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload, expires_at FROM response_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            payload, expires_at = row
+            if expires_at <= now:
+                with self._connection:
+                    self._connection.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            return str(payload)
+
+    def put(self, key: str, expires_at: float, payload: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO response_cache (key, expires_at, payload) VALUES (?, ?, ?)",
+                (key, expires_at, payload),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+        sqlite_path: Path | None = None,
+        clock: Callable[[], float] = time.time,
+        metrics: AppMetrics | None = None,
+    ) -> None:
+        self._metrics = metrics
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, WorkflowOutput]] = OrderedDict()
+        self._disk = _SqliteTier(sqlite_path) if sqlite_path is not None else None
+        self.stats = ResponseCacheStats()
+
+    @classmethod
+    def from_config(cls, config: ResponseCacheConfig, metrics: AppMetrics | None = None) -> ResponseCache:
+        return cls(
+            max_entries=config.max_entries,
+            ttl_seconds=config.ttl_seconds,
+            sqlite_path=Path(config.sqlite_path) if config.sqlite_path is not None else None,
+            metrics=metrics,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _count(self, event: CacheEvent) -> None:
+        field = _STATS_FIELDS[event]
+        setattr(self.stats, field, getattr(self.stats, field) + 1)
+        if self._metrics is not None:
+            self._metrics.response_cache_events.inc((event,))
+
+    def _remember(self, key: str, expires_at: float, output: WorkflowOutput) -> None:
+        self._entries[key] = (expires_at, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._count("eviction")
+
+    async def get(self, key: str) -> WorkflowOutput | None:
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, output = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self._count("hit")
+                return output.model_copy(deep=True)
+            del self._entries[key]
+            self._count("expiration")
+
+        if self._disk is not None:
+            payload = await anyio.to_thread.run_sync(self._disk.get, key, now)
+            if payload is not None:
+                stored = json.loads(payload)
+                output = WorkflowOutput.model_validate(stored["output"])
+                self._remember(key, float(stored["expires_at"]), output)
+                self._count("hit")
+                self._count("disk_hit")
+                return output.model_copy(deep=True)
+
+        self._count("miss")
+        return None
+
+    async def put(self, key: str, output: WorkflowOutput) -> None:
+        expires_at = self._clock() + self._ttl_seconds
+        self._remember(key, expires_at, output.model_copy(deep=True))
+        self._count("store")
+        if self._disk is not None:
+            payload = json.dumps({"expires_at": expires_at, "output": output.model_dump(mode="json")})
+            await anyio.to_thread.run_sync(self._disk.put, key, expires_at, payload)
+
+    def record_bypass(self) -> None:
+        self._count("bypass")
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
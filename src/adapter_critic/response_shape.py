@@ -53,3 +53,29 @@ def infer_finish_reason(
     if raw_finish_reason in {"length", "content_filter"}:
         return raw_finish_reason
     return "stop"
+
+
+def candidate_rejection_reason(
+    *,
+    content: str,
+    tool_calls: list[dict[str, Any]] | None,
+    require_call: bool,
+) -> str | None:
+    normalized_tool_calls = normalize_tool_calls(tool_calls)
+    has_call = normalized_tool_calls is not None
+    if normalized_tool_calls is not None and not has_valid_tool_calls(normalized_tool_calls):
+        return "tool_calls must have OpenAI function shape with JSON-object arguments"
+    if content == "" and not has_call:
+        return "assistant message has empty content and no calls"
+    if require_call and not has_call:
+        return "request requires a tool call"
+    return None
+
+
+def requires_tool_call(request_options: dict[str, Any]) -> bool:
+    tool_choice = request_options.get("tool_choice")
+    if tool_choice == "required":
+        return True
+    if isinstance(tool_choice, dict):
+        return tool_choice.get("type") == "function"
+    return False
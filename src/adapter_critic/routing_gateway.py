@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from typing import Any
 
 from .contracts import ChatMessage
-from .upstream import UpstreamGateway, UpstreamResult
+from .upstream import UpstreamDelta, UpstreamGateway, UpstreamResult, close_gateway, start_gateway
 from .vertex_gateway import is_vertex_anthropic_target
 
 
@@ -17,6 +18,11 @@ class RoutingGateway:
         self._openai_gateway = openai_gateway
         self._vertex_gateway = vertex_gateway
 
+    def _gateway_for(self, *, model: str, base_url: str) -> UpstreamGateway:
+        if is_vertex_anthropic_target(model=model, base_url=base_url):
+            return self._vertex_gateway
+        return self._openai_gateway
+
     async def complete(
         self,
         *,
@@ -26,10 +32,7 @@ class RoutingGateway:
         api_key_env: str | None = None,
         request_options: dict[str, Any] | None = None,
     ) -> UpstreamResult:
-        gateway = self._openai_gateway
-        if is_vertex_anthropic_target(model=model, base_url=base_url):
-            gateway = self._vertex_gateway
-
+        gateway = self._gateway_for(model=model, base_url=base_url)
         return await gateway.complete(
             model=model,
             base_url=base_url,
@@ -37,3 +40,30 @@ class RoutingGateway:
             api_key_env=api_key_env,
             request_options=request_options,
         )
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        gateway = self._gateway_for(model=model, base_url=base_url)
+        async for delta in gateway.stream(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        ):
+            yield delta
+
+    async def start(self) -> None:
+        await start_gateway(self._openai_gateway)
+        await start_gateway(self._vertex_gateway)
+
+    async def aclose(self) -> None:
+        await close_gateway(self._openai_gateway)
+        await close_gateway(self._vertex_gateway)
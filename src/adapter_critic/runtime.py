@@ -3,9 +3,17 @@ from __future__ import annotations
 import time
 import uuid
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from .admission import AdmissionController
+from .circuit_breaker import CircuitBreakerGateway
 from .config import AppConfig
+from .hedging import Hedger
+from .load_balancer import LoadBalancingGateway, replica_pools
+from .metrics import APP_METRICS, AppMetrics, configured_base_urls
+from .response_cache import ResponseCache
+from .stage_cache import StageCache
+from .token_counter import Tokenizer
 from .upstream import UpstreamGateway
 
 
@@ -15,6 +23,13 @@ class RuntimeState:
     gateway: UpstreamGateway
     id_provider: Callable[[], str]
     time_provider: Callable[[], int]
+    response_cache: ResponseCache | None = None
+    stage_cache: StageCache | None = None
+    metrics: AppMetrics = APP_METRICS
+    hedger: Hedger | None = None
+    load_balancer: LoadBalancingGateway | None = None
+    tokenizer: Tokenizer = field(default_factory=Tokenizer)
+    admission: AdmissionController | None = None
 
 
 def default_id_provider() -> str:
@@ -30,10 +45,41 @@ def build_runtime_state(
     gateway: UpstreamGateway,
     id_provider: Callable[[], str] = default_id_provider,
     time_provider: Callable[[], int] = default_time_provider,
+    response_cache: ResponseCache | None = None,
+    stage_cache: StageCache | None = None,
+    metrics: AppMetrics | None = None,
+    hedger: Hedger | None = None,
+    tokenizer: Tokenizer | None = None,
+    admission: AdmissionController | None = None,
 ) -> RuntimeState:
+    metrics = metrics if metrics is not None else APP_METRICS
+    metrics.register_base_urls(configured_base_urls(config))
+    if response_cache is None and config.response_cache is not None:
+        response_cache = ResponseCache.from_config(config.response_cache, metrics)
+    if stage_cache is None and config.stage_cache is not None:
+        stage_cache = StageCache.from_config(config.stage_cache, metrics)
+    load_balancer = gateway if isinstance(gateway, LoadBalancingGateway) else None
+    if load_balancer is None and replica_pools(config):
+        load_balancer = LoadBalancingGateway.from_config(gateway, config)
+        gateway = load_balancer
+    if config.circuit_breaker is not None and not isinstance(gateway, CircuitBreakerGateway):
+        gateway = CircuitBreakerGateway.from_config(gateway, config.circuit_breaker)
+    if hedger is None and any(served.hedging for served in config.served_models.values()):
+        hedger = Hedger(metrics)
+    if tokenizer is None:
+        tokenizer = Tokenizer.from_config(config.tokenizer)
+    if admission is None:
+        admission = AdmissionController.from_config(config, metrics)
     return RuntimeState(
         config=config,
         gateway=gateway,
         id_provider=id_provider,
         time_provider=time_provider,
+        response_cache=response_cache,
+        stage_cache=stage_cache,
+        metrics=metrics,
+        hedger=hedger,
+        load_balancer=load_balancer,
+        tokenizer=tokenizer,
+        admission=admission,
     )
@@ -8,11 +8,14 @@ import uvicorn
 
 from .app import create_app
 from .config import AppConfig
+from .health import collect_health_targets
 from .http_gateway import OpenAICompatibleHttpGateway
-from .logging_setup import configure_logging
+from .logging_setup import configure_logging, shutdown_logging
 from .routing_gateway import RoutingGateway
 from .runtime import build_runtime_state
-from .vertex_gateway import VertexAICompatibleHttpGateway
+from .singleflight_gateway import SingleflightGateway
+from .upstream import UpstreamGateway
+from .vertex_gateway import VertexAICompatibleHttpGateway, is_vertex_anthropic_target
 
 
 def _parse_args() -> argparse.Namespace:
@@ -22,6 +25,21 @@ def _parse_args() -> argparse.Namespace:
     parser.add_argument("--port", type=int, default=8000, help="Bind port")
     parser.add_argument("--api-key-env", default="OPENAI_API_KEY", help="Environment variable name for API key")
     parser.add_argument("--timeout-seconds", type=float, default=120.0, help="Upstream HTTP timeout in seconds")
+    parser.add_argument("--max-connections", type=int, default=100, help="Max pooled connections per upstream base URL")
+    parser.add_argument(
+        "--max-keepalive-connections",
+        type=int,
+        default=20,
+        help="Max idle keep-alive connections per upstream base URL",
+    )
+    parser.add_argument(
+        "--keepalive-expiry-seconds", type=float, default=5.0, help="Idle keep-alive connection expiry in seconds"
+    )
+    parser.add_argument(
+        "--coalesce-upstream-calls",
+        action="store_true",
+        help="Deduplicate concurrent identical upstream completion calls",
+    )
     parser.add_argument("--reload", action="store_true", help="Enable uvicorn reload")
     return parser.parse_args()
 
@@ -38,12 +56,26 @@ def main() -> None:
     openai_gateway = OpenAICompatibleHttpGateway(
         default_api_key_env=args.api_key_env,
         timeout_seconds=args.timeout_seconds,
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_keepalive_connections,
+        keepalive_expiry_seconds=args.keepalive_expiry_seconds,
+        upstream_pools=config.upstream_pools,
+    )
+    openai_gateway.open_pools(
+        target.base_url
+        for target in collect_health_targets(config)
+        if not is_vertex_anthropic_target(model=target.model, base_url=target.base_url)
     )
     vertex_gateway = VertexAICompatibleHttpGateway(timeout_seconds=args.timeout_seconds)
-    gateway = RoutingGateway(openai_gateway=openai_gateway, vertex_gateway=vertex_gateway)
+    gateway: UpstreamGateway = RoutingGateway(openai_gateway=openai_gateway, vertex_gateway=vertex_gateway)
+    if args.coalesce_upstream_calls:
+        gateway = SingleflightGateway(gateway)
     state = build_runtime_state(config=config, gateway=gateway)
     app = create_app(config=config, gateway=gateway, state=state)
-    uvicorn.run(app, host=args.host, port=args.port, reload=args.reload)
+    try:
+        uvicorn.run(app, host=args.host, port=args.port, reload=args.reload)
+    finally:
+        shutdown_logging()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import anyio
+
+from .contracts import ChatMessage
+from .fingerprint import canonical_messages, fingerprint
+from .metrics import APP_METRICS, AppMetrics
+from .upstream import UpstreamDelta, UpstreamGateway, UpstreamResult, close_gateway, hedged_call, start_gateway
+from .usage import CachedStageUsage
+
+
+@dataclass
+class SingleflightStats:
+    leader_calls: int = 0
+    coalesced_calls: int = 0
+
+
+@dataclass
+class _Flight:
+    done: anyio.Event = field(default_factory=anyio.Event)
+    result: UpstreamResult | None = None
+    error: Exception | None = None
+
+
+class SingleflightGateway:
+    def __init__(self, gateway: UpstreamGateway, metrics: AppMetrics | None = None) -> None:
+        self._gateway = gateway
+        self._metrics = metrics if metrics is not None else APP_METRICS
+        self._flights: dict[str, _Flight] = {}
+        self.stats = SingleflightStats()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        key = fingerprint(
+            {
+                "model": model,
+                "base_url": base_url,
+                "api_key_env": api_key_env,
+                "messages": canonical_messages(messages),
+                "request_options": request_options or {},
+                "hedge": hedged_call.get(),
+            }
+        )
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                break
+            self.stats.coalesced_calls += 1
+            self._metrics.singleflight_calls.inc(("coalesced",))
+            await flight.done.wait()
+            if flight.result is not None:
+                return flight.result.model_copy(deep=True, update={"usage": CachedStageUsage()})
+            if flight.error is not None:
+                raise flight.error
+
+        flight = _Flight()
+        self._flights[key] = flight
+        self.stats.leader_calls += 1
+        self._metrics.singleflight_calls.inc(("leader",))
+        try:
+            flight.result = await self._gateway.complete(
+                model=model,
+                base_url=base_url,
+                messages=messages,
+                api_key_env=api_key_env,
+                request_options=request_options,
+            )
+            return flight.result
+        except Exception as exc:
+            flight.error = exc
+            raise
+        finally:
+            del self._flights[key]
+            flight.done.set()
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        async for delta in self._gateway.stream(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        ):
+            yield delta
+
+    async def start(self) -> None:
+        await start_gateway(self._gateway)
+
+    async def aclose(self) -> None:
+        await close_gateway(self._gateway)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from .config import StageCacheConfig, StageTarget
+from .contracts import ChatMessage
+from .fingerprint import canonical_messages, fingerprint
+from .metrics import AppMetrics
+from .upstream import UpstreamResult
+from .usage import CachedStageUsage
+
+
+def stage_cache_key(
+    target: StageTarget,
+    messages: list[ChatMessage],
+    request_options: dict[str, Any] | None = None,
+) -> str:
+    return fingerprint(
+        {
+            "target": target.model_dump(mode="json"),
+            "messages": canonical_messages(messages),
+            "request_options": request_options or {},
+        }
+    )
+
+
+@dataclass
+class StageCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+
+class StageCache:
+    def __init__(self, *, max_entries: int = 1024, metrics: AppMetrics | None = None) -> None:
+        self._max_entries = max_entries
+        self._metrics = metrics
+        self._entries: OrderedDict[str, UpstreamResult] = OrderedDict()
+        self.stats = StageCacheStats()
+
+    @classmethod
+    def from_config(cls, config: StageCacheConfig, metrics: AppMetrics | None = None) -> StageCache:
+        return cls(max_entries=config.max_entries, metrics=metrics)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _record_lookup(self, stage: str, result: str) -> None:
+        if self._metrics is not None:
+            self._metrics.stage_cache_lookups.inc((stage, result))
+
+    def get(self, key: str, *, stage: str) -> UpstreamResult | None:
+        result = self._entries.get(key)
+        if result is None:
+            self.stats.misses += 1
+            self._record_lookup(stage, "miss")
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        self._record_lookup(stage, "hit")
+        return result.model_copy(deep=True, update={"usage": CachedStageUsage()})
+
+    def put(self, key: str, result: UpstreamResult) -> None:
+        self._entries[key] = result.model_copy(deep=True)
+        self._entries.move_to_end(key)
+        self.stats.stores += 1
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
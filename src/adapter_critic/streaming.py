@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .upstream import TokenUsage, UpstreamDelta, UpstreamResult
+
+
+class DeltaAccumulator:
+    def __init__(self) -> None:
+        self._content_parts: list[str] = []
+        self._tool_calls: dict[int, dict[str, Any]] = {}
+        self._finish_reason: str | None = None
+        self._usage = TokenUsage()
+
+    def add(self, delta: UpstreamDelta) -> None:
+        if delta.content != "":
+            self._content_parts.append(delta.content)
+        for position, tool_call_delta in enumerate(delta.tool_calls or []):
+            index_value = tool_call_delta.get("index")
+            index = index_value if isinstance(index_value, int) else position
+            merged = self._tool_calls.setdefault(
+                index,
+                {"id": "", "type": "function", "function": {"name": "", "arguments": ""}},
+            )
+            if isinstance(tool_call_delta.get("id"), str):
+                merged["id"] = tool_call_delta["id"]
+            if isinstance(tool_call_delta.get("type"), str):
+                merged["type"] = tool_call_delta["type"]
+            function_delta = tool_call_delta.get("function")
+            if isinstance(function_delta, dict):
+                if isinstance(function_delta.get("name"), str):
+                    merged["function"]["name"] += function_delta["name"]
+                if isinstance(function_delta.get("arguments"), str):
+                    merged["function"]["arguments"] += function_delta["arguments"]
+        if delta.finish_reason is not None:
+            self._finish_reason = delta.finish_reason
+        if delta.usage is not None:
+            self._usage = delta.usage
+
+    @property
+    def content(self) -> str:
+        return "".join(self._content_parts)
+
+    def result(self) -> UpstreamResult:
+        tool_calls = [self._tool_calls[index] for index in sorted(self._tool_calls)]
+        return UpstreamResult(
+            content=self.content,
+            usage=self._usage,
+            tool_calls=tool_calls if len(tool_calls) > 0 else None,
+            finish_reason=self._finish_reason if self._finish_reason is not None else "stop",
+        )
+
+
+def deltas_from_result(result: UpstreamResult) -> list[UpstreamDelta]:
+    deltas: list[UpstreamDelta] = []
+    if result.content != "":
+        deltas.append(UpstreamDelta(content=result.content))
+    if result.tool_calls is not None and len(result.tool_calls) > 0:
+        deltas.append(
+            UpstreamDelta(
+                tool_calls=[{"index": index, **tool_call} for index, tool_call in enumerate(result.tool_calls)]
+            )
+        )
+    deltas.append(UpstreamDelta(finish_reason=result.finish_reason, usage=result.usage))
+    return deltas
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from typing import Any
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+RECEIVED_AT_SCOPE_KEY = "adapter_critic.received_at"
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+class RequestTimings:
+    def __init__(self, *, started: float | None = None, received_at: float | None = None) -> None:
+        self.started = started if started is not None else time.perf_counter()
+        self.received_at = received_at
+        self.stages: dict[str, list[float]] = {}
+        self.overhead: dict[str, float] = {}
+        self.first_chunk_ms: float | None = None
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        self.stages.setdefault(stage, []).append(_ms(seconds))
+
+    def add_overhead(self, name: str, seconds: float) -> None:
+        self.overhead[name] = round(self.overhead.get(name, 0.0) + _ms(seconds), 3)
+
+    def mark_first_chunk(self) -> float:
+        if self.first_chunk_ms is None:
+            self.first_chunk_ms = _ms(time.perf_counter() - self.started)
+        return self.first_chunk_ms
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_overhead(name, time.perf_counter() - started)
+
+    def as_payload(self) -> dict[str, Any]:
+        return {
+            "total_ms": _ms(time.perf_counter() - self.started),
+            "queueing_ms": _ms(self.started - self.received_at) if self.received_at is not None else None,
+            "first_chunk_ms": self.first_chunk_ms,
+            "stages": {stage: list(durations) for stage, durations in self.stages.items()},
+            "overhead": dict(self.overhead),
+        }
+
+
+def measure(timings: RequestTimings | None, name: str) -> AbstractContextManager[None]:
+    return timings.measure(name) if timings is not None else nullcontext()
+
+
+class ReceivedAtMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            scope[RECEIVED_AT_SCOPE_KEY] = time.perf_counter()
+        await self.app(scope, receive, send)
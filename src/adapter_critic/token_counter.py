@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+from loguru import logger
+
+from .contracts import ChatMessage
+from .json_codec import dumps, dumps_str
+
+if TYPE_CHECKING:
+    from .config import TokenizerConfig
+
+try:
+    import tiktoken
+    from tiktoken.load import load_tiktoken_bpe
+except ImportError:
+    HAS_TIKTOKEN = False
+else:
+    HAS_TIKTOKEN = True
+
+MESSAGE_OVERHEAD_TOKENS = 4
+CL100K_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|"""
+    r"""\s+(?!\S)|\s"""
+)
+
+
+class TokenCounter(Protocol):
+    def count_text(self, text: str) -> int: ...
+
+    def truncate_text(self, text: str, max_tokens: int) -> str: ...
+
+
+class ApproxTokenCounter:
+    exact = False
+
+    def __init__(self, *, chars_per_token: int = 4) -> None:
+        self.chars_per_token = chars_per_token
+
+    def count_text(self, text: str) -> int:
+        return (len(text) + self.chars_per_token - 1) // self.chars_per_token
+
+    def truncate_text(self, text: str, max_tokens: int) -> str:
+        return text[: max(0, max_tokens) * self.chars_per_token]
+
+
+class BpeTokenCounter:
+    exact = True
+
+    def __init__(self, encoding: tiktoken.Encoding) -> None:
+        self._encoding = encoding
+
+    @classmethod
+    def from_file(cls, path: str, *, pattern: str = CL100K_PATTERN) -> BpeTokenCounter:
+        encoding = tiktoken.Encoding(
+            name=Path(path).stem,
+            pat_str=pattern,
+            mergeable_ranks=load_tiktoken_bpe(path),
+            special_tokens={},
+        )
+        return cls(encoding)
+
+    def count_text(self, text: str) -> int:
+        return len(self._encoding.encode_ordinary(text))
+
+    def truncate_text(self, text: str, max_tokens: int) -> str:
+        tokens = self._encoding.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return self._encoding.decode(tokens[: max(0, max_tokens)])
+
+
+def count_message_tokens(message: ChatMessage, counter: TokenCounter) -> int:
+    total = MESSAGE_OVERHEAD_TOKENS + counter.count_text(message.content or "")
+    extra = message.model_extra
+    if extra:
+        total += counter.count_text(dumps_str(extra))
+    return total
+
+
+@dataclass
+class TokenCountStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class Tokenizer:
+    def __init__(self, counter: TokenCounter | None = None, *, cache_entries: int = 0) -> None:
+        self.counter: TokenCounter = counter if counter is not None else ApproxTokenCounter()
+        self._cache_entries = cache_entries
+        self._message_counts: OrderedDict[bytes, int] = OrderedDict()
+        self.stats = TokenCountStats()
+
+    @classmethod
+    def from_config(cls, config: TokenizerConfig) -> Tokenizer:
+        if config.bpe_file is None:
+            return cls()
+        if not HAS_TIKTOKEN:
+            logger.warning("tokenizer bpe_file={} ignored: tiktoken is not installed; using chars/4", config.bpe_file)
+            return cls()
+        pattern = config.pattern if config.pattern is not None else CL100K_PATTERN
+        return cls(BpeTokenCounter.from_file(config.bpe_file, pattern=pattern), cache_entries=config.cache_entries)
+
+    def __len__(self) -> int:
+        return len(self._message_counts)
+
+    @property
+    def exact(self) -> bool:
+        return getattr(self.counter, "exact", False) is True
+
+    def count_text(self, text: str) -> int:
+        return self.counter.count_text(text)
+
+    def truncate_text(self, text: str, max_tokens: int) -> str:
+        return self.counter.truncate_text(text, max_tokens)
+
+    def count_message(self, message: ChatMessage) -> int:
+        if self._cache_entries == 0:
+            return count_message_tokens(message, self.counter)
+        key_payload: list[Any] = [message.role, message.content, message.model_extra]
+        key = hashlib.blake2b(dumps(key_payload), digest_size=16).digest()
+        count = self._message_counts.get(key)
+        if count is not None:
+            self._message_counts.move_to_end(key)
+            self.stats.hits += 1
+            return count
+        self.stats.misses += 1
+        count = count_message_tokens(message, self.counter)
+        self._message_counts[key] = count
+        if len(self._message_counts) > self._cache_entries:
+            self._message_counts.popitem(last=False)
+        return count
+
+    def count_messages(self, messages: list[ChatMessage]) -> int:
+        return sum(self.count_message(message) for message in messages)
+
+    def count_prompt(self, messages: list[ChatMessage], request_options: dict[str, Any] | None = None) -> int:
+        total = self.count_messages(messages)
+        tools = (request_options or {}).get("tools")
+        if tools:
+            total += self.count_text(dumps_str(tools))
+        return total
+
+    def clear(self) -> None:
+        self._message_counts.clear()
+
+
+DEFAULT_TOKENIZER = Tokenizer()
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from contextvars import ContextVar
 from typing import Any, Protocol
+from urllib.parse import urlsplit, urlunsplit
 
 from pydantic import BaseModel
 
@@ -20,6 +23,31 @@ class UpstreamResult(BaseModel):
     finish_reason: str = "stop"
 
 
+class UpstreamDelta(BaseModel):
+    content: str = ""
+    tool_calls: list[dict[str, Any]] | None = None
+    finish_reason: str | None = None
+    usage: TokenUsage | None = None
+
+
+hedged_call: ContextVar[bool] = ContextVar("adapter_critic_hedged_call", default=False)
+
+
+def normalize_base_url(base_url: str) -> str:
+    parsed = urlsplit(base_url.strip().rstrip("/"))
+    return urlunsplit((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path, parsed.query, ""))
+
+
+class UpstreamUnavailableError(Exception):
+    status_code = 503
+
+    def __init__(self, message: str, *, model: str, base_url: str, retry_after_seconds: float) -> None:
+        super().__init__(message)
+        self.model = model
+        self.base_url = base_url
+        self.retry_after_seconds = retry_after_seconds
+
+
 class UpstreamGateway(Protocol):
     async def complete(
         self,
@@ -30,3 +58,33 @@ class UpstreamGateway(Protocol):
         api_key_env: str | None = None,
         request_options: dict[str, Any] | None = None,
     ) -> UpstreamResult: ...
+
+    def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]: ...
+
+
+def stage_gateway(gateway: UpstreamGateway, stage: str) -> UpstreamGateway:
+    for_stage = getattr(gateway, "for_stage", None)
+    if callable(for_stage):
+        staged: UpstreamGateway = for_stage(stage)
+        return staged
+    return gateway
+
+
+async def start_gateway(gateway: object) -> None:
+    start = getattr(gateway, "start", None)
+    if callable(start):
+        await start()
+
+
+async def close_gateway(gateway: object) -> None:
+    aclose = getattr(gateway, "aclose", None)
+    if callable(aclose):
+        await aclose()
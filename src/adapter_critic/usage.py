@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import BaseModel
 
 from .upstream import TokenUsage
 
 
+class CachedStageUsage(TokenUsage):
+    cached: Literal[True] = True
+
+
 class TokenBreakdown(BaseModel):
     stages: dict[str, TokenUsage]
     total: TokenUsage
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
 from typing import Any
 from urllib.parse import urlparse, urlunparse
 
+import anyio
 from anthropic import AsyncAnthropicVertex
 from loguru import logger
 
 from .contracts import ChatMessage
 from .http_gateway import UpstreamResponseFormatError
-from .upstream import TokenUsage, UpstreamResult
+from .logging_setup import LazyLogArg
+from .upstream import TokenUsage, UpstreamDelta, UpstreamResult
 
 
 def _payload_preview(payload: Any, *, max_chars: int | None = 400) -> str:
@@ -28,6 +34,10 @@ def _as_log_payload(payload: Any) -> Any:
     return payload
 
 
+def _response_preview(response: Any) -> str:
+    return _payload_preview(_as_log_payload(response), max_chars=2000)
+
+
 def _value_get(payload: Any, key: str, default: Any = None) -> Any:
     if isinstance(payload, dict):
         return payload.get(key, default)
@@ -266,6 +276,35 @@ def _map_request_options(request_options: dict[str, Any] | None) -> dict[str, An
     return mapped
 
 
+def _build_create_kwargs(
+    *,
+    normalized_model: str,
+    messages: list[ChatMessage],
+    request_options: dict[str, Any] | None,
+) -> dict[str, Any]:
+    anthropic_messages: list[dict[str, Any]] = []
+    for message in messages:
+        mapped_message = _message_to_vertex_content(message)
+        if mapped_message is not None:
+            anthropic_messages.append(mapped_message)
+
+    mapped_request_options = _map_request_options(request_options)
+    create_kwargs: dict[str, Any] = {
+        "model": normalized_model,
+        "messages": anthropic_messages,
+        "max_tokens": int(mapped_request_options.get("max_tokens", 8192)),
+    }
+
+    system_prompt = _extract_system_prompt(messages)
+    if system_prompt != "":
+        create_kwargs["system"] = system_prompt
+
+    for key, value in mapped_request_options.items():
+        if key != "max_tokens":
+            create_kwargs[key] = value
+    return create_kwargs
+
+
 def _map_finish_reason(stop_reason: Any) -> str:
     if stop_reason == "tool_use":
         return "tool_calls"
@@ -292,17 +331,181 @@ def _map_usage(usage: Any) -> TokenUsage:
     )
 
 
+class _VertexStreamMapper:
+    def __init__(self) -> None:
+        self._prompt_tokens = 0
+        self._tool_index_by_block: dict[int, int] = {}
+        self._blocks_with_arguments: set[int] = set()
+
+    def map_event(self, event: Any) -> UpstreamDelta | None:
+        event_type = _value_get(event, "type")
+        block_index = _safe_int(_value_get(event, "index"))
+
+        if event_type == "message_start":
+            usage = _value_get(_value_get(event, "message"), "usage")
+            self._prompt_tokens = _safe_int(_value_get(usage, "input_tokens", 0))
+            return None
+
+        if event_type == "content_block_start":
+            block = _value_get(event, "content_block")
+            if _value_get(block, "type") != "tool_use":
+                return None
+            tool_index = len(self._tool_index_by_block)
+            self._tool_index_by_block[block_index] = tool_index
+            return UpstreamDelta(
+                tool_calls=[
+                    {
+                        "index": tool_index,
+                        "id": _value_get(block, "id"),
+                        "type": "function",
+                        "function": {"name": _value_get(block, "name"), "arguments": ""},
+                    }
+                ]
+            )
+
+        if event_type == "content_block_delta":
+            delta = _value_get(event, "delta")
+            delta_type = _value_get(delta, "type")
+            if delta_type == "text_delta":
+                text_value = _value_get(delta, "text")
+                return UpstreamDelta(content=text_value) if isinstance(text_value, str) else None
+            if delta_type == "input_json_delta" and block_index in self._tool_index_by_block:
+                partial_json = _value_get(delta, "partial_json")
+                if not isinstance(partial_json, str) or partial_json == "":
+                    return None
+                self._blocks_with_arguments.add(block_index)
+                return UpstreamDelta(
+                    tool_calls=[
+                        {"index": self._tool_index_by_block[block_index], "function": {"arguments": partial_json}}
+                    ]
+                )
+            return None
+
+        if event_type == "content_block_stop":
+            if block_index in self._tool_index_by_block and block_index not in self._blocks_with_arguments:
+                return UpstreamDelta(
+                    tool_calls=[{"index": self._tool_index_by_block[block_index], "function": {"arguments": "{}"}}]
+                )
+            return None
+
+        if event_type == "message_delta":
+            completion_tokens = _safe_int(_value_get(_value_get(event, "usage"), "output_tokens", 0))
+            return UpstreamDelta(
+                finish_reason=_map_finish_reason(_value_get(_value_get(event, "delta"), "stop_reason")),
+                usage=TokenUsage(
+                    prompt_tokens=self._prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    total_tokens=self._prompt_tokens + completion_tokens,
+                ),
+            )
+
+        return None
+
+
+def _credentials_need_refresh(credentials: Any, *, margin_seconds: float) -> bool:
+    if not getattr(credentials, "token", None):
+        return True
+    expiry = getattr(credentials, "expiry", None)
+    if not isinstance(expiry, datetime):
+        return False
+    now = datetime.now(UTC).replace(tzinfo=None)
+    return expiry - now <= timedelta(seconds=margin_seconds)
+
+
+def _refresh_google_credentials(credentials: Any) -> None:
+    from google.auth.transport.requests import Request
+
+    credentials.refresh(Request())
+
+
 def _is_vertex_empty_assistant_edge_case(*, content: str, tool_calls: list[dict[str, Any]], stop_reason: Any) -> bool:
     return content == "" and len(tool_calls) == 0 and stop_reason == "end_turn"
 
 
+VertexClientKey = tuple[str, str, str, float]
+
+
 class VertexAICompatibleHttpGateway:
     def __init__(
         self,
         *,
         timeout_seconds: float = 120.0,
+        credential_refresh_interval_seconds: float = 60.0,
+        credential_refresh_margin_seconds: float = 300.0,
     ) -> None:
         self._timeout_seconds = timeout_seconds
+        self._credential_refresh_interval_seconds = credential_refresh_interval_seconds
+        self._credential_refresh_margin_seconds = credential_refresh_margin_seconds
+        self._clients: dict[VertexClientKey, AsyncAnthropicVertex] = {}
+        self._refresh_task: asyncio.Task[None] | None = None
+
+    def _shared_credentials(self) -> Any:
+        for client in self._clients.values():
+            if client.credentials is not None:
+                return client.credentials
+        return None
+
+    def _client_for(self, *, client_base_url: str, project_id: str, region: str) -> AsyncAnthropicVertex:
+        key: VertexClientKey = (client_base_url, project_id, region, self._timeout_seconds)
+        client = self._clients.get(key)
+        if client is None or client.is_closed():
+            client = AsyncAnthropicVertex(
+                region=region,
+                project_id=project_id,
+                base_url=client_base_url,
+                timeout=self._timeout_seconds,
+                credentials=self._shared_credentials(),
+            )
+            self._clients[key] = client
+            logger.debug(
+                "opened vertex anthropic client client_base_url={} region={} project_id={}",
+                client_base_url,
+                region,
+                project_id,
+            )
+        return client
+
+    async def refresh_credentials(self) -> int:
+        refreshed = 0
+        seen: set[int] = set()
+        for client in list(self._clients.values()):
+            credentials = client.credentials
+            if credentials is None or id(credentials) in seen:
+                continue
+            seen.add(id(credentials))
+            if not _credentials_need_refresh(credentials, margin_seconds=self._credential_refresh_margin_seconds):
+                continue
+            try:
+                await anyio.to_thread.run_sync(_refresh_google_credentials, credentials)
+            except Exception as exc:
+                logger.warning(
+                    "vertex credential refresh failed error_type={} detail={}",
+                    type(exc).__name__,
+                    str(exc),
+                )
+                continue
+            refreshed += 1
+        return refreshed
+
+    async def _refresh_credentials_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._credential_refresh_interval_seconds)
+            await self.refresh_credentials()
+
+    async def start(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_credentials_loop())
+
+    async def aclose(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresh_task
+            self._refresh_task = None
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.close()
 
     async def complete(
         self,
@@ -320,26 +523,12 @@ class VertexAICompatibleHttpGateway:
             base_url=base_url,
         )
 
-        anthropic_messages: list[dict[str, Any]] = []
-        for message in messages:
-            mapped_message = _message_to_vertex_content(message)
-            if mapped_message is not None:
-                anthropic_messages.append(mapped_message)
-
-        mapped_request_options = _map_request_options(request_options)
-        create_kwargs: dict[str, Any] = {
-            "model": normalized_model,
-            "messages": anthropic_messages,
-            "max_tokens": int(mapped_request_options.get("max_tokens", 8192)),
-        }
-
-        system_prompt = _extract_system_prompt(messages)
-        if system_prompt != "":
-            create_kwargs["system"] = system_prompt
-
-        for key, value in mapped_request_options.items():
-            if key != "max_tokens":
-                create_kwargs[key] = value
+        create_kwargs = _build_create_kwargs(
+            normalized_model=normalized_model,
+            messages=messages,
+            request_options=request_options,
+        )
+        anthropic_messages: list[dict[str, Any]] = create_kwargs["messages"]
 
         logger.debug(
             "vertex anthropic request model={} client_base_url={} region={} project_id={} message_count={} payload={}",
@@ -348,23 +537,14 @@ class VertexAICompatibleHttpGateway:
             region,
             project_id,
             len(anthropic_messages),
-            _payload_preview(create_kwargs),
+            LazyLogArg(_payload_preview, create_kwargs),
         )
 
-        client_kwargs: dict[str, Any] = {
-            "region": region,
-            "project_id": project_id,
-            "base_url": client_base_url,
-            "timeout": self._timeout_seconds,
-        }
-
-        async def _run_request(kwargs: dict[str, Any]) -> Any:
-            async with AsyncAnthropicVertex(**kwargs) as client:
-                return await client.messages.create(**create_kwargs)
+        client = self._client_for(client_base_url=client_base_url, project_id=project_id, region=region)
 
         max_empty_assistant_attempts = 2
         for attempt in range(1, max_empty_assistant_attempts + 1):
-            response = await _run_request(client_kwargs)
+            response = await client.messages.create(**create_kwargs)
 
             logger.debug(
                 "vertex anthropic raw response model={} client_base_url={} attempt={}/{} payload={}",
@@ -372,7 +552,7 @@ class VertexAICompatibleHttpGateway:
                 client_base_url,
                 attempt,
                 max_empty_assistant_attempts,
-                _payload_preview(_as_log_payload(response), max_chars=2000),
+                LazyLogArg(_response_preview, response),
             )
 
             content_value = _value_get(response, "content")
@@ -493,3 +673,42 @@ class VertexAICompatibleHttpGateway:
             )
 
         raise RuntimeError("unreachable: max_empty_assistant_attempts exhausted")
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        del api_key_env
+
+        client_base_url, project_id, region, normalized_model = _resolve_vertex_client_config(
+            model=model,
+            base_url=base_url,
+        )
+        create_kwargs = _build_create_kwargs(
+            normalized_model=normalized_model,
+            messages=messages,
+            request_options=request_options,
+        )
+
+        logger.debug(
+            "vertex anthropic stream request model={} client_base_url={} region={} project_id={} message_count={}",
+            normalized_model,
+            client_base_url,
+            region,
+            project_id,
+            len(create_kwargs["messages"]),
+        )
+
+        client = self._client_for(client_base_url=client_base_url, project_id=project_id, region=region)
+        mapper = _VertexStreamMapper()
+        event_stream = await client.messages.create(**create_kwargs, stream=True)
+        async with event_stream:
+            async for event in event_stream:
+                delta = mapper.map_event(event)
+                if delta is not None:
+                    yield delta
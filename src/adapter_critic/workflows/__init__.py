@@ -1,6 +1,16 @@
-from .adapter import run_adapter
-from .advisor import run_advisor
-from .critic import run_critic
-from .direct import run_direct
+from .adapter import run_adapter, stream_adapter
+from .advisor import run_advisor, run_parallel_advisor, stream_advisor
+from .critic import run_critic, stream_critic
+from .direct import run_direct, stream_direct
 
-__all__ = ["run_direct", "run_adapter", "run_critic", "run_advisor"]
+__all__ = [
+    "run_direct",
+    "run_adapter",
+    "run_critic",
+    "run_advisor",
+    "run_parallel_advisor",
+    "stream_direct",
+    "stream_adapter",
+    "stream_critic",
+    "stream_advisor",
+]
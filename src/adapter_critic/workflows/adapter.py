@@ -1,16 +1,38 @@
 from __future__ import annotations
 
 import json
+import time
+from collections.abc import AsyncIterator
 from copy import deepcopy
 from typing import Any
 
+from pydantic import BaseModel, Field
+
 from ..config import RuntimeConfig
 from ..contracts import ChatMessage
+from ..deadlines import Deadline, budget_skip_reason, stage_allowed, stage_scope
 from ..edits import apply_adapter_output_to_draft, build_adapter_draft_payload
-from ..prompts import ADAPTER_RESPONSE_FORMAT, build_adapter_messages
-from ..response_shape import has_valid_tool_calls, infer_finish_reason, normalize_tool_calls
-from ..upstream import TokenUsage, UpstreamGateway
-from .direct import WorkflowOutput
+from ..prompts import ADAPTER_RESPONSE_FORMAT, build_adapter_messages, fit_history
+from ..response_shape import (
+    candidate_rejection_reason,
+    infer_finish_reason,
+    normalize_tool_calls,
+    requires_tool_call,
+)
+from ..stage_cache import StageCache, stage_cache_key
+from ..streaming import DeltaAccumulator, deltas_from_result
+from ..timings import RequestTimings, measure
+from ..token_counter import Tokenizer
+from ..upstream import (
+    TokenUsage,
+    UpstreamDelta,
+    UpstreamGateway,
+    UpstreamResult,
+    UpstreamUnavailableError,
+    stage_gateway,
+)
+from ..usage import CachedStageUsage
+from .direct import WorkflowEvent, WorkflowOutput, elapsed_ms
 
 
 def _add_usage(total: TokenUsage, current: TokenUsage) -> TokenUsage:
@@ -21,127 +43,260 @@ def _add_usage(total: TokenUsage, current: TokenUsage) -> TokenUsage:
     )
 
 
-def _adapter_candidate_rejection_reason(
-    *,
-    content: str,
-    tool_calls: list[dict[str, Any]] | None,
-    require_call: bool,
-) -> str | None:
-    normalized_tool_calls = normalize_tool_calls(tool_calls)
-    has_call = normalized_tool_calls is not None
-    if normalized_tool_calls is not None and not has_valid_tool_calls(normalized_tool_calls):
-        return "tool_calls must have OpenAI function shape with JSON-object arguments"
-    if content == "" and not has_call:
-        return "assistant message has empty content and no calls"
-    if require_call and not has_call:
-        return "request requires a tool call"
-    return None
-
-
-def _requires_tool_call(request_options: dict[str, Any]) -> bool:
-    tool_choice = request_options.get("tool_choice")
-    if tool_choice == "required":
-        return True
-    if isinstance(tool_choice, dict):
-        return tool_choice.get("type") == "function"
-    return False
+class _AdapterReview(BaseModel):
+    final_text: str
+    final_tool_calls: list[dict[str, Any]] | None
+    adapter_output: str = ""
+    adapter_usage: TokenUsage = Field(default_factory=TokenUsage)
+    accepted_candidate: bool = False
+    rejection_reason: str | None = None
+    context_budget: str | None = None
 
 
-async def run_adapter(
+async def _review_draft(
     runtime: RuntimeConfig,
     messages: list[ChatMessage],
     gateway: UpstreamGateway,
     request_options: dict[str, Any],
-) -> WorkflowOutput:
+    api_draft: UpstreamResult,
+    api_tool_calls: list[dict[str, Any]] | None,
+    stage_cache: StageCache | None = None,
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> _AdapterReview:
     if runtime.adapter is None:
         raise ValueError("adapter runtime is missing adapter target")
 
-    api_draft = await gateway.complete(
-        model=runtime.api.model,
-        base_url=runtime.api.base_url,
-        messages=messages,
-        api_key_env=runtime.api.api_key_env,
-        request_options=request_options,
-    )
-    api_tool_calls = normalize_tool_calls(api_draft.tool_calls)
-    requested_requires_call = _requires_tool_call(request_options)
-
-    draft_payload = build_adapter_draft_payload(
-        content=api_draft.content,
-        tool_calls=api_tool_calls,
-    )
+    requested_requires_call = requires_tool_call(request_options)
 
-    adapter_messages = build_adapter_messages(
-        messages=messages,
-        draft=draft_payload,
-        adapter_system_prompt=runtime.adapter_system_prompt,
-        request_options=request_options,
-    )
-    adapter_usage = TokenUsage()
-    adapter_output = ""
+    with measure(timings, "prompt_rendering"):
+        draft_payload = build_adapter_draft_payload(
+            content=api_draft.content,
+            tool_calls=api_tool_calls,
+        )
+        history, history_fit = fit_history(messages, runtime.adapter.context_budget, tokenizer)
+        adapter_messages = build_adapter_messages(
+            messages=history,
+            draft=draft_payload,
+            adapter_system_prompt=runtime.adapter_system_prompt,
+            request_options=request_options,
+            layout=runtime.prompt_layout,
+        )
     adapter_request_options = {"response_format": deepcopy(ADAPTER_RESPONSE_FORMAT)}
-    adapter_rejection_reason: str | None = None
+    review = _AdapterReview(
+        final_text=api_draft.content,
+        final_tool_calls=api_tool_calls,
+        context_budget=history_fit.telemetry() if history_fit is not None else None,
+    )
 
-    final_text = api_draft.content
-    final_tool_calls = api_tool_calls
-    accepted_candidate = False
+    cache_key: str | None = None
+    if stage_cache is not None:
+        cache_key = stage_cache_key(runtime.adapter, adapter_messages, adapter_request_options)
 
     max_attempts = runtime.max_adapter_retries + 1
-    for _ in range(max_attempts):
-        adapter_review = await gateway.complete(
-            model=runtime.adapter.model,
-            base_url=runtime.adapter.base_url,
-            messages=adapter_messages,
-            api_key_env=runtime.adapter.api_key_env,
-            request_options=adapter_request_options,
-        )
-        adapter_usage = _add_usage(adapter_usage, adapter_review.usage)
-        adapter_output = adapter_review.content
+    for attempt in range(max_attempts):
+        cached_review: UpstreamResult | None = None
+        if stage_cache is not None and cache_key is not None and attempt == 0:
+            cached_review = stage_cache.get(cache_key, stage="adapter")
+        if cached_review is not None:
+            adapter_review = cached_review
+            review.adapter_usage = CachedStageUsage()
+        else:
+            if not stage_allowed(deadline):
+                review.rejection_reason = budget_skip_reason("adapter")
+                break
+            adapter_call: UpstreamResult | None = None
+            try:
+                with stage_scope(deadline):
+                    adapter_call = await stage_gateway(gateway, "adapter").complete(
+                        model=runtime.adapter.model,
+                        base_url=runtime.adapter.base_url,
+                        messages=adapter_messages,
+                        api_key_env=runtime.adapter.api_key_env,
+                        request_options=adapter_request_options,
+                    )
+            except UpstreamUnavailableError as exc:
+                review.rejection_reason = f"adapter skipped: {exc}"
+                break
+            if adapter_call is None:
+                review.rejection_reason = budget_skip_reason("adapter")
+                break
+            adapter_review = adapter_call
+            review.adapter_usage = _add_usage(review.adapter_usage, adapter_review.usage)
+        review.adapter_output = adapter_review.content
         try:
-            candidate_text, candidate_tool_calls = apply_adapter_output_to_draft(
-                content=api_draft.content,
-                tool_calls=api_tool_calls,
-                adapter_output=adapter_review.content,
-            )
+            with measure(timings, "patch_application"):
+                candidate_text, candidate_tool_calls = apply_adapter_output_to_draft(
+                    content=api_draft.content,
+                    tool_calls=api_tool_calls,
+                    adapter_output=adapter_review.content,
+                )
         except ValueError as exc:
-            adapter_rejection_reason = f"adapter patch rejected: {exc}"
+            review.rejection_reason = f"adapter patch rejected: {exc}"
             continue
 
         candidate_tool_calls = normalize_tool_calls(candidate_tool_calls)
-        rejection_reason = _adapter_candidate_rejection_reason(
+        rejection_reason = candidate_rejection_reason(
             content=candidate_text,
             tool_calls=candidate_tool_calls,
             require_call=requested_requires_call,
         )
         if rejection_reason is not None:
-            adapter_rejection_reason = f"adapter candidate rejected: {rejection_reason}"
+            review.rejection_reason = f"adapter candidate rejected: {rejection_reason}"
             continue
 
-        final_text = candidate_text
-        final_tool_calls = candidate_tool_calls
-        accepted_candidate = True
-        adapter_rejection_reason = None
+        review.final_text = candidate_text
+        review.final_tool_calls = candidate_tool_calls
+        review.accepted_candidate = True
+        review.rejection_reason = None
+        if stage_cache is not None and cache_key is not None and cached_review is None:
+            stage_cache.put(cache_key, adapter_review)
         break
 
+    return review
+
+
+def _adapter_output(
+    api_draft: UpstreamResult,
+    api_tool_calls: list[dict[str, Any]] | None,
+    review: _AdapterReview,
+) -> WorkflowOutput:
     finish_reason = infer_finish_reason(
         "stop",
-        tool_calls=final_tool_calls,
+        tool_calls=review.final_tool_calls,
     )
 
     intermediate = {
         "api_draft": api_draft.content,
-        "adapter": adapter_output,
-        "final": final_text,
+        "adapter": review.adapter_output,
+        "final": review.final_text,
     }
     if api_tool_calls is not None:
         intermediate["api_draft_tool_calls"] = json.dumps(api_tool_calls, sort_keys=True)
-    if not accepted_candidate and adapter_rejection_reason is not None:
-        intermediate["adapter_rejection_reason"] = adapter_rejection_reason
+    if not review.accepted_candidate and review.rejection_reason is not None:
+        intermediate["adapter_rejection_reason"] = review.rejection_reason
+    if review.context_budget is not None:
+        intermediate["adapter_context_budget"] = review.context_budget
 
     return WorkflowOutput(
-        final_text=final_text,
+        final_text=review.final_text,
         intermediate=intermediate,
-        stage_usage={"api": api_draft.usage, "adapter": adapter_usage},
-        final_tool_calls=final_tool_calls,
+        stage_usage={"api": api_draft.usage, "adapter": review.adapter_usage},
+        final_tool_calls=review.final_tool_calls,
         finish_reason=finish_reason,
     )
+
+
+async def run_adapter(
+    runtime: RuntimeConfig,
+    messages: list[ChatMessage],
+    gateway: UpstreamGateway,
+    request_options: dict[str, Any],
+    stage_cache: StageCache | None = None,
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> WorkflowOutput:
+    if runtime.adapter is None:
+        raise ValueError("adapter runtime is missing adapter target")
+
+    api_draft = await stage_gateway(gateway, "api").complete(
+        model=runtime.api.model,
+        base_url=runtime.api.base_url,
+        messages=messages,
+        api_key_env=runtime.api.api_key_env,
+        request_options=request_options,
+    )
+    api_tool_calls = normalize_tool_calls(api_draft.tool_calls)
+    review = await _review_draft(
+        runtime,
+        messages,
+        gateway,
+        request_options,
+        api_draft,
+        api_tool_calls,
+        stage_cache=stage_cache,
+        timings=timings,
+        deadline=deadline,
+        tokenizer=tokenizer,
+    )
+    return _adapter_output(api_draft, api_tool_calls, review)
+
+
+async def stream_adapter(
+    runtime: RuntimeConfig,
+    messages: list[ChatMessage],
+    gateway: UpstreamGateway,
+    request_options: dict[str, Any],
+    stage_cache: StageCache | None = None,
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> AsyncIterator[WorkflowEvent]:
+    if runtime.adapter is None:
+        raise ValueError("adapter runtime is missing adapter target")
+
+    started = time.perf_counter()
+    buffered_draft: list[UpstreamDelta] = []
+    accumulator = DeltaAccumulator()
+    async for delta in stage_gateway(gateway, "api").stream(
+        model=runtime.api.model,
+        base_url=runtime.api.base_url,
+        messages=messages,
+        api_key_env=runtime.api.api_key_env,
+        request_options=request_options,
+    ):
+        accumulator.add(delta)
+        buffered_draft.append(delta)
+    api_draft = accumulator.result()
+    api_tool_calls = normalize_tool_calls(api_draft.tool_calls)
+    draft_ms = elapsed_ms(started)
+
+    adapter_started = time.perf_counter()
+    review = await _review_draft(
+        runtime,
+        messages,
+        gateway,
+        request_options,
+        api_draft,
+        api_tool_calls,
+        stage_cache=stage_cache,
+        timings=timings,
+        deadline=deadline,
+        tokenizer=tokenizer,
+    )
+    adapter_ms = elapsed_ms(adapter_started)
+    release_ms = runtime.adapter_speculative_release_ms
+    lgtm = (
+        review.accepted_candidate
+        and review.final_text == api_draft.content
+        and review.final_tool_calls == api_tool_calls
+    )
+    release = "early" if lgtm and (release_ms is None or adapter_ms <= release_ms) else "verdict"
+
+    output = _adapter_output(api_draft, api_tool_calls, review)
+    first_chunk_ms = elapsed_ms(started)
+    if release == "early":
+        for delta in buffered_draft:
+            yield delta
+    else:
+        final_result = UpstreamResult(
+            content=review.final_text,
+            usage=TokenUsage(),
+            tool_calls=review.final_tool_calls,
+            finish_reason=output.finish_reason,
+        )
+        for delta in deltas_from_result(final_result):
+            yield delta
+
+    output.intermediate["adapter_speculation"] = json.dumps(
+        {
+            "release": release,
+            "draft_ms": draft_ms,
+            "adapter_ms": adapter_ms,
+            "first_chunk_ms": first_chunk_ms,
+        },
+        sort_keys=True,
+    )
+    yield output
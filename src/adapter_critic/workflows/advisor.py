@@ -1,57 +1,285 @@
 from __future__ import annotations
 
+import json
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 
+import anyio
+from pydantic import BaseModel
+
 from ..config import RuntimeConfig
 from ..contracts import ChatMessage
-from ..prompts import append_advisor_guidance_to_last_user_message, build_advisor_messages
-from ..upstream import UpstreamGateway
-from .direct import WorkflowOutput
+from ..deadlines import Deadline, budget_skip_reason, stage_allowed, stage_scope
+from ..prompts import append_advisor_guidance_to_last_user_message, build_advisor_messages, fit_history
+from ..response_shape import candidate_rejection_reason, normalize_tool_calls, requires_tool_call
+from ..streaming import DeltaAccumulator
+from ..timings import RequestTimings, measure
+from ..token_counter import Tokenizer
+from ..upstream import TokenUsage, UpstreamGateway, UpstreamResult, UpstreamUnavailableError, stage_gateway
+from .direct import WorkflowEvent, WorkflowOutput, elapsed_ms
 
 
-async def run_advisor(
+class _AdvisorStage(BaseModel):
+    feedback: UpstreamResult
+    api_messages: list[ChatMessage]
+    skipped_reason: str | None = None
+    context_budget: str | None = None
+
+
+async def _run_advisor_stage(
     runtime: RuntimeConfig,
     messages: list[ChatMessage],
     gateway: UpstreamGateway,
     request_options: dict[str, Any],
-) -> WorkflowOutput:
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> _AdvisorStage:
     if runtime.advisor is None:
         raise ValueError("advisor runtime is missing advisor target")
 
-    advisor_messages = build_advisor_messages(
-        messages=messages,
-        advisor_system_prompt=runtime.advisor_system_prompt,
-        request_options=request_options,
-    )
-    advisor_feedback = await gateway.complete(
-        model=runtime.advisor.model,
-        base_url=runtime.advisor.base_url,
-        messages=advisor_messages,
-        api_key_env=runtime.advisor.api_key_env,
+    skipped = _AdvisorStage(
+        feedback=UpstreamResult(content="", usage=TokenUsage()),
+        api_messages=messages,
+        skipped_reason=budget_skip_reason("advisor"),
     )
+    if not stage_allowed(deadline, reserve_stages=1):
+        return skipped
 
-    api_messages = append_advisor_guidance_to_last_user_message(
-        messages=messages,
-        advisor_guidance=advisor_feedback.content,
-    )
-    api_response = await gateway.complete(
-        model=runtime.api.model,
-        base_url=runtime.api.base_url,
-        messages=api_messages,
-        api_key_env=runtime.api.api_key_env,
-        request_options=request_options,
+    with measure(timings, "prompt_rendering"):
+        history, history_fit = fit_history(messages, runtime.advisor.context_budget, tokenizer)
+        advisor_messages = build_advisor_messages(
+            messages=history,
+            advisor_system_prompt=runtime.advisor_system_prompt,
+            request_options=request_options,
+        )
+    advisor_feedback: UpstreamResult | None = None
+    try:
+        with stage_scope(deadline, reserve_stages=1):
+            advisor_feedback = await stage_gateway(gateway, "advisor").complete(
+                model=runtime.advisor.model,
+                base_url=runtime.advisor.base_url,
+                messages=advisor_messages,
+                api_key_env=runtime.advisor.api_key_env,
+            )
+    except UpstreamUnavailableError as exc:
+        return skipped.model_copy(update={"skipped_reason": f"advisor skipped: {exc}"})
+    if advisor_feedback is None:
+        return skipped
+
+    with measure(timings, "prompt_rendering"):
+        api_messages = append_advisor_guidance_to_last_user_message(
+            messages=messages,
+            advisor_guidance=advisor_feedback.content,
+        )
+    return _AdvisorStage(
+        feedback=advisor_feedback,
+        api_messages=api_messages,
+        context_budget=history_fit.telemetry() if history_fit is not None else None,
     )
 
+
+def _advisor_output(advisor_stage: _AdvisorStage, api_response: UpstreamResult) -> WorkflowOutput:
+    intermediate = {
+        "advisor": advisor_stage.feedback.content,
+        "final": api_response.content,
+    }
+    if advisor_stage.skipped_reason is not None:
+        intermediate["advisor_skipped_reason"] = advisor_stage.skipped_reason
+    if advisor_stage.context_budget is not None:
+        intermediate["advisor_context_budget"] = advisor_stage.context_budget
     return WorkflowOutput(
         final_text=api_response.content,
-        intermediate={
-            "advisor": advisor_feedback.content,
-            "final": api_response.content,
-        },
+        intermediate=intermediate,
         stage_usage={
-            "advisor": advisor_feedback.usage,
+            "advisor": advisor_stage.feedback.usage,
             "api": api_response.usage,
         },
         final_tool_calls=api_response.tool_calls,
         finish_reason=api_response.finish_reason,
     )
+
+
+async def run_advisor(
+    runtime: RuntimeConfig,
+    messages: list[ChatMessage],
+    gateway: UpstreamGateway,
+    request_options: dict[str, Any],
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> WorkflowOutput:
+    advisor_stage = await _run_advisor_stage(
+        runtime, messages, gateway, request_options, timings=timings, deadline=deadline, tokenizer=tokenizer
+    )
+    api_response = await stage_gateway(gateway, "api").complete(
+        model=runtime.api.model,
+        base_url=runtime.api.base_url,
+        messages=advisor_stage.api_messages,
+        api_key_env=runtime.api.api_key_env,
+        request_options=request_options,
+    )
+    return _advisor_output(advisor_stage, api_response)
+
+
+async def stream_advisor(
+    runtime: RuntimeConfig,
+    messages: list[ChatMessage],
+    gateway: UpstreamGateway,
+    request_options: dict[str, Any],
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> AsyncIterator[WorkflowEvent]:
+    advisor_stage = await _run_advisor_stage(
+        runtime, messages, gateway, request_options, timings=timings, deadline=deadline, tokenizer=tokenizer
+    )
+    accumulator = DeltaAccumulator()
+    async for delta in stage_gateway(gateway, "api").stream(
+        model=runtime.api.model,
+        base_url=runtime.api.base_url,
+        messages=advisor_stage.api_messages,
+        api_key_env=runtime.api.api_key_env,
+        request_options=request_options,
+    ):
+        accumulator.add(delta)
+        yield delta
+
+    yield _advisor_output(advisor_stage, accumulator.result())
+
+
+def _unguided_rejection_reason(response: UpstreamResult, request_options: dict[str, Any]) -> str | None:
+    if response.finish_reason in {"length", "content_filter"}:
+        return f"unguided answer finished with {response.finish_reason}"
+    return candidate_rejection_reason(
+        content=response.content,
+        tool_calls=normalize_tool_calls(response.tool_calls),
+        require_call=requires_tool_call(request_options),
+    )
+
+
+def _parallel_telemetry(
+    *, winner: str, unguided_ms: int, advisor_ms: int | None, advisor_skipped_reason: str | None
+) -> str:
+    advisor_wait_ms = advisor_ms if advisor_ms is not None else unguided_ms
+    return json.dumps(
+        {
+            "winner": winner,
+            "unguided_ms": unguided_ms,
+            "advisor_ms": advisor_ms,
+            "saved_ms": advisor_wait_ms if winner == "unguided" else 0,
+            "waited_ms": max(0, unguided_ms - advisor_wait_ms) if winner == "guided" else 0,
+            "advisor_skipped_reason": advisor_skipped_reason,
+        },
+        sort_keys=True,
+    )
+
+
+def _parallel_skip_reason(advisor_stage: _AdvisorStage | None, advisor_error: Exception | None) -> str:
+    if advisor_stage is not None and advisor_stage.skipped_reason is not None:
+        return advisor_stage.skipped_reason
+    if advisor_error is not None:
+        return f"advisor failed: {type(advisor_error).__name__}: {advisor_error}"
+    if advisor_stage is None:
+        return "advisor cancelled: unguided answer accepted"
+    return "advisor unused: unguided answer accepted"
+
+
+async def run_parallel_advisor(
+    runtime: RuntimeConfig,
+    messages: list[ChatMessage],
+    gateway: UpstreamGateway,
+    request_options: dict[str, Any],
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> WorkflowOutput:
+    started = time.perf_counter()
+    advisor_stage: _AdvisorStage | None = None
+    advisor_error: Exception | None = None
+    advisor_ms: int | None = None
+
+    async def advise() -> None:
+        nonlocal advisor_stage, advisor_error, advisor_ms
+        try:
+            advisor_stage = await _run_advisor_stage(
+                runtime, messages, gateway, request_options, timings=timings, deadline=deadline, tokenizer=tokenizer
+            )
+        except Exception as exc:
+            advisor_error = exc
+        advisor_ms = elapsed_ms(started)
+
+    unguided: UpstreamResult | None = None
+    unguided_error: Exception | None = None
+    unguided_ms = 0
+    rejection_reason: str | None = None
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(advise)
+        try:
+            unguided = await stage_gateway(gateway, "api_unguided").complete(
+                model=runtime.api.model,
+                base_url=runtime.api.base_url,
+                messages=messages,
+                api_key_env=runtime.api.api_key_env,
+                request_options=request_options,
+            )
+        except Exception as exc:
+            unguided_error = exc
+            task_group.cancel_scope.cancel()
+        else:
+            unguided_ms = elapsed_ms(started)
+            rejection_reason = _unguided_rejection_reason(unguided, request_options)
+            if rejection_reason is None:
+                task_group.cancel_scope.cancel()
+
+    if unguided_error is not None:
+        raise unguided_error
+    assert unguided is not None
+
+    advisor_skipped = advisor_stage is not None and advisor_stage.skipped_reason is not None
+    if rejection_reason is None or advisor_skipped:
+        advisor_feedback = advisor_stage.feedback if advisor_stage is not None else None
+        skipped_reason = _parallel_skip_reason(advisor_stage, advisor_error)
+        intermediate = {
+            "advisor": advisor_feedback.content if advisor_feedback is not None else "",
+            "final": unguided.content,
+            "advisor_skipped_reason": skipped_reason,
+            "advisor_parallel": _parallel_telemetry(
+                winner="unguided",
+                unguided_ms=unguided_ms,
+                advisor_ms=advisor_ms,
+                advisor_skipped_reason=skipped_reason,
+            ),
+        }
+        if advisor_stage is not None and advisor_stage.context_budget is not None:
+            intermediate["advisor_context_budget"] = advisor_stage.context_budget
+        return WorkflowOutput(
+            final_text=unguided.content,
+            intermediate=intermediate,
+            stage_usage={
+                "advisor": advisor_feedback.usage if advisor_feedback is not None else TokenUsage(),
+                "api": unguided.usage,
+            },
+            final_tool_calls=unguided.tool_calls,
+            finish_reason=unguided.finish_reason,
+        )
+
+    if advisor_error is not None:
+        raise advisor_error
+    assert advisor_stage is not None and advisor_ms is not None
+    guided = await stage_gateway(gateway, "api").complete(
+        model=runtime.api.model,
+        base_url=runtime.api.base_url,
+        messages=advisor_stage.api_messages,
+        api_key_env=runtime.api.api_key_env,
+        request_options=request_options,
+    )
+    output = _advisor_output(advisor_stage, guided)
+    output.stage_usage["api_unguided"] = unguided.usage
+    output.intermediate["api_unguided"] = unguided.content
+    output.intermediate["unguided_rejection_reason"] = rejection_reason
+    output.intermediate["advisor_parallel"] = _parallel_telemetry(
+        winner="guided", unguided_ms=unguided_ms, advisor_ms=advisor_ms, advisor_skipped_reason=None
+    )
+    return output
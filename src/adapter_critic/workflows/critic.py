@@ -1,19 +1,53 @@
 from __future__ import annotations
 
 import json
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 from loguru import logger
+from pydantic import BaseModel
 
 from ..config import RuntimeConfig
 from ..contracts import ChatMessage
+from ..deadlines import Deadline, budget_skip_reason, stage_allowed, stage_scope
 from ..edits import build_adapter_draft_payload
 from ..http_gateway import UpstreamResponseFormatError
-from ..prompts import build_critic_messages, build_critic_second_pass_messages
+from ..prompts import build_critic_messages, build_critic_second_pass_messages, fit_history
 from ..response_shape import normalize_tool_calls
-from ..upstream import TokenUsage, UpstreamGateway, UpstreamResult
-from .direct import WorkflowOutput
+from ..stage_cache import StageCache, stage_cache_key
+from ..streaming import DeltaAccumulator, deltas_from_result
+from ..timings import RequestTimings, measure
+from ..token_counter import Tokenizer
+from ..upstream import TokenUsage, UpstreamGateway, UpstreamResult, UpstreamUnavailableError, stage_gateway
+from .direct import WorkflowEvent, WorkflowOutput
+
+FINAL_PASS_ATTEMPTS = 2
+
+
+class _CriticReview(BaseModel):
+    api_draft: UpstreamResult
+    api_tool_calls: list[dict[str, Any]] | None
+    critic_feedback: UpstreamResult
+    second_pass_messages: list[ChatMessage]
+    skipped_reason: str | None = None
+    context_budget: str | None = None
+
+
+def _skipped_review(
+    api_draft: UpstreamResult,
+    api_tool_calls: list[dict[str, Any]] | None,
+    reason: str,
+    context_budget: str | None = None,
+) -> _CriticReview:
+    return _CriticReview(
+        api_draft=api_draft,
+        api_tool_calls=api_tool_calls,
+        critic_feedback=UpstreamResult(content="", usage=TokenUsage()),
+        second_pass_messages=[],
+        skipped_reason=reason,
+        context_budget=context_budget,
+    )
 
 
 def _first_system_prompt(messages: list[ChatMessage]) -> str:
@@ -26,16 +60,20 @@ def _first_system_prompt(messages: list[ChatMessage]) -> str:
     return ""
 
 
-async def run_critic(
+async def _run_draft_and_critic(
     runtime: RuntimeConfig,
     messages: list[ChatMessage],
     gateway: UpstreamGateway,
     request_options: dict[str, Any],
-) -> WorkflowOutput:
+    stage_cache: StageCache | None = None,
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> _CriticReview:
     if runtime.critic is None:
         raise ValueError("critic runtime is missing critic target")
 
-    api_draft = await gateway.complete(
+    api_draft = await stage_gateway(gateway, "api_draft").complete(
         model=runtime.api.model,
         base_url=runtime.api.base_url,
         messages=messages,
@@ -44,60 +82,90 @@ async def run_critic(
     )
     api_tool_calls = normalize_tool_calls(api_draft.tool_calls)
 
-    draft_payload = build_adapter_draft_payload(
-        content=api_draft.content,
-        tool_calls=api_tool_calls,
+    with measure(timings, "prompt_rendering"):
+        draft_payload = build_adapter_draft_payload(
+            content=api_draft.content,
+            tool_calls=api_tool_calls,
+        )
+        history, history_fit = fit_history(messages, runtime.critic.context_budget, tokenizer)
+        critic_messages = build_critic_messages(
+            messages=history,
+            system_prompt=_first_system_prompt(messages),
+            draft=draft_payload,
+            critic_system_prompt=runtime.critic_system_prompt,
+            request_options=request_options,
+            layout=runtime.prompt_layout,
+        )
+    context_budget = history_fit.telemetry() if history_fit is not None else None
+    cache_key: str | None = None
+    cached_feedback: UpstreamResult | None = None
+    if stage_cache is not None:
+        cache_key = stage_cache_key(runtime.critic, critic_messages)
+        cached_feedback = stage_cache.get(cache_key, stage="critic")
+    if cached_feedback is not None:
+        critic_feedback = cached_feedback
+    else:
+        if not stage_allowed(deadline, reserve_stages=1):
+            return _skipped_review(api_draft, api_tool_calls, budget_skip_reason("critic"), context_budget)
+        critic_call: UpstreamResult | None = None
+        try:
+            with stage_scope(deadline, reserve_stages=1):
+                critic_call = await stage_gateway(gateway, "critic").complete(
+                    model=runtime.critic.model,
+                    base_url=runtime.critic.base_url,
+                    messages=critic_messages,
+                    api_key_env=runtime.critic.api_key_env,
+                )
+        except UpstreamUnavailableError as exc:
+            return _skipped_review(api_draft, api_tool_calls, f"critic skipped: {exc}", context_budget)
+        if critic_call is None:
+            return _skipped_review(api_draft, api_tool_calls, budget_skip_reason("critic"), context_budget)
+        critic_feedback = critic_call
+        if stage_cache is not None and cache_key is not None:
+            stage_cache.put(cache_key, critic_feedback)
+    with measure(timings, "prompt_rendering"):
+        second_pass_messages = build_critic_second_pass_messages(
+            messages=messages,
+            draft=draft_payload,
+            critique=critic_feedback.content,
+        )
+    return _CriticReview(
+        api_draft=api_draft,
+        api_tool_calls=api_tool_calls,
+        critic_feedback=critic_feedback,
+        second_pass_messages=second_pass_messages,
+        context_budget=context_budget,
     )
 
-    critic_messages = build_critic_messages(
-        messages=messages,
-        system_prompt=_first_system_prompt(messages),
-        draft=draft_payload,
-        critic_system_prompt=runtime.critic_system_prompt,
-        request_options=request_options,
-    )
-    critic_feedback = await gateway.complete(
-        model=runtime.critic.model,
-        base_url=runtime.critic.base_url,
-        messages=critic_messages,
-        api_key_env=runtime.critic.api_key_env,
-    )
-    second_pass_messages = build_critic_second_pass_messages(
-        messages=messages,
-        draft=draft_payload,
-        critique=critic_feedback.content,
+
+def _final_pass_attempts(review: _CriticReview) -> int:
+    return 0 if review.skipped_reason is not None else FINAL_PASS_ATTEMPTS
+
+
+def _log_final_pass_failure(runtime: RuntimeConfig, attempt: int, exc: Exception) -> str | None:
+    logger.warning(
+        "critic final pass attempt failed model={} base_url={} attempt={}/{} error_type={} detail={}",
+        runtime.api.model,
+        runtime.api.base_url,
+        attempt,
+        FINAL_PASS_ATTEMPTS,
+        type(exc).__name__,
+        str(exc),
     )
-    final_response: UpstreamResult | None = None
-    final_fallback_reason: str | None = None
-    final_attempts = 2
-    for attempt in range(1, final_attempts + 1):
-        try:
-            final_response = await gateway.complete(
-                model=runtime.api.model,
-                base_url=runtime.api.base_url,
-                messages=second_pass_messages,
-                api_key_env=runtime.api.api_key_env,
-                request_options=request_options,
-            )
-            break
-        except (UpstreamResponseFormatError, httpx.HTTPError) as exc:
-            logger.warning(
-                "critic final pass attempt failed model={} base_url={} attempt={}/{} error_type={} detail={}",
-                runtime.api.model,
-                runtime.api.base_url,
-                attempt,
-                final_attempts,
-                type(exc).__name__,
-                str(exc),
-            )
-            if attempt == final_attempts:
-                final_fallback_reason = (
-                    f"api_final failed after {final_attempts} attempts: {type(exc).__name__}: {str(exc)}"
-                )
+    if attempt == FINAL_PASS_ATTEMPTS:
+        return f"api_final failed after {FINAL_PASS_ATTEMPTS} attempts: {type(exc).__name__}: {str(exc)}"
+    return None
 
+
+def _critic_output(
+    review: _CriticReview,
+    final_response: UpstreamResult | None,
+    final_fallback_reason: str | None,
+) -> WorkflowOutput:
+    api_draft = review.api_draft
     if final_response is None:
         final_text = api_draft.content
-        final_tool_calls = api_tool_calls
+        final_tool_calls = review.api_tool_calls
         finish_reason = api_draft.finish_reason
         api_final_usage = TokenUsage()
     else:
@@ -108,22 +176,131 @@ async def run_critic(
 
     intermediate: dict[str, str] = {
         "api_draft": api_draft.content,
-        "critic": critic_feedback.content,
+        "critic": review.critic_feedback.content,
         "final": final_text,
     }
-    if api_tool_calls is not None:
-        intermediate["api_draft_tool_calls"] = json.dumps(api_tool_calls, sort_keys=True)
+    if review.api_tool_calls is not None:
+        intermediate["api_draft_tool_calls"] = json.dumps(review.api_tool_calls, sort_keys=True)
     if final_fallback_reason is not None:
         intermediate["final_fallback_reason"] = final_fallback_reason
+    if review.context_budget is not None:
+        intermediate["critic_context_budget"] = review.context_budget
 
     return WorkflowOutput(
         final_text=final_text,
         intermediate=intermediate,
         stage_usage={
             "api_draft": api_draft.usage,
-            "critic": critic_feedback.usage,
+            "critic": review.critic_feedback.usage,
             "api_final": api_final_usage,
         },
         final_tool_calls=final_tool_calls,
         finish_reason=finish_reason,
     )
+
+
+async def run_critic(
+    runtime: RuntimeConfig,
+    messages: list[ChatMessage],
+    gateway: UpstreamGateway,
+    request_options: dict[str, Any],
+    stage_cache: StageCache | None = None,
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> WorkflowOutput:
+    review = await _run_draft_and_critic(
+        runtime,
+        messages,
+        gateway,
+        request_options,
+        stage_cache=stage_cache,
+        timings=timings,
+        deadline=deadline,
+        tokenizer=tokenizer,
+    )
+
+    final_response: UpstreamResult | None = None
+    final_fallback_reason = review.skipped_reason
+    for attempt in range(1, _final_pass_attempts(review) + 1):
+        if not stage_allowed(deadline):
+            final_fallback_reason = budget_skip_reason("api_final")
+            break
+        try:
+            with stage_scope(deadline):
+                final_response = await stage_gateway(gateway, "api_final").complete(
+                    model=runtime.api.model,
+                    base_url=runtime.api.base_url,
+                    messages=review.second_pass_messages,
+                    api_key_env=runtime.api.api_key_env,
+                    request_options=request_options,
+                )
+        except UpstreamUnavailableError as exc:
+            final_fallback_reason = f"api_final skipped: {exc}"
+            break
+        except (UpstreamResponseFormatError, httpx.HTTPError) as exc:
+            final_fallback_reason = _log_final_pass_failure(runtime, attempt, exc)
+            continue
+        if final_response is None:
+            final_fallback_reason = budget_skip_reason("api_final")
+        break
+
+    return _critic_output(review, final_response, final_fallback_reason)
+
+
+async def stream_critic(
+    runtime: RuntimeConfig,
+    messages: list[ChatMessage],
+    gateway: UpstreamGateway,
+    request_options: dict[str, Any],
+    stage_cache: StageCache | None = None,
+    timings: RequestTimings | None = None,
+    deadline: Deadline | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> AsyncIterator[WorkflowEvent]:
+    review = await _run_draft_and_critic(
+        runtime,
+        messages,
+        gateway,
+        request_options,
+        stage_cache=stage_cache,
+        timings=timings,
+        deadline=deadline,
+        tokenizer=tokenizer,
+    )
+
+    final_response: UpstreamResult | None = None
+    final_fallback_reason = review.skipped_reason
+    for attempt in range(1, _final_pass_attempts(review) + 1):
+        if not stage_allowed(deadline):
+            final_fallback_reason = budget_skip_reason("api_final")
+            break
+        accumulator = DeltaAccumulator()
+        emitted = False
+        try:
+            async for delta in stage_gateway(gateway, "api_final").stream(
+                model=runtime.api.model,
+                base_url=runtime.api.base_url,
+                messages=review.second_pass_messages,
+                api_key_env=runtime.api.api_key_env,
+                request_options=request_options,
+            ):
+                accumulator.add(delta)
+                emitted = True
+                yield delta
+            final_response = accumulator.result()
+            break
+        except UpstreamUnavailableError as exc:
+            final_fallback_reason = f"api_final skipped: {exc}"
+            break
+        except (UpstreamResponseFormatError, httpx.HTTPError) as exc:
+            if emitted:
+                raise
+            final_fallback_reason = _log_final_pass_failure(runtime, attempt, exc)
+
+    if final_response is None:
+        draft = review.api_draft.model_copy(update={"tool_calls": review.api_tool_calls})
+        for delta in deltas_from_result(draft):
+            yield delta
+
+    yield _critic_output(review, final_response, final_fallback_reason)
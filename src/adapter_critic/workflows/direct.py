@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 
 from pydantic import BaseModel
 
 from ..config import RuntimeConfig
 from ..contracts import ChatMessage
-from ..upstream import TokenUsage, UpstreamGateway
+from ..streaming import DeltaAccumulator
+from ..upstream import TokenUsage, UpstreamDelta, UpstreamGateway, stage_gateway
 
 
 class WorkflowOutput(BaseModel):
@@ -17,13 +20,20 @@ class WorkflowOutput(BaseModel):
     finish_reason: str = "stop"
 
 
+WorkflowEvent = UpstreamDelta | WorkflowOutput
+
+
+def elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
 async def run_direct(
     runtime: RuntimeConfig,
     messages: list[ChatMessage],
     gateway: UpstreamGateway,
     request_options: dict[str, Any],
 ) -> WorkflowOutput:
-    response = await gateway.complete(
+    response = await stage_gateway(gateway, "api").complete(
         model=runtime.api.model,
         base_url=runtime.api.base_url,
         messages=messages,
@@ -37,3 +47,30 @@ async def run_direct(
         final_tool_calls=response.tool_calls,
         finish_reason=response.finish_reason,
     )
+
+
+async def stream_direct(
+    runtime: RuntimeConfig,
+    messages: list[ChatMessage],
+    gateway: UpstreamGateway,
+    request_options: dict[str, Any],
+) -> AsyncIterator[WorkflowEvent]:
+    accumulator = DeltaAccumulator()
+    async for delta in stage_gateway(gateway, "api").stream(
+        model=runtime.api.model,
+        base_url=runtime.api.base_url,
+        messages=messages,
+        api_key_env=runtime.api.api_key_env,
+        request_options=request_options,
+    ):
+        accumulator.add(delta)
+        yield delta
+
+    response = accumulator.result()
+    yield WorkflowOutput(
+        final_text=response.content,
+        intermediate={"api": response.content},
+        stage_usage={"api": response.usage},
+        final_tool_calls=response.tool_calls,
+        finish_reason=response.finish_reason,
+    )
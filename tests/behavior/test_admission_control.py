@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+
+from adapter_critic.config import AppConfig
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.metrics import AppMetrics
+from adapter_critic.upstream import UpstreamResult
+from tests.helpers import FakeGateway, build_app, usage
+
+LIMIT = {"max_concurrency": 1, "max_queue": 0, "retry_after_seconds": 2}
+
+
+class _GatedGateway(FakeGateway):
+    def __init__(self, gated_model: str, responses: list[UpstreamResult]) -> None:
+        super().__init__(responses)
+        self.gated_model = gated_model
+        self.gate = anyio.Event()
+        self.entered = anyio.Event()
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        if model == self.gated_model and not self.entered.is_set():
+            self.entered.set()
+            await self.gate.wait()
+        return await super().complete(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        )
+
+
+def _config(mode: str, limited_stage: str) -> AppConfig:
+    served: dict[str, Any] = {
+        "mode": mode,
+        "api": {"model": "api-model", "base_url": "https://api.example"},
+        "adapter": {"model": "adapter-model", "base_url": "https://adapter.example"},
+    }
+    served[limited_stage] = {**served[limited_stage], "concurrency": LIMIT}
+    return AppConfig.model_validate({"served_models": {"served": served}})
+
+
+def _body() -> dict[str, Any]:
+    return {"model": "served", "messages": [{"role": "user", "content": "hi"}]}
+
+
+@pytest.mark.anyio
+async def test_saturated_api_target_returns_429_with_retry_after() -> None:
+    metrics = AppMetrics()
+    gateway = _GatedGateway("api-model", [UpstreamResult(content="first", usage=usage(1, 1, 2))])
+    responses: list[httpx.Response] = []
+
+    transport = httpx.ASGITransport(app=build_app(_config("direct", "api"), gateway, metrics=metrics))
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+
+        async def first_request() -> None:
+            responses.append(await client.post("/v1/chat/completions", json=_body()))
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(first_request)
+            await gateway.entered.wait()
+            rejected = await client.post("/v1/chat/completions", json=_body())
+            gateway.gate.set()
+
+    assert rejected.status_code == 429
+    assert rejected.headers["retry-after"] == "2"
+    assert responses[0].status_code == 200
+    assert metrics.admission_rejections.value(("api", "https://api.example", "api-model", "queue_full")) == 1
+    assert metrics.request_duration.count(("served", "direct", "false", "rejected")) == 1
+
+
+@pytest.mark.anyio
+async def test_saturated_side_stage_is_skipped_instead_of_failing_the_request() -> None:
+    gateway = _GatedGateway(
+        "adapter-model",
+        [
+            UpstreamResult(content="draft one", usage=usage(1, 1, 2)),
+            UpstreamResult(content="draft two", usage=usage(1, 1, 2)),
+            UpstreamResult(content='{"decision":"lgtm"}', usage=usage(1, 1, 2)),
+        ],
+    )
+    responses: list[httpx.Response] = []
+
+    transport = httpx.ASGITransport(app=build_app(_config("adapter", "adapter"), gateway, metrics=AppMetrics()))
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+
+        async def first_request() -> None:
+            responses.append(await client.post("/v1/chat/completions", json=_body()))
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(first_request)
+            await gateway.entered.wait()
+            degraded = await client.post("/v1/chat/completions", json=_body())
+            gateway.gate.set()
+
+    assert degraded.status_code == 200
+    payload = degraded.json()
+    assert payload["choices"][0]["message"]["content"] == "draft two"
+    assert payload["adapter_critic"]["intermediate"]["adapter_rejection_reason"].startswith(
+        "adapter skipped: adapter upstream saturated (queue_full)"
+    )
+    assert responses[0].status_code == 200
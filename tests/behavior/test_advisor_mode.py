@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import anyio
+from fastapi.testclient import TestClient
+
+from adapter_critic.app import create_app
+from adapter_critic.config import AppConfig
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.upstream import UpstreamResult
+from tests.helpers import StreamFromCompleteMixin, usage
+
+
+class ParallelAdvisorGateway(StreamFromCompleteMixin):
+    def __init__(self, api_responses: list[UpstreamResult], advisor_delay_seconds: float) -> None:
+        self._api_responses = api_responses
+        self._advisor_delay_seconds = advisor_delay_seconds
+        self.calls: list[dict[str, Any]] = []
+        self.advisor_cancelled = False
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        del api_key_env
+        self.calls.append({"model": model, "base_url": base_url, "messages": messages})
+        if model != "advisor-model":
+            return self._api_responses.pop(0)
+        try:
+            await anyio.sleep(self._advisor_delay_seconds)
+        except anyio.get_cancelled_exc_class():
+            self.advisor_cancelled = True
+            raise
+        return UpstreamResult(content="check the refund policy", usage=usage(1, 2, 3))
+
+
+def _parallel_advisor_request(**extra: Any) -> dict[str, Any]:
+    return {
+        "model": "served-direct",
+        "messages": [{"role": "user", "content": "hello"}],
+        "x_adapter_critic": {
+            "mode": "advisor",
+            "advisor_model": "advisor-model",
+            "advisor_base_url": "https://advisor.example",
+            "advisor_strategy": "parallel",
+        },
+        **extra,
+    }
+
+
+def test_parallel_advisor_returns_unguided_answer_and_cancels_advisor(base_config: AppConfig) -> None:
+    gateway = ParallelAdvisorGateway(
+        [UpstreamResult(content="unguided answer", usage=usage(2, 2, 4))],
+        advisor_delay_seconds=30,
+    )
+    client = TestClient(create_app(config=base_config, gateway=gateway))
+
+    response = client.post("/v1/chat/completions", json=_parallel_advisor_request())
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["choices"][0]["message"]["content"] == "unguided answer"
+    assert gateway.advisor_cancelled
+    assert sorted(call["model"] for call in gateway.calls) == ["advisor-model", "api-model"]
+    intermediate = body["adapter_critic"]["intermediate"]
+    assert intermediate["advisor"] == ""
+    telemetry = json.loads(intermediate["advisor_parallel"])
+    assert telemetry["winner"] == "unguided"
+    assert telemetry["advisor_ms"] is None
+    assert telemetry["saved_ms"] == telemetry["unguided_ms"]
+    assert telemetry["waited_ms"] == 0
+    assert telemetry["advisor_skipped_reason"] == "advisor cancelled: unguided answer accepted"
+    assert intermediate["advisor_skipped_reason"] == telemetry["advisor_skipped_reason"]
+    assert body["adapter_critic"]["tokens"]["stages"]["advisor"]["total_tokens"] == 0
+    assert body["usage"]["total_tokens"] == 4
+
+
+def test_parallel_advisor_issues_guided_call_when_unguided_answer_is_rejected(base_config: AppConfig) -> None:
+    gateway = ParallelAdvisorGateway(
+        [
+            UpstreamResult(content="no tool call", usage=usage(2, 2, 4)),
+            UpstreamResult(
+                content="",
+                usage=usage(3, 3, 6),
+                tool_calls=[
+                    {
+                        "id": "call_1",
+                        "type": "function",
+                        "function": {"name": "refund", "arguments": "{}"},
+                    }
+                ],
+            ),
+        ],
+        advisor_delay_seconds=0,
+    )
+    client = TestClient(create_app(config=base_config, gateway=gateway))
+
+    response = client.post(
+        "/v1/chat/completions",
+        json=_parallel_advisor_request(
+            tools=[{"type": "function", "function": {"name": "refund", "parameters": {"type": "object"}}}],
+            tool_choice="required",
+        ),
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["choices"][0]["message"]["tool_calls"][0]["function"]["name"] == "refund"
+    assert not gateway.advisor_cancelled
+    assert "check the refund policy" in (gateway.calls[-1]["messages"][-1].content or "")
+    intermediate = body["adapter_critic"]["intermediate"]
+    assert intermediate["api_unguided"] == "no tool call"
+    assert intermediate["unguided_rejection_reason"] == "request requires a tool call"
+    telemetry = json.loads(intermediate["advisor_parallel"])
+    assert telemetry["winner"] == "guided"
+    assert telemetry["saved_ms"] == 0
+    assert telemetry["waited_ms"] == max(0, telemetry["unguided_ms"] - telemetry["advisor_ms"])
+    assert telemetry["advisor_skipped_reason"] is None
+    assert set(body["adapter_critic"]["tokens"]["stages"]) == {"advisor", "api", "api_unguided"}
+    assert body["usage"]["total_tokens"] == 13
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+
+from adapter_critic.config import AppConfig, CircuitBreakerConfig
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.upstream import UpstreamResult
+from tests.helpers import FakeGateway, build_client, usage
+
+
+class _FailingTargetGateway(FakeGateway):
+    def __init__(self, failing_model: str, responses: list[UpstreamResult]) -> None:
+        super().__init__(responses)
+        self.failing_model = failing_model
+        self.failing_calls = 0
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        if model == self.failing_model:
+            self.failing_calls += 1
+            raise httpx.ConnectError("refused", request=httpx.Request("POST", base_url))
+        return await super().complete(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        )
+
+
+def _breaker_config(base_config: AppConfig) -> AppConfig:
+    return base_config.model_copy(
+        update={"circuit_breaker": CircuitBreakerConfig(failure_threshold=1, open_seconds=60)}
+    )
+
+
+def test_open_adapter_circuit_degrades_to_the_api_draft(base_config: AppConfig) -> None:
+    gateway = _FailingTargetGateway(
+        "adapter-model",
+        [
+            UpstreamResult(content="first draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content="second draft", usage=usage(1, 1, 2)),
+        ],
+    )
+    client, _ = build_client(_breaker_config(base_config), gateway=gateway)
+    body = {"model": "served-adapter", "messages": [{"role": "user", "content": "hi"}]}
+
+    assert client.post("/v1/chat/completions", json=body).status_code == 502
+
+    response = client.post("/v1/chat/completions", json=body)
+    payload = response.json()
+    assert response.status_code == 200
+    assert payload["choices"][0]["message"]["content"] == "second draft"
+    assert payload["adapter_critic"]["intermediate"]["adapter_rejection_reason"].startswith("adapter skipped: circuit")
+    assert gateway.failing_calls == 1
+
+
+def test_open_critic_circuit_returns_the_draft_without_a_final_pass(base_config: AppConfig) -> None:
+    gateway = _FailingTargetGateway(
+        "critic-model",
+        [
+            UpstreamResult(content="first draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content="second draft", usage=usage(1, 1, 2)),
+        ],
+    )
+    client, _ = build_client(_breaker_config(base_config), gateway=gateway)
+    body = {"model": "served-critic", "messages": [{"role": "user", "content": "hi"}], "stream": True}
+
+    assert client.post("/v1/chat/completions", json=body).status_code == 502
+
+    response = client.post("/v1/chat/completions", json=body)
+    assert response.status_code == 200
+    assert "second draft" in response.text
+    assert "critic skipped: circuit open" in response.text
+    assert len(gateway.calls) == 2
+
+
+def test_open_api_circuit_returns_503_with_retry_after(base_config: AppConfig) -> None:
+    gateway = _FailingTargetGateway("api-model", [])
+    client, _ = build_client(_breaker_config(base_config), gateway=gateway)
+    body = {"model": "served-direct", "messages": [{"role": "user", "content": "hi"}]}
+
+    assert client.post("/v1/chat/completions", json=body).status_code == 502
+
+    response = client.post("/v1/chat/completions", json=body)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "60"
+    assert gateway.failing_calls == 1
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from adapter_critic.config import AppConfig
+from adapter_critic.token_counter import ApproxTokenCounter, Tokenizer
+from adapter_critic.upstream import UpstreamResult
+from tests.helpers import FakeGateway, build_client, usage
+
+
+class _ExactCounter(ApproxTokenCounter):
+    exact = True
+
+
+def _config(mode: str, side_stage: str, context_budget: dict[str, Any]) -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "served_models": {
+                "served": {
+                    "mode": mode,
+                    "api": {"model": "api-model", "base_url": "https://api.example"},
+                    side_stage: {
+                        "model": f"{side_stage}-model",
+                        "base_url": f"https://{side_stage}.example",
+                        "context_budget": context_budget,
+                    },
+                }
+            }
+        }
+    )
+
+
+def _long_conversation() -> list[dict[str, Any]]:
+    messages: list[dict[str, Any]] = [{"role": "system", "content": "sys rule"}]
+    for turn in range(6):
+        messages.append({"role": "user", "content": f"question {turn} " + "context " * 200})
+        messages.append({"role": "assistant", "content": f"answer {turn}"})
+    messages.append({"role": "user", "content": "latest question"})
+    return messages
+
+
+def test_adapter_prompt_is_truncated_to_side_stage_budget() -> None:
+    gateway = FakeGateway(
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content='{"decision":"lgtm"}', usage=usage(1, 1, 2)),
+        ]
+    )
+    client, _ = build_client(_config("adapter", "adapter", {"max_tokens": 500}), gateway=gateway)
+    messages = _long_conversation()
+
+    response = client.post("/v1/chat/completions", json={"model": "served", "messages": messages})
+
+    payload = response.json()
+    assert response.status_code == 200
+    assert len(gateway.calls[0]["messages"]) == len(messages)
+    adapter_prompt = gateway.calls[1]["messages"][1].content
+    assert adapter_prompt is not None
+    assert "[system] sys rule" in adapter_prompt
+    assert "latest question" in adapter_prompt
+    assert "question 0" not in adapter_prompt
+    report = json.loads(payload["adapter_critic"]["intermediate"]["adapter_context_budget"])
+    assert report["strategy"] == "last_turns"
+    assert report["kept_tokens"] <= 500
+    assert report["saved_tokens"] == report["history_tokens"] - report["kept_tokens"] > 0
+
+
+def test_advisor_sees_head_and_tail_while_api_keeps_full_history() -> None:
+    gateway = FakeGateway(
+        [
+            UpstreamResult(content="guidance", usage=usage(1, 1, 2)),
+            UpstreamResult(content="answer", usage=usage(1, 1, 2)),
+        ]
+    )
+    client, _ = build_client(
+        _config("advisor", "advisor", {"max_tokens": 900, "strategy": "head_tail"}), gateway=gateway
+    )
+    messages = _long_conversation()
+
+    response = client.post("/v1/chat/completions", json={"model": "served", "messages": messages})
+
+    payload = response.json()
+    assert response.status_code == 200
+    advisor_messages = gateway.calls[0]["messages"]
+    assert [message.content for message in advisor_messages[1:3]] == ["sys rule", messages[1]["content"]]
+    assert advisor_messages[-1].content == "latest question"
+    assert len(advisor_messages) < len(messages) + 1
+    assert len(gateway.calls[1]["messages"]) == len(messages)
+    report = json.loads(payload["adapter_critic"]["intermediate"]["advisor_context_budget"])
+    assert report["strategy"] == "head_tail"
+    assert report["dropped_messages"] > 0
+
+
+def test_stage_without_budget_reports_nothing(base_config: AppConfig) -> None:
+    gateway = FakeGateway(
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content="critique", usage=usage(1, 1, 2)),
+            UpstreamResult(content="final", usage=usage(1, 1, 2)),
+        ]
+    )
+    client, _ = build_client(base_config, gateway=gateway)
+
+    response = client.post("/v1/chat/completions", json={"model": "served-critic", "messages": _long_conversation()})
+
+    assert response.status_code == 200
+    assert "critic_context_budget" not in response.json()["adapter_critic"]["intermediate"]
+
+
+def _windowed_config(context_window: int) -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "served_models": {
+                "served": {
+                    "mode": "direct",
+                    "api": {"model": "api-model", "base_url": "https://api.example", "context_window": context_window},
+                }
+            }
+        }
+    )
+
+
+def test_request_over_api_context_window_is_rejected_before_any_upstream_call() -> None:
+    gateway = FakeGateway([])
+    client, _ = build_client(_windowed_config(1000), gateway=gateway, tokenizer=Tokenizer(_ExactCounter()))
+
+    response = client.post("/v1/chat/completions", json={"model": "served", "messages": _long_conversation()})
+
+    assert response.status_code == 400
+    assert "1000-token context window of api-model" in response.json()["detail"]
+    assert gateway.calls == []
+
+
+def test_requested_completion_tokens_count_against_context_window() -> None:
+    gateway = FakeGateway([UpstreamResult(content="ok", usage=usage(1, 1, 2))])
+    client, _ = build_client(_windowed_config(100), gateway=gateway, tokenizer=Tokenizer(_ExactCounter()))
+    body = {"model": "served", "messages": [{"role": "user", "content": "hi"}]}
+
+    accepted = client.post("/v1/chat/completions", json=body)
+    rejected = client.post("/v1/chat/completions", json={**body, "max_tokens": 200})
+
+    assert accepted.status_code == 200
+    assert "preflight" in accepted.json()["adapter_critic"]["timings"]["overhead"]
+    assert rejected.status_code == 400
+    assert len(gateway.calls) == 1
+
+
+def test_approximate_counts_over_the_context_window_are_forwarded() -> None:
+    gateway = FakeGateway([UpstreamResult(content="ok", usage=usage(1, 1, 2))])
+    client, _ = build_client(_windowed_config(1000), gateway=gateway)
+
+    response = client.post("/v1/chat/completions", json={"model": "served", "messages": _long_conversation()})
+
+    assert response.status_code == 200
+    assert len(gateway.calls) == 1
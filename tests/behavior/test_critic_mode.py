@@ -11,10 +11,10 @@ from adapter_critic.contracts import ChatMessage
 from adapter_critic.http_gateway import UpstreamResponseFormatError
 from adapter_critic.runtime import build_runtime_state
 from adapter_critic.upstream import UpstreamResult
-from tests.helpers import build_client, usage
+from tests.helpers import StreamFromCompleteMixin, build_client, usage
 
 
-class FlakyFinalGateway:
+class FlakyFinalGateway(StreamFromCompleteMixin):
     def __init__(self, outcomes: list[UpstreamResult | Exception]) -> None:
         self._outcomes = outcomes
         self.calls: list[dict[str, Any]] = []
@@ -321,3 +321,35 @@ def test_critic_mode_falls_back_when_final_pass_tool_call_arguments_are_malforme
     assert payload["choices"][0]["message"]["tool_calls"][0]["function"]["name"] == "transfer_to_human_agents"
     assert "function.arguments is not valid JSON" in payload["adapter_critic"]["intermediate"]["final_fallback_reason"]
     assert [call["model"] for call in gateway.calls] == ["api-model", "critic-model", "api-model", "api-model"]
+
+
+def test_critic_mode_stream_falls_back_to_api_draft_when_final_stream_fails(base_config: AppConfig) -> None:
+    client, gateway = _build_flaky_client(
+        base_config,
+        outcomes=[
+            UpstreamResult(content="Draft answer", usage=usage(2, 2, 4)),
+            UpstreamResult(content="Tighten the answer", usage=usage(1, 1, 2)),
+            _empty_assistant_error(),
+            _empty_assistant_error(),
+        ],
+    )
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={"model": "served-critic", "messages": [{"role": "user", "content": "question"}], "stream": True},
+    )
+    chunks = [
+        json.loads(line[len("data: ") :])
+        for line in response.text.splitlines()
+        if line.startswith("data: ") and line != "data: [DONE]"
+    ]
+
+    assert response.status_code == 200
+    assert "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks) == "Draft answer"
+    final_chunk = chunks[-1]
+    assert final_chunk["adapter_critic"]["intermediate"]["final"] == "Draft answer"
+    assert final_chunk["adapter_critic"]["intermediate"]["final_fallback_reason"].startswith(
+        "api_final failed after 2 attempts"
+    )
+    assert final_chunk["adapter_critic"]["tokens"]["stages"]["api_final"]["total_tokens"] == 0
+    assert [call["model"] for call in gateway.calls] == ["api-model", "critic-model", "api-model", "api-model"]
@@ -41,3 +41,37 @@ def test_debug_middleware_logs_request_and_response(base_config: AppConfig, monk
         and '"object":"chat.completion"' in record
         for record in records
     )
+
+
+def test_debug_middleware_forwards_streams_and_logs_bounded_preview(
+    base_config: AppConfig, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("LOGGING_LEVEL", "DEBUG")
+    records: list[str] = []
+
+    def capture(message: Any) -> None:
+        records.append(message.record["message"])
+
+    long_answer = "x" * 5000
+    sink_id = logger.add(capture, level="DEBUG")
+    try:
+        client, _ = build_client(
+            base_config,
+            [UpstreamResult(content=long_answer, usage=usage(2, 3, 5))],
+        )
+        response = client.post(
+            "/v1/chat/completions",
+            json={"model": "served-direct", "messages": [{"role": "user", "content": "hello"}], "stream": True},
+        )
+    finally:
+        logger.remove(sink_id)
+        monkeypatch.delenv("LOGGING_LEVEL", raising=False)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert long_answer in response.text
+    assert response.text.endswith("data: [DONE]\n\n")
+    outgoing = [record for record in records if record.startswith("outgoing response")]
+    assert len(outgoing) == 1
+    assert outgoing[0].endswith("...")
+    assert len(outgoing[0]) < 2200
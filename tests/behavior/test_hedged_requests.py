@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import Any
+
+import anyio
+from fastapi.testclient import TestClient
+
+from adapter_critic.app import create_app
+from adapter_critic.config import AppConfig
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.metrics import AppMetrics
+from adapter_critic.runtime import build_runtime_state
+from adapter_critic.upstream import UpstreamResult
+from tests.helpers import FakeGateway, usage
+
+
+class _StallingPrimaryGateway(FakeGateway):
+    def __init__(self, responses: list[UpstreamResult]) -> None:
+        super().__init__(responses)
+        self.stalled_calls = 0
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        if model == "api-model" and self.stalled_calls == 0:
+            self.stalled_calls += 1
+            await anyio.sleep(5)
+        return await super().complete(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        )
+
+
+def test_stalled_api_draft_is_hedged_to_alternate_target() -> None:
+    config = AppConfig.model_validate(
+        {
+            "served_models": {
+                "served-critic": {
+                    "mode": "critic",
+                    "api": {"model": "api-model", "base_url": "https://api.example"},
+                    "critic": {"model": "critic-model", "base_url": "https://critic.example"},
+                    "hedging": {
+                        "api_draft": {
+                            "initial_delay_ms": 20,
+                            "max_hedge_rate": 1.0,
+                            "target": {"model": "api-replica", "base_url": "https://replica.example"},
+                        }
+                    },
+                }
+            }
+        }
+    )
+    gateway = _StallingPrimaryGateway(
+        [
+            UpstreamResult(content="hedged draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content="looks fine", usage=usage(1, 1, 2)),
+            UpstreamResult(content="final answer", usage=usage(1, 1, 2)),
+        ]
+    )
+    metrics = AppMetrics()
+    state = build_runtime_state(config=config, gateway=gateway, metrics=metrics)
+    client = TestClient(create_app(config=config, gateway=gateway, state=state))
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={"model": "served-critic", "messages": [{"role": "user", "content": "hi"}]},
+    )
+
+    payload = response.json()
+    assert response.status_code == 200
+    assert payload["adapter_critic"]["intermediate"]["api_draft"] == "hedged draft"
+    assert payload["choices"][0]["message"]["content"] == "final answer"
+    assert [call["model"] for call in gateway.calls] == ["api-replica", "critic-model", "api-model"]
+    assert (
+        metrics.upstream_call_duration.count(("served-critic", "critic", "api_draft", "https://api.example", "ok")) == 1
+    )
+
+    exposition = client.get("/metrics").text
+    assert 'adapter_critic_hedges_fired_total{served_model="served-critic",stage="api_draft"} 1' in exposition
+    assert 'adapter_critic_hedges_won_total{served_model="served-critic",stage="api_draft"} 1' in exposition
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import json
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 import pytest
 from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
+from adapter_critic import http_gateway
+from adapter_critic.config import UpstreamPoolConfig
 from adapter_critic.contracts import ChatMessage
 from adapter_critic.http_gateway import OpenAICompatibleHttpGateway, UpstreamResponseFormatError
+from adapter_critic.metrics import AppMetrics
 
 
 @pytest.mark.anyio
@@ -327,7 +333,8 @@ async def test_openai_compatible_http_gateway_accepts_empty_content_with_empty_t
 
     monkeypatch.setattr(httpx, "AsyncClient", patched_async_client)
 
-    gateway = OpenAICompatibleHttpGateway(api_key="dummy", timeout_seconds=5.0)
+    metrics = AppMetrics(base_urls=["http://testserver/v1"])
+    gateway = OpenAICompatibleHttpGateway(api_key="dummy", timeout_seconds=5.0, metrics=metrics)
     result = await gateway.complete(
         model="api-model",
         base_url="http://testserver/v1",
@@ -337,6 +344,7 @@ async def test_openai_compatible_http_gateway_accepts_empty_content_with_empty_t
     assert result.content == ""
     assert result.finish_reason == "stop"
     assert result.tool_calls is None
+    assert metrics.empty_assistant_retries.value(("http://testserver/v1", "api-model")) == 1
 
 
 @pytest.mark.anyio
@@ -408,6 +416,67 @@ async def test_openai_compatible_http_gateway_logs_malformed_outbound_tool_call_
     )
 
 
+@pytest.mark.anyio
+async def test_openai_compatible_http_gateway_skips_tool_call_scan_without_assistant_tool_calls(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    scanned: list[list[dict[str, Any]]] = []
+
+    def record_scan(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        scanned.append(messages)
+        return []
+
+    upstream = FastAPI()
+
+    @upstream.post("/v1/chat/completions")
+    async def chat(payload: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "id": "chatcmpl-upstream",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "api-model",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "ok"},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 2, "completion_tokens": 3, "total_tokens": 5},
+        }
+
+    transport = httpx.ASGITransport(app=upstream)
+    original_async_client = httpx.AsyncClient
+
+    def patched_async_client(*args: Any, **kwargs: Any) -> httpx.AsyncClient:
+        return original_async_client(*args, transport=transport, **kwargs)
+
+    monkeypatch.setattr(httpx, "AsyncClient", patched_async_client)
+    monkeypatch.setattr(http_gateway, "_malformed_tool_call_issues", record_scan)
+
+    gateway = OpenAICompatibleHttpGateway(api_key="dummy", timeout_seconds=5.0)
+    tool_call_message = ChatMessage.model_validate(
+        {
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [{"id": "call_1", "type": "function", "function": {"name": "foo", "arguments": "{}"}}],
+        }
+    )
+    await gateway.complete(
+        model="api-model",
+        base_url="http://testserver/v1",
+        messages=[ChatMessage(role="user", content="hello"), ChatMessage(role="assistant", content="hi")],
+    )
+    assert scanned == []
+
+    await gateway.complete(
+        model="api-model",
+        base_url="http://testserver/v1",
+        messages=[ChatMessage(role="user", content="hello"), tool_call_message],
+    )
+    assert len(scanned) == 1
+
+
 @pytest.mark.anyio
 async def test_openai_compatible_http_gateway_rejects_non_json_tool_call_arguments(
     monkeypatch: pytest.MonkeyPatch,
@@ -462,3 +531,113 @@ async def test_openai_compatible_http_gateway_rejects_non_json_tool_call_argumen
         )
 
     assert exc_info.value.reason.startswith("choices[0].message.tool_calls[*].function.arguments is not valid JSON")
+
+
+@pytest.mark.anyio
+async def test_openai_compatible_http_gateway_reuses_pooled_client_per_base_url(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    upstream = FastAPI()
+
+    @upstream.post("/v1/chat/completions")
+    async def chat(payload: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "id": "chatcmpl-upstream",
+            "object": "chat.completion",
+            "created": 0,
+            "model": payload["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "ok"},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 2, "completion_tokens": 3, "total_tokens": 5},
+        }
+
+    transport = httpx.ASGITransport(app=upstream)
+    original_async_client = httpx.AsyncClient
+    created_clients: list[httpx.AsyncClient] = []
+    created_limits: list[httpx.Limits] = []
+
+    def patched_async_client(*args: Any, **kwargs: Any) -> httpx.AsyncClient:
+        created_limits.append(kwargs["limits"])
+        client = original_async_client(*args, transport=transport, **kwargs)
+        created_clients.append(client)
+        return client
+
+    monkeypatch.setattr(httpx, "AsyncClient", patched_async_client)
+
+    gateway = OpenAICompatibleHttpGateway(
+        api_key="dummy",
+        timeout_seconds=5.0,
+        max_connections=8,
+        upstream_pools={"HTTP://TESTSERVER/v1/": UpstreamPoolConfig(max_connections=2, max_keepalive_connections=1)},
+    )
+    for base_url in ("http://testserver/v1", "http://testserver/v1/", "http://TESTSERVER/v1"):
+        result = await gateway.complete(
+            model="api-model",
+            base_url=base_url,
+            messages=[ChatMessage(role="user", content="hello")],
+        )
+        assert result.content == "ok"
+
+    assert len(created_clients) == 1
+    assert created_limits[0].max_connections == 2
+    assert created_limits[0].max_keepalive_connections == 1
+    assert created_limits[0].keepalive_expiry == 5.0
+
+    await gateway.aclose()
+
+    assert created_clients[0].is_closed
+
+
+@pytest.mark.anyio
+async def test_openai_compatible_http_gateway_streams_sse_deltas(monkeypatch: pytest.MonkeyPatch) -> None:
+    upstream = FastAPI()
+    captured: dict[str, Any] = {}
+
+    @upstream.post("/v1/chat/completions")
+    async def chat(payload: dict[str, Any]) -> StreamingResponse:
+        captured["payload"] = payload
+        chunks = [
+            {"choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]},
+            {"choices": [{"index": 0, "delta": {"content": "he"}, "finish_reason": None}]},
+            {"choices": [{"index": 0, "delta": {"content": "llo"}, "finish_reason": "stop"}]},
+            {"choices": [], "usage": {"prompt_tokens": 2, "completion_tokens": 3, "total_tokens": 5}},
+        ]
+
+        async def body() -> AsyncIterator[str]:
+            for chunk in chunks:
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    transport = httpx.ASGITransport(app=upstream)
+    original_async_client = httpx.AsyncClient
+
+    def patched_async_client(*args: Any, **kwargs: Any) -> httpx.AsyncClient:
+        return original_async_client(*args, transport=transport, **kwargs)
+
+    monkeypatch.setattr(httpx, "AsyncClient", patched_async_client)
+
+    gateway = OpenAICompatibleHttpGateway(api_key="dummy", timeout_seconds=5.0)
+    deltas = [
+        delta
+        async for delta in gateway.stream(
+            model="api-model",
+            base_url="http://testserver/v1",
+            messages=[ChatMessage(role="user", content="hello")],
+            request_options={"temperature": 0},
+        )
+    ]
+
+    assert captured["payload"]["stream"] is True
+    assert captured["payload"]["stream_options"] == {"include_usage": True}
+    assert captured["payload"]["temperature"] == 0
+    assert "".join(delta.content for delta in deltas) == "hello"
+    assert deltas[2].finish_reason == "stop"
+    assert deltas[-1].usage is not None
+    assert deltas[-1].usage.total_tokens == 5
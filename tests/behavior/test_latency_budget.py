@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import Any
+
+import anyio
+
+from adapter_critic.config import AppConfig
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.upstream import UpstreamResult
+from tests.helpers import FakeGateway, build_client, usage
+
+
+class _SlowTargetGateway(FakeGateway):
+    def __init__(self, slow_model: str, responses: list[UpstreamResult]) -> None:
+        super().__init__(responses)
+        self.slow_model = slow_model
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        if model == self.slow_model:
+            await anyio.sleep(5)
+        return await super().complete(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        )
+
+
+def _body(model: str, **overrides: Any) -> dict[str, Any]:
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": "hi"}],
+        "x_adapter_critic": overrides,
+    }
+
+
+def test_slow_adapter_is_abandoned_when_budget_runs_out(base_config: AppConfig) -> None:
+    gateway = _SlowTargetGateway(
+        "adapter-model",
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content="unused", usage=usage(1, 1, 2)),
+        ],
+    )
+    client, _ = build_client(base_config, gateway=gateway)
+
+    response = client.post("/v1/chat/completions", json=_body("served-adapter", latency_budget_ms=100))
+
+    payload = response.json()
+    assert response.status_code == 200
+    assert payload["choices"][0]["message"]["content"] == "draft"
+    assert (
+        payload["adapter_critic"]["intermediate"]["adapter_rejection_reason"]
+        == "adapter skipped: latency budget exhausted"
+    )
+
+
+def test_critic_is_skipped_when_remaining_budget_is_below_stage_minimum(base_config: AppConfig) -> None:
+    gateway = FakeGateway([UpstreamResult(content="draft", usage=usage(1, 1, 2))])
+    client, _ = build_client(base_config, gateway=gateway)
+
+    response = client.post(
+        "/v1/chat/completions",
+        json=_body("served-critic", latency_budget_ms=1000, min_stage_budget_ms=1000),
+    )
+
+    payload = response.json()
+    assert response.status_code == 200
+    assert payload["choices"][0]["message"]["content"] == "draft"
+    assert (
+        payload["adapter_critic"]["intermediate"]["final_fallback_reason"] == "critic skipped: latency budget exhausted"
+    )
+    assert [call["model"] for call in gateway.calls] == ["api-model"]
+
+
+def test_advisor_reserves_budget_for_the_api_stage(base_config: AppConfig) -> None:
+    config = AppConfig.model_validate(
+        {
+            "served_models": {
+                "served-advisor": {
+                    "mode": "advisor",
+                    "api": {"model": "api-model", "base_url": "https://api.example"},
+                    "advisor": {"model": "advisor-model", "base_url": "https://advisor.example"},
+                    "latency_budget_ms": 1000,
+                    "min_stage_budget_ms": 600,
+                }
+            }
+        }
+    )
+    gateway = FakeGateway([UpstreamResult(content="answer", usage=usage(1, 1, 2))])
+    client, _ = build_client(config, gateway=gateway)
+
+    response = client.post("/v1/chat/completions", json=_body("served-advisor"))
+
+    payload = response.json()
+    assert response.status_code == 200
+    assert payload["choices"][0]["message"]["content"] == "answer"
+    assert (
+        payload["adapter_critic"]["intermediate"]["advisor_skipped_reason"]
+        == "advisor skipped: latency budget exhausted"
+    )
+    assert [call["model"] for call in gateway.calls] == ["api-model"]
+    assert gateway.calls[0]["messages"][-1].content == "hi"
+
+
+class _DelayedCriticGateway(FakeGateway):
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        if model == "critic-model":
+            await anyio.sleep(0.7)
+        return await super().complete(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        )
+
+
+def test_slow_critic_leaves_budget_for_the_final_pass(base_config: AppConfig) -> None:
+    gateway = _DelayedCriticGateway(
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content="unused", usage=usage(1, 1, 2)),
+        ]
+    )
+    client, _ = build_client(base_config, gateway=gateway)
+
+    response = client.post(
+        "/v1/chat/completions",
+        json=_body("served-critic", latency_budget_ms=1000, min_stage_budget_ms=400),
+    )
+
+    payload = response.json()
+    assert response.status_code == 200
+    assert payload["choices"][0]["message"]["content"] == "draft"
+    assert (
+        payload["adapter_critic"]["intermediate"]["final_fallback_reason"] == "critic skipped: latency budget exhausted"
+    )
+    assert payload["adapter_critic"]["tokens"]["stages"]["critic"]["total_tokens"] == 0
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from adapter_critic.app import create_app
+from adapter_critic.config import AppConfig
+from adapter_critic.metrics import AppMetrics
+from adapter_critic.runtime import build_runtime_state
+from adapter_critic.upstream import UpstreamResult
+from tests.helpers import FakeGateway, usage
+
+
+def test_metrics_endpoint_reports_stage_latency_retries_and_tokens(base_config: AppConfig) -> None:
+    rejected = '{"decision":"patch","patches":[{"op":"replace","path":"/unknown","value":"x"}]}'
+    gateway = FakeGateway(
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content=rejected, usage=usage(2, 1, 3)),
+            UpstreamResult(content='{"decision":"lgtm"}', usage=usage(2, 1, 3)),
+        ]
+    )
+    metrics = AppMetrics()
+    state = build_runtime_state(config=base_config, gateway=gateway, metrics=metrics)
+    client = TestClient(create_app(config=base_config, gateway=gateway, state=state))
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={
+            "model": "served-adapter",
+            "messages": [{"role": "user", "content": "hello"}],
+            "x_adapter_critic": {"max_adapter_retries": 1},
+        },
+    )
+    assert response.status_code == 200
+
+    assert metrics.request_duration.count(("served-adapter", "adapter", "false", "ok")) == 1
+    assert metrics.upstream_call_duration.count(("served-adapter", "adapter", "api", "https://api.example", "ok")) == 1
+    assert (
+        metrics.upstream_call_duration.count(("served-adapter", "adapter", "adapter", "https://adapter.example", "ok"))
+        == 2
+    )
+    assert metrics.adapter_retries.value(("served-adapter",)) == 1
+    assert metrics.tokens.value(("served-adapter", "adapter", "adapter", "prompt")) == 4
+
+    exposition = client.get("/metrics")
+    assert exposition.status_code == 200
+    assert exposition.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'adapter_critic_upstream_call_duration_seconds_count{served_model="served-adapter",mode="adapter",'
+        'stage="adapter",base_url="https://adapter.example",outcome="ok"} 2'
+    ) in exposition.text
+    assert 'adapter_critic_adapter_retries_total{served_model="served-adapter"} 1' in exposition.text
+
+
+def test_streaming_request_is_recorded_when_stream_finishes(base_config: AppConfig) -> None:
+    gateway = FakeGateway([UpstreamResult(content="hello", usage=usage(1, 1, 2))])
+    metrics = AppMetrics()
+    state = build_runtime_state(config=base_config, gateway=gateway, metrics=metrics)
+    client = TestClient(create_app(config=base_config, gateway=gateway, state=state))
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={"model": "served-direct", "messages": [{"role": "user", "content": "hi"}], "stream": True},
+    )
+
+    assert response.status_code == 200
+    assert metrics.request_duration.count(("served-direct", "direct", "true", "ok")) == 1
+    assert metrics.upstream_call_duration.count(("served-direct", "direct", "api", "https://api.example", "ok")) == 1
+    assert metrics.tokens.value(("served-direct", "direct", "api", "completion")) == 1
+
+
+def test_per_request_base_url_overrides_share_one_metric_label(base_config: AppConfig) -> None:
+    gateway = FakeGateway([UpstreamResult(content=f"answer {index}", usage=usage(1, 1, 2)) for index in range(2)])
+    metrics = AppMetrics()
+    state = build_runtime_state(config=base_config, gateway=gateway, metrics=metrics)
+    client = TestClient(create_app(config=base_config, gateway=gateway, state=state))
+
+    for host in ["one", "two"]:
+        response = client.post(
+            "/v1/chat/completions",
+            json={
+                "model": "served-direct",
+                "messages": [{"role": "user", "content": "hi"}],
+                "x_adapter_critic": {"api_base_url": f"https://{host}.example/v1"},
+            },
+        )
+        assert response.status_code == 200
+
+    assert [call["base_url"] for call in gateway.calls] == ["https://one.example/v1", "https://two.example/v1"]
+    assert metrics.upstream_call_duration.count(("served-direct", "direct", "api", "override", "ok")) == 2
+    assert "one.example" not in metrics.render()
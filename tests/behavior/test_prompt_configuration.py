@@ -99,3 +99,31 @@ def test_advisor_prompt_is_configurable_per_served_model() -> None:
 
     assert response.status_code == 200
     assert gateway.calls[0]["messages"][0].content == "advisor prompt from config"
+
+
+def test_prefix_cache_layout_moves_tool_contract_out_of_critic_system_prompt() -> None:
+    client, gateway = build_client(
+        _prompt_config(),
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content="feedback", usage=usage(1, 1, 2)),
+            UpstreamResult(content="final", usage=usage(1, 1, 2)),
+        ],
+    )
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={
+            "model": "served-direct",
+            "messages": [{"role": "user", "content": "hello"}],
+            "tools": [{"type": "function", "function": {"name": "lookup", "parameters": {"type": "object"}}}],
+            "x_adapter_critic": {"mode": "critic", "prompt_layout": "prefix_cache"},
+        },
+    )
+
+    assert response.status_code == 200
+    critic_messages = gateway.calls[1]["messages"]
+    assert critic_messages[0].content is not None and "lookup" not in critic_messages[0].content
+    assert critic_messages[1].content is not None and critic_messages[1].content.startswith(
+        "Authoritative tool definitions for this conversation:"
+    )
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from adapter_critic.app import create_app
+from adapter_critic.config import AppConfig
+from adapter_critic.upstream import UpstreamResult
+from tests.helpers import FakeGateway, usage
+
+
+def _replica_config() -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "served_models": {
+                "served-direct": {
+                    "mode": "direct",
+                    "api": {
+                        "model": "api-model",
+                        "base_url": "http://pool/v1",
+                        "replicas": [
+                            {"base_url": "http://testserver/r1/v1", "weight": 2},
+                            {"base_url": "http://testserver/r2/v1"},
+                        ],
+                    },
+                }
+            }
+        }
+    )
+
+
+def test_unhealthy_replica_is_skipped_after_healthz(monkeypatch: pytest.MonkeyPatch) -> None:
+    upstream = FastAPI()
+
+    @upstream.get("/r1/v1/models")
+    async def healthy_models() -> dict[str, Any]:
+        return {"object": "list", "data": [{"id": "api-model"}]}
+
+    @upstream.get("/r2/v1/models")
+    async def failing_models() -> Response:
+        return Response(status_code=503)
+
+    transport = httpx.ASGITransport(app=upstream)
+    original_async_client = httpx.AsyncClient
+
+    def patched_async_client(*args: Any, **kwargs: Any) -> httpx.AsyncClient:
+        return original_async_client(*args, transport=transport, **kwargs)
+
+    monkeypatch.setattr(httpx, "AsyncClient", patched_async_client)
+
+    gateway = FakeGateway([UpstreamResult(content="ok", usage=usage(1, 1, 2)) for _ in range(10)])
+    client = TestClient(create_app(config=_replica_config(), gateway=gateway))
+
+    health = client.get("/healthz").json()
+    assert [(target["base_url"], target["ok"]) for target in health["targets"]] == [
+        ("http://testserver/r1/v1", True),
+        ("http://testserver/r2/v1", False),
+    ]
+
+    for _ in range(10):
+        response = client.post(
+            "/v1/chat/completions",
+            json={"model": "served-direct", "messages": [{"role": "user", "content": "hi"}]},
+        )
+        assert response.status_code == 200
+    assert {call["base_url"] for call in gateway.calls} == {"http://testserver/r1/v1"}
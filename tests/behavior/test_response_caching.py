@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+from adapter_critic.app import create_app
+from adapter_critic.config import AppConfig
+from adapter_critic.response_cache import ResponseCache
+from adapter_critic.runtime import build_runtime_state
+from adapter_critic.upstream import UpstreamResult
+from tests.helpers import FakeGateway, usage
+
+
+def _cached_client(config: AppConfig, responses: list[UpstreamResult]) -> tuple[TestClient, FakeGateway, ResponseCache]:
+    gateway = FakeGateway(responses)
+    cache = ResponseCache()
+    state = build_runtime_state(config=config, gateway=gateway, response_cache=cache)
+    return TestClient(create_app(config=config, gateway=gateway, state=state)), gateway, cache
+
+
+def _request(**extra: Any) -> dict[str, Any]:
+    return {"model": "served-direct", "messages": [{"role": "user", "content": "hello"}], **extra}
+
+
+def test_deterministic_request_is_served_from_cache(base_config: AppConfig) -> None:
+    client, gateway, cache = _cached_client(base_config, [UpstreamResult(content="cached", usage=usage(1, 1, 2))])
+
+    first = client.post("/v1/chat/completions", json=_request(temperature=0))
+    second = client.post("/v1/chat/completions", json=_request(temperature=0, user="someone-else"))
+
+    assert first.headers["x-adapter-critic-cache"] == "miss"
+    assert second.headers["x-adapter-critic-cache"] == "hit"
+    assert second.json()["choices"][0]["message"]["content"] == "cached"
+    assert second.json()["usage"] == first.json()["usage"]
+    assert len(gateway.calls) == 1
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.stores) == (1, 1, 1)
+
+
+def test_non_deterministic_request_bypasses_cache_unless_opted_in(base_config: AppConfig) -> None:
+    client, gateway, cache = _cached_client(
+        base_config,
+        [
+            UpstreamResult(content="first", usage=usage(1, 1, 2)),
+            UpstreamResult(content="second", usage=usage(1, 1, 2)),
+        ],
+    )
+
+    sampled = client.post("/v1/chat/completions", json=_request(temperature=0.7))
+    opted_in = client.post(
+        "/v1/chat/completions",
+        json=_request(temperature=0.7, x_adapter_critic={"response_cache": True}),
+    )
+    replayed = client.post(
+        "/v1/chat/completions",
+        json=_request(temperature=0.7, x_adapter_critic={"response_cache": True}),
+    )
+
+    assert sampled.headers["x-adapter-critic-cache"] == "bypass"
+    assert opted_in.headers["x-adapter-critic-cache"] == "miss"
+    assert replayed.headers["x-adapter-critic-cache"] == "hit"
+    assert replayed.json()["choices"][0]["message"]["content"] == "second"
+    assert len(gateway.calls) == 2
+    assert cache.stats.bypasses == 1
+
+
+def test_cache_control_no_cache_refreshes_entry(base_config: AppConfig) -> None:
+    client, gateway, _ = _cached_client(
+        base_config,
+        [
+            UpstreamResult(content="stale", usage=usage(1, 1, 2)),
+            UpstreamResult(content="fresh", usage=usage(1, 1, 2)),
+        ],
+    )
+
+    client.post("/v1/chat/completions", json=_request(temperature=0))
+    refreshed = client.post(
+        "/v1/chat/completions",
+        json=_request(temperature=0),
+        headers={"Cache-Control": "no-cache"},
+    )
+    after = client.post("/v1/chat/completions", json=_request(temperature=0))
+
+    assert refreshed.headers["x-adapter-critic-cache"] == "bypass"
+    assert refreshed.json()["choices"][0]["message"]["content"] == "fresh"
+    assert after.json()["choices"][0]["message"]["content"] == "fresh"
+    assert len(gateway.calls) == 2
+
+
+def test_streaming_request_replays_cached_output(base_config: AppConfig) -> None:
+    client, gateway, _ = _cached_client(base_config, [UpstreamResult(content="cached", usage=usage(1, 1, 2))])
+
+    client.post("/v1/chat/completions", json=_request(temperature=0, stream=True))
+    response = client.post("/v1/chat/completions", json=_request(temperature=0, stream=True))
+
+    assert response.headers["x-adapter-critic-cache"] == "hit"
+    chunks = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: {")]
+    assert chunks[0]["choices"][0]["delta"]["content"] == "cached"
+    assert chunks[-1]["adapter_critic"]["mode"] == "direct"
+    assert len(gateway.calls) == 1
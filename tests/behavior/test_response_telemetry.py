@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+
 from adapter_critic.config import AppConfig
 from adapter_critic.upstream import UpstreamResult
 from tests.helpers import build_client, usage
@@ -146,3 +148,60 @@ def test_advisor_telemetry_schema_stage_keys(base_config: AppConfig) -> None:
     assert payload["adapter_critic"]["mode"] == "advisor"
     assert set(payload["adapter_critic"]["intermediate"].keys()) == {"advisor", "final"}
     assert set(payload["adapter_critic"]["tokens"]["stages"].keys()) == {"advisor", "api"}
+
+
+def test_timings_report_stage_calls_and_proxy_overhead(base_config: AppConfig) -> None:
+    rejected = '{"decision":"patch","patches":[{"op":"replace","path":"/unknown","value":"x"}]}'
+    client, _gateway = build_client(
+        base_config,
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content=rejected, usage=usage(2, 1, 3)),
+            UpstreamResult(content='{"decision":"lgtm"}', usage=usage(2, 1, 3)),
+        ],
+    )
+    payload = client.post(
+        "/v1/chat/completions",
+        json={
+            "model": "served-adapter",
+            "messages": [{"role": "user", "content": "hi"}],
+            "x_adapter_critic": {"max_adapter_retries": 1},
+        },
+    ).json()
+
+    timings = payload["adapter_critic"]["timings"]
+    assert set(timings["stages"].keys()) == {"api", "adapter"}
+    assert len(timings["stages"]["api"]) == 1
+    assert len(timings["stages"]["adapter"]) == 2
+    assert set(timings["overhead"].keys()) == {
+        "parse",
+        "config_resolution",
+        "prompt_rendering",
+        "patch_application",
+        "response_building",
+    }
+    assert timings["queueing_ms"] >= 0
+    assert timings["total_ms"] >= sum(timings["stages"]["adapter"])
+
+
+def test_streaming_final_chunk_carries_timings(base_config: AppConfig) -> None:
+    client, _gateway = build_client(
+        base_config,
+        [
+            UpstreamResult(content="draft", usage=usage(3, 2, 5)),
+            UpstreamResult(content="critique", usage=usage(2, 1, 3)),
+            UpstreamResult(content="final", usage=usage(4, 2, 6)),
+        ],
+    )
+    response = client.post(
+        "/v1/chat/completions",
+        json={"model": "served-critic", "messages": [{"role": "user", "content": "hi"}], "stream": True},
+    )
+    chunks = [
+        json.loads(line.removeprefix("data: ")) for line in response.text.splitlines() if line.startswith("data: {")
+    ]
+
+    timings = chunks[-1]["adapter_critic"]["timings"]
+    assert set(timings["stages"].keys()) == {"api_draft", "critic", "api_final"}
+    assert "prompt_rendering" in timings["overhead"]
+    assert "response_building" in timings["overhead"]
@@ -3,16 +3,21 @@ from __future__ import annotations
 from typing import Any
 
 import pytest
+from fastapi.testclient import TestClient
 
+from adapter_critic.app import create_app
+from adapter_critic.config import AppConfig
 from adapter_critic.contracts import ChatMessage
 from adapter_critic.routing_gateway import RoutingGateway
 from adapter_critic.upstream import TokenUsage, UpstreamResult
+from tests.helpers import StreamFromCompleteMixin
 
 
-class _RecordingGateway:
+class _RecordingGateway(StreamFromCompleteMixin):
     def __init__(self, response_text: str) -> None:
         self.response_text = response_text
         self.calls: list[dict[str, Any]] = []
+        self.closed = False
 
     async def complete(
         self,
@@ -37,6 +42,9 @@ class _RecordingGateway:
             usage=TokenUsage(prompt_tokens=1, completion_tokens=1, total_tokens=2),
         )
 
+    async def aclose(self) -> None:
+        self.closed = True
+
 
 @pytest.mark.anyio
 async def test_routing_gateway_uses_vertex_gateway_for_vertex_claude_target() -> None:
@@ -70,3 +78,21 @@ async def test_routing_gateway_uses_openai_gateway_for_non_vertex_target() -> No
     assert result.content == "openai"
     assert len(openai_gateway.calls) == 1
     assert len(vertex_gateway.calls) == 0
+
+
+def test_app_shutdown_closes_routed_gateways(base_config: AppConfig) -> None:
+    openai_gateway = _RecordingGateway(response_text="openai")
+    vertex_gateway = _RecordingGateway(response_text="vertex")
+    gateway = RoutingGateway(openai_gateway=openai_gateway, vertex_gateway=vertex_gateway)
+    app = create_app(config=base_config, gateway=gateway)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/v1/chat/completions",
+            json={"model": "served-direct", "messages": [{"role": "user", "content": "hello"}]},
+        )
+        assert response.status_code == 200
+        assert openai_gateway.closed is False
+
+    assert openai_gateway.closed is True
+    assert vertex_gateway.closed is True
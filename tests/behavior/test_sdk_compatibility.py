@@ -55,3 +55,28 @@ async def test_openai_sdk_adapter_mode_without_secondary_target_uses_api_target(
     assert adapter_critic is not None
     assert adapter_critic["mode"] == "adapter"
     assert [call["model"] for call in gateway.calls] == ["api-model", "api-model"]
+
+
+@pytest.mark.anyio
+async def test_openai_sdk_streaming_direct_mode(base_config: AppConfig) -> None:
+    gateway = FakeGateway([UpstreamResult(content="streamed", usage=usage(2, 1, 3))])
+    app = create_app(config=base_config, gateway=gateway)
+    transport = httpx.ASGITransport(app=app)
+    http_client = httpx.AsyncClient(transport=transport, base_url="http://testserver")
+    client = AsyncOpenAI(api_key="test", base_url="http://testserver/v1", http_client=http_client)
+
+    stream = await client.chat.completions.create(
+        model="served-direct",
+        messages=[{"role": "user", "content": "hello"}],
+        stream=True,
+    )
+    chunks = [chunk async for chunk in stream]
+    await client.close()
+
+    assert "".join(chunk.choices[0].delta.content or "" for chunk in chunks if chunk.choices) == "streamed"
+    assert chunks[-1].choices[0].finish_reason == "stop"
+    assert chunks[-1].usage is not None
+    assert chunks[-1].usage.total_tokens == 3
+    adapter_critic = chunks[-1].model_extra.get("adapter_critic") if chunks[-1].model_extra is not None else None
+    assert adapter_critic is not None
+    assert adapter_critic["mode"] == "direct"
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+
+from adapter_critic.config import HedgeConfig
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.hedging import Hedger
+from adapter_critic.metrics import AppMetrics
+from adapter_critic.singleflight_gateway import SingleflightGateway
+from adapter_critic.upstream import TokenUsage, UpstreamResult
+from tests.helpers import FakeGateway, StreamFromCompleteMixin
+
+
+class _GatedGateway(StreamFromCompleteMixin):
+    def __init__(self, error: Exception | None = None) -> None:
+        self.release = anyio.Event()
+        self.calls: list[str] = []
+        self._error = error
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        del base_url, api_key_env, request_options
+        self.calls.append(model)
+        await self.release.wait()
+        if self._error is not None:
+            raise self._error
+        return UpstreamResult(
+            content=f"{model}:{messages[-1].content}",
+            usage=TokenUsage(prompt_tokens=1, completion_tokens=1, total_tokens=2),
+        )
+
+
+async def _complete(
+    gateway: SingleflightGateway,
+    results: list[str],
+    model: str = "api-model",
+    usages: list[int] | None = None,
+) -> None:
+    result = await gateway.complete(
+        model=model,
+        base_url="https://api.example",
+        messages=[ChatMessage(role="user", content="hello")],
+        request_options={"temperature": 0},
+    )
+    results.append(result.content)
+    if usages is not None:
+        usages.append(result.usage.total_tokens)
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_calls_share_one_upstream_call() -> None:
+    inner = _GatedGateway()
+    metrics = AppMetrics()
+    gateway = SingleflightGateway(inner, metrics)
+    results: list[str] = []
+    usages: list[int] = []
+
+    async with anyio.create_task_group() as task_group:
+        for model in ["api-model", "api-model", "api-model", "other-model"]:
+            task_group.start_soon(_complete, gateway, results, model, usages)
+        await anyio.wait_all_tasks_blocked()
+        inner.release.set()
+
+    assert sorted(inner.calls) == ["api-model", "other-model"]
+    assert sorted(results) == ["api-model:hello"] * 3 + ["other-model:hello"]
+    assert (gateway.stats.leader_calls, gateway.stats.coalesced_calls) == (2, 2)
+    assert sorted(usages) == [0, 0, 2, 2]
+    assert metrics.singleflight_calls.value(("leader",)) == 2
+    assert metrics.singleflight_calls.value(("coalesced",)) == 2
+    assert gateway.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_followers_receive_leader_failure() -> None:
+    request = httpx.Request("POST", "https://api.example/chat/completions")
+    inner = _GatedGateway(error=httpx.ConnectError("boom", request=request))
+    gateway = SingleflightGateway(inner)
+    failures: list[str] = []
+
+    async def call() -> None:
+        try:
+            await _complete(gateway, [])
+        except httpx.ConnectError as exc:
+            failures.append(str(exc))
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(call)
+        task_group.start_soon(call)
+        await anyio.wait_all_tasks_blocked()
+        inner.release.set()
+
+    assert failures == ["boom", "boom"]
+    assert len(inner.calls) == 1
+
+
+@pytest.mark.anyio
+async def test_follower_takes_over_when_leader_is_cancelled() -> None:
+    inner = _GatedGateway()
+    gateway = SingleflightGateway(inner)
+    results: list[str] = []
+
+    leader_scope = anyio.CancelScope()
+
+    async def leader() -> None:
+        with leader_scope:
+            await _complete(gateway, results)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(leader)
+        await anyio.wait_all_tasks_blocked()
+        task_group.start_soon(_complete, gateway, results)
+        await anyio.wait_all_tasks_blocked()
+        leader_scope.cancel()
+        await anyio.wait_all_tasks_blocked()
+        inner.release.set()
+
+    assert results == ["api-model:hello"]
+    assert len(inner.calls) == 2
+    assert gateway.stats.leader_calls == 2
+
+
+class _SlowFirstCallGateway(FakeGateway):
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        first_call = not self.calls
+        result = await super().complete(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        )
+        if first_call:
+            await anyio.sleep(5)
+        return result
+
+
+@pytest.mark.anyio
+async def test_hedge_to_the_same_target_is_not_coalesced_with_its_primary() -> None:
+    inner = _SlowFirstCallGateway(
+        [
+            UpstreamResult(content="slow primary", usage=TokenUsage(total_tokens=2)),
+            UpstreamResult(content="hedge", usage=TokenUsage(total_tokens=2)),
+        ]
+    )
+    metrics = AppMetrics()
+    gateway = SingleflightGateway(inner, metrics)
+    hedger = Hedger(metrics)
+
+    with anyio.fail_after(2):
+        result = await hedger.complete(
+            gateway,
+            served_model="served",
+            stage="api",
+            policy=HedgeConfig(initial_delay_ms=10, max_hedge_rate=1.0),
+            model="api-model",
+            base_url="https://api.example",
+            messages=[ChatMessage(role="user", content="hello")],
+        )
+
+    assert result.content == "hedge"
+    assert len(inner.calls) == 2
+    assert hedger.stats(served_model="served", stage="api").hedges_won == 1
+    assert gateway.stats.coalesced_calls == 0
+    assert gateway.in_flight == 0
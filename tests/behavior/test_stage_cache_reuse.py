@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+from adapter_critic.config import AppConfig
+from adapter_critic.metrics import AppMetrics
+from adapter_critic.stage_cache import StageCache
+from adapter_critic.upstream import UpstreamResult
+from tests.helpers import build_client, usage
+
+CACHED_ZERO_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cached": True}
+
+
+def _post(client: TestClient, model: str) -> dict[str, Any]:
+    response = client.post(
+        "/v1/chat/completions",
+        json={"model": model, "messages": [{"role": "user", "content": "hello"}]},
+    )
+    assert response.status_code == 200
+    body: dict[str, Any] = response.json()
+    return body
+
+
+def test_repeated_adapter_stage_reuses_cached_verdict(base_config: AppConfig) -> None:
+    stage_cache = StageCache()
+    client, gateway = build_client(
+        base_config,
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content='{"decision":"lgtm"}', usage=usage(2, 1, 3)),
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+        ],
+        stage_cache=stage_cache,
+    )
+
+    first = _post(client, "served-adapter")
+    second = _post(client, "served-adapter")
+
+    assert [call["model"] for call in gateway.calls] == ["api-model", "adapter-model", "api-model"]
+    assert "cached" not in first["adapter_critic"]["tokens"]["stages"]["adapter"]
+    assert second["adapter_critic"]["tokens"]["stages"]["adapter"] == CACHED_ZERO_USAGE
+    assert second["usage"] == {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    assert second["choices"][0]["message"]["content"] == "draft"
+    assert stage_cache.stats.hits == 1
+
+
+def test_rejected_adapter_verdict_is_not_cached(base_config: AppConfig) -> None:
+    rejected = '{"decision":"patch","patches":[{"op":"replace","path":"/unknown","value":"x"}]}'
+    stage_cache = StageCache()
+    client, gateway = build_client(
+        base_config,
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content=rejected, usage=usage(2, 1, 3)),
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content='{"decision":"lgtm"}', usage=usage(2, 1, 3)),
+        ],
+        stage_cache=stage_cache,
+    )
+
+    _post(client, "served-adapter")
+    second = _post(client, "served-adapter")
+
+    assert [call["model"] for call in gateway.calls].count("adapter-model") == 2
+    assert "cached" not in second["adapter_critic"]["tokens"]["stages"]["adapter"]
+    assert len(stage_cache) == 1
+
+
+def test_repeated_critic_stage_reuses_cached_feedback(base_config: AppConfig) -> None:
+    metrics = AppMetrics()
+    client, gateway = build_client(
+        base_config,
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content="be specific", usage=usage(2, 2, 4)),
+            UpstreamResult(content="final", usage=usage(3, 3, 6)),
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content="final", usage=usage(3, 3, 6)),
+        ],
+        stage_cache=StageCache(metrics=metrics),
+        metrics=metrics,
+    )
+
+    _post(client, "served-critic")
+    second = _post(client, "served-critic")
+
+    assert [call["model"] for call in gateway.calls].count("critic-model") == 1
+    assert second["adapter_critic"]["intermediate"]["critic"] == "be specific"
+    assert second["adapter_critic"]["tokens"]["stages"]["critic"] == CACHED_ZERO_USAGE
+    assert second["usage"]["total_tokens"] == 8
+    assert metrics.stage_cache_lookups.value(("critic", "miss")) == 1
+    assert metrics.stage_cache_lookups.value(("critic", "hit")) == 1
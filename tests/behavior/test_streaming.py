@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from adapter_critic.app import create_app
+from adapter_critic.config import AppConfig, resolve_runtime_config
+from adapter_critic.contracts import AdapterCriticOverrides, ChatMessage
+from adapter_critic.metrics import AppMetrics
+from adapter_critic.runtime import build_runtime_state
+from adapter_critic.upstream import UpstreamDelta, UpstreamResult
+from adapter_critic.workflows.adapter import stream_adapter
+from adapter_critic.workflows.direct import WorkflowEvent, WorkflowOutput
+from tests.helpers import build_client, usage
+
+
+class StreamingGateway:
+    def __init__(self, deltas: Sequence[UpstreamDelta]) -> None:
+        self._deltas = list(deltas)
+        self.stream_calls: list[dict[str, Any]] = []
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        del model, base_url, messages, api_key_env, request_options
+        raise AssertionError("direct streaming must not call complete")
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        self.stream_calls.append({"model": model, "base_url": base_url, "request_options": request_options})
+        for delta in self._deltas:
+            yield delta
+
+
+def _sse_events(body: str) -> list[Any]:
+    events: list[Any] = []
+    for line in body.splitlines():
+        if not line.startswith("data: "):
+            continue
+        data = line[len("data: ") :]
+        events.append(data if data == "[DONE]" else json.loads(data))
+    return events
+
+
+def test_direct_mode_streams_upstream_chunks_with_final_extension(base_config: AppConfig) -> None:
+    gateway = StreamingGateway(
+        [
+            UpstreamDelta(content="Hel"),
+            UpstreamDelta(content="lo"),
+            UpstreamDelta(finish_reason="stop"),
+            UpstreamDelta(usage=usage(4, 2, 6)),
+        ]
+    )
+    state = build_runtime_state(
+        config=base_config,
+        gateway=gateway,
+        id_provider=lambda: "chatcmpl-stream",
+        time_provider=lambda: 1700000000,
+    )
+    client = TestClient(create_app(config=base_config, gateway=gateway, state=state))
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={
+            "model": "served-direct",
+            "messages": [{"role": "user", "content": "hello"}],
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            "temperature": 0,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response.text)
+    assert events[-1] == "[DONE]"
+    chunks = events[:-1]
+    assert all(chunk["object"] == "chat.completion.chunk" and chunk["id"] == "chatcmpl-stream" for chunk in chunks)
+    assert chunks[0]["choices"][0]["delta"] == {"role": "assistant", "content": "Hel"}
+    assert chunks[1]["choices"][0]["delta"] == {"content": "lo"}
+
+    final_chunk = chunks[-1]
+    assert final_chunk["choices"][0]["finish_reason"] == "stop"
+    assert final_chunk["usage"] == {"prompt_tokens": 4, "completion_tokens": 2, "total_tokens": 6}
+    assert final_chunk["adapter_critic"]["mode"] == "direct"
+    assert final_chunk["adapter_critic"]["intermediate"] == {"api": "Hello"}
+    assert final_chunk["adapter_critic"]["tokens"]["total"] == final_chunk["usage"]
+    assert gateway.stream_calls[0]["request_options"] == {"temperature": 0}
+
+
+def test_direct_mode_streams_tool_call_deltas(base_config: AppConfig) -> None:
+    gateway = StreamingGateway(
+        [
+            UpstreamDelta(
+                tool_calls=[
+                    {
+                        "index": 0,
+                        "id": "call_1",
+                        "type": "function",
+                        "function": {"name": "lookup", "arguments": ""},
+                    }
+                ]
+            ),
+            UpstreamDelta(tool_calls=[{"index": 0, "function": {"arguments": '{"id":'}}]),
+            UpstreamDelta(tool_calls=[{"index": 0, "function": {"arguments": "1}"}}]),
+            UpstreamDelta(finish_reason="tool_calls", usage=usage(3, 3, 6)),
+        ]
+    )
+    client = TestClient(create_app(config=base_config, gateway=gateway))
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={"model": "served-direct", "messages": [{"role": "user", "content": "hello"}], "stream": True},
+    )
+
+    chunks = _sse_events(response.text)[:-1]
+    assert chunks[0]["choices"][0]["delta"]["tool_calls"][0]["function"]["name"] == "lookup"
+    final_chunk = chunks[-1]
+    assert final_chunk["choices"][0]["finish_reason"] == "tool_calls"
+    assert final_chunk["usage"]["total_tokens"] == 6
+
+
+def test_adapter_mode_stream_emits_buffered_final_output(base_config: AppConfig) -> None:
+    client, gateway = build_client(
+        base_config,
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content='{"decision":"lgtm"}', usage=usage(2, 1, 3)),
+        ],
+    )
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={"model": "served-adapter", "messages": [{"role": "user", "content": "hello"}], "stream": True},
+    )
+
+    assert response.status_code == 200
+    chunks = _sse_events(response.text)[:-1]
+    assert chunks[0]["choices"][0]["delta"] == {"role": "assistant", "content": "draft"}
+    assert chunks[-1]["adapter_critic"]["mode"] == "adapter"
+    assert chunks[-1]["usage"]["total_tokens"] == 5
+    assert all(
+        call["request_options"] is not None and "stream" not in call["request_options"] for call in gateway.calls
+    )
+
+
+class FailingStreamGateway(StreamingGateway):
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        del model, base_url, messages, api_key_env, request_options
+        request = httpx.Request("POST", "https://api.example/v1/chat/completions")
+        response = httpx.Response(503, request=request, json={"error": {"message": "overloaded"}})
+        raise httpx.HTTPStatusError("503 Service Unavailable", request=request, response=response)
+        yield UpstreamDelta()
+
+
+def test_direct_mode_stream_returns_502_when_upstream_fails_before_first_chunk(base_config: AppConfig) -> None:
+    client = TestClient(create_app(config=base_config, gateway=FailingStreamGateway([])))
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={"model": "served-direct", "messages": [{"role": "user", "content": "hello"}], "stream": True},
+    )
+
+    assert response.status_code == 502
+    assert response.json() == {"detail": "upstream request failed"}
+
+
+def test_critic_mode_streams_final_pass_with_per_stage_usage(base_config: AppConfig) -> None:
+    client, gateway = build_client(
+        base_config,
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content="be more specific", usage=usage(2, 2, 4)),
+            UpstreamResult(content="final answer", usage=usage(3, 3, 6)),
+        ],
+    )
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={"model": "served-critic", "messages": [{"role": "user", "content": "hello"}], "stream": True},
+    )
+
+    chunks = _sse_events(response.text)[:-1]
+    assert chunks[0]["choices"][0]["delta"] == {"role": "assistant", "content": "final answer"}
+    final_chunk = chunks[-1]
+    assert final_chunk["adapter_critic"]["mode"] == "critic"
+    assert final_chunk["adapter_critic"]["tokens"]["stages"] == {
+        "api_draft": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        "critic": {"prompt_tokens": 2, "completion_tokens": 2, "total_tokens": 4},
+        "api_final": {"prompt_tokens": 3, "completion_tokens": 3, "total_tokens": 6},
+    }
+    assert final_chunk["usage"]["total_tokens"] == 12
+    assert [call["model"] for call in gateway.calls] == ["api-model", "critic-model", "api-model"]
+
+
+def test_advisor_mode_streams_guided_api_pass(base_config: AppConfig) -> None:
+    client, gateway = build_client(
+        base_config,
+        [
+            UpstreamResult(content="check the refund policy", usage=usage(1, 2, 3)),
+            UpstreamResult(content="guided answer", usage=usage(4, 5, 9)),
+        ],
+    )
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={
+            "model": "served-direct",
+            "messages": [{"role": "user", "content": "hello"}],
+            "stream": True,
+            "x_adapter_critic": {"mode": "advisor"},
+        },
+    )
+
+    chunks = _sse_events(response.text)[:-1]
+    assert "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks) == "guided answer"
+    final_chunk = chunks[-1]
+    assert final_chunk["adapter_critic"]["intermediate"] == {
+        "advisor": "check the refund policy",
+        "final": "guided answer",
+    }
+    assert set(final_chunk["adapter_critic"]["tokens"]["stages"]) == {"advisor", "api"}
+    assert "check the refund policy" in (gateway.calls[1]["messages"][-1].content or "")
+
+
+def _speculative_request(**overrides: Any) -> dict[str, Any]:
+    return {
+        "model": "served-adapter",
+        "messages": [{"role": "user", "content": "hello"}],
+        "stream": True,
+        "x_adapter_critic": {"adapter_streaming": "speculative", **overrides},
+    }
+
+
+def test_speculative_adapter_stream_replays_draft_chunks_on_lgtm(base_config: AppConfig) -> None:
+    client, gateway = build_client(
+        base_config,
+        [
+            UpstreamResult(content="draft", usage=usage(1, 1, 2)),
+            UpstreamResult(content='{"decision":"lgtm"}', usage=usage(2, 1, 3)),
+        ],
+    )
+
+    response = client.post("/v1/chat/completions", json=_speculative_request())
+
+    assert response.status_code == 200
+    chunks = _sse_events(response.text)[:-1]
+    assert chunks[0]["choices"][0]["delta"] == {"role": "assistant", "content": "draft"}
+    final_chunk = chunks[-1]
+    assert final_chunk["usage"]["total_tokens"] == 5
+    speculation = json.loads(final_chunk["adapter_critic"]["intermediate"]["adapter_speculation"])
+    assert speculation["release"] == "early"
+    assert set(speculation) == {"release", "draft_ms", "adapter_ms", "first_chunk_ms"}
+    assert [call["model"] for call in gateway.calls] == ["api-model", "adapter-model"]
+
+
+def test_speculative_adapter_stream_emits_patched_content(base_config: AppConfig) -> None:
+    client, _ = build_client(
+        base_config,
+        [
+            UpstreamResult(content="Hello", usage=usage(1, 1, 2)),
+            UpstreamResult(
+                content='{"decision":"patch","patches":[{"op":"replace","path":"/content","value":"Hello world"}]}',
+                usage=usage(2, 1, 3),
+            ),
+        ],
+    )
+
+    response = client.post("/v1/chat/completions", json=_speculative_request())
+
+    chunks = _sse_events(response.text)[:-1]
+    assert "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks) == "Hello world"
+    assert chunks[-1]["adapter_critic"]["intermediate"]["api_draft"] == "Hello"
+
+
+class VerdictGateway(StreamingGateway):
+    def __init__(
+        self,
+        deltas: Sequence[UpstreamDelta],
+        verdict: str = '{"decision":"lgtm"}',
+        delay_seconds: float = 0,
+        streamed: list[WorkflowEvent] | None = None,
+    ) -> None:
+        super().__init__(deltas)
+        self.verdict = verdict
+        self.delay_seconds = delay_seconds
+        self.streamed = streamed if streamed is not None else []
+        self.streamed_before_verdict: list[str] = []
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        del model, base_url, messages, api_key_env, request_options
+        self.streamed_before_verdict = [event.content for event in self.streamed if isinstance(event, UpstreamDelta)]
+        await anyio.sleep(self.delay_seconds)
+        return UpstreamResult(content=self.verdict, usage=usage(1, 1, 2))
+
+
+def test_speculative_adapter_stream_streams_verdict_result_when_lgtm_is_late(base_config: AppConfig) -> None:
+    gateway = VerdictGateway([UpstreamDelta(content="dr"), UpstreamDelta(content="aft")], delay_seconds=0.1)
+    client = TestClient(create_app(config=base_config, gateway=gateway))
+
+    response = client.post("/v1/chat/completions", json=_speculative_request(adapter_speculative_release_ms=20))
+
+    chunks = _sse_events(response.text)[:-1]
+    assert chunks[0]["choices"][0]["delta"] == {"role": "assistant", "content": "draft"}
+    intermediate = chunks[-1]["adapter_critic"]["intermediate"]
+    assert json.loads(intermediate["adapter_speculation"])["release"] == "verdict"
+    assert "adapter_rejection_reason" not in intermediate
+    assert chunks[-1]["adapter_critic"]["tokens"]["stages"]["adapter"]["total_tokens"] == 2
+
+
+async def _stream_speculative(
+    base_config: AppConfig, verdict: str
+) -> tuple[VerdictGateway, list[WorkflowEvent], WorkflowOutput]:
+    runtime = resolve_runtime_config(
+        base_config,
+        "served-adapter",
+        AdapterCriticOverrides(adapter_streaming="speculative", adapter_speculative_release_ms=1000),
+    )
+    assert runtime is not None
+    events: list[WorkflowEvent] = []
+    gateway = VerdictGateway(
+        [UpstreamDelta(content="Hello "), UpstreamDelta(content="world"), UpstreamDelta(finish_reason="stop")],
+        verdict,
+        streamed=events,
+    )
+    async for event in stream_adapter(runtime, [ChatMessage(role="user", content="hi")], gateway, {}):
+        events.append(event)
+    output = events[-1]
+    assert isinstance(output, WorkflowOutput)
+    return gateway, events[:-1], output
+
+
+def _streamed_content(events: list[WorkflowEvent]) -> list[str]:
+    return [event.content for event in events if isinstance(event, UpstreamDelta) and event.content != ""]
+
+
+@pytest.mark.anyio
+async def test_speculative_adapter_stream_buffers_draft_until_quick_lgtm(base_config: AppConfig) -> None:
+    gateway, events, output = await _stream_speculative(base_config, '{"decision":"lgtm"}')
+
+    assert gateway.streamed_before_verdict == []
+    assert _streamed_content(events) == ["Hello ", "world"]
+    assert json.loads(output.intermediate["adapter_speculation"])["release"] == "early"
+
+
+@pytest.mark.anyio
+async def test_speculative_adapter_stream_applies_patch_to_the_whole_draft(base_config: AppConfig) -> None:
+    patch = '{"decision":"patch","patches":[{"op":"replace","path":"/content","value":"Goodbye world"}]}'
+    gateway, events, output = await _stream_speculative(base_config, patch)
+
+    assert gateway.streamed_before_verdict == []
+    assert _streamed_content(events) == ["Goodbye world"]
+    assert output.final_text == "Goodbye world"
+    assert json.loads(output.intermediate["adapter_speculation"])["release"] == "verdict"
+
+
+@pytest.mark.parametrize("adapter_streaming", ["blocking", "speculative"])
+def test_adapter_streams_record_time_to_first_chunk(base_config: AppConfig, adapter_streaming: str) -> None:
+    gateway = VerdictGateway([UpstreamDelta(content="draft"), UpstreamDelta(finish_reason="stop")])
+    metrics = AppMetrics()
+    state = build_runtime_state(config=base_config, gateway=gateway, metrics=metrics)
+    client = TestClient(create_app(config=base_config, gateway=gateway, state=state))
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={
+            "model": "served-adapter",
+            "messages": [{"role": "user", "content": "hello"}],
+            "stream": True,
+            "x_adapter_critic": {"adapter_streaming": adapter_streaming},
+        },
+    )
+
+    chunks = _sse_events(response.text)[:-1]
+    assert chunks[-1]["adapter_critic"]["timings"]["first_chunk_ms"] is not None
+    assert metrics.time_to_first_chunk.count(("served-adapter", "adapter", adapter_streaming)) == 1
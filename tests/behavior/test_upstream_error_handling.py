@@ -11,9 +11,10 @@ from adapter_critic.config import AppConfig
 from adapter_critic.contracts import ChatMessage
 from adapter_critic.http_gateway import UpstreamResponseFormatError
 from adapter_critic.upstream import UpstreamResult
+from tests.helpers import StreamFromCompleteMixin
 
 
-class BrokenGateway:
+class BrokenGateway(StreamFromCompleteMixin):
     async def complete(
         self,
         *,
@@ -34,7 +35,7 @@ class BrokenGateway:
         )
 
 
-class HttpFailureGateway:
+class HttpFailureGateway(StreamFromCompleteMixin):
     async def complete(
         self,
         *,
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 from typing import Any, TypedDict
 
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from adapter_critic.app import create_app
 from adapter_critic.config import AppConfig
 from adapter_critic.contracts import ChatMessage
+from adapter_critic.metrics import AppMetrics
 from adapter_critic.runtime import build_runtime_state
-from adapter_critic.upstream import TokenUsage, UpstreamResult
+from adapter_critic.stage_cache import StageCache
+from adapter_critic.streaming import deltas_from_result
+from adapter_critic.token_counter import Tokenizer
+from adapter_critic.upstream import TokenUsage, UpstreamDelta, UpstreamResult
 
 
 class GatewayCall(TypedDict):
@@ -20,7 +25,39 @@ class GatewayCall(TypedDict):
     request_options: dict[str, Any] | None
 
 
-class FakeGateway:
+class StreamFromCompleteMixin:
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        raise NotImplementedError
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        result = await self.complete(
+            model=model,
+            base_url=base_url,
+            messages=messages,
+            api_key_env=api_key_env,
+            request_options=request_options,
+        )
+        for delta in deltas_from_result(result):
+            yield delta
+
+
+class FakeGateway(StreamFromCompleteMixin):
     def __init__(self, responses: Sequence[UpstreamResult]) -> None:
         self._responses = list(responses)
         self.calls: list[GatewayCall] = []
@@ -46,21 +83,49 @@ class FakeGateway:
         return self._responses.pop(0)
 
 
-def build_client(
+def build_app(
     config: AppConfig,
-    responses: Sequence[UpstreamResult],
+    gateway: FakeGateway,
     *,
     response_id: str = "chatcmpl-test",
     created: int = 1700000000,
-) -> tuple[TestClient, FakeGateway]:
-    gateway = FakeGateway(responses)
+    stage_cache: StageCache | None = None,
+    metrics: AppMetrics | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> FastAPI:
     state = build_runtime_state(
         config=config,
         gateway=gateway,
         id_provider=lambda: response_id,
         time_provider=lambda: created,
+        stage_cache=stage_cache,
+        metrics=metrics,
+        tokenizer=tokenizer,
+    )
+    return create_app(config=config, gateway=gateway, state=state)
+
+
+def build_client(
+    config: AppConfig,
+    responses: Sequence[UpstreamResult] = (),
+    *,
+    gateway: FakeGateway | None = None,
+    response_id: str = "chatcmpl-test",
+    created: int = 1700000000,
+    stage_cache: StageCache | None = None,
+    metrics: AppMetrics | None = None,
+    tokenizer: Tokenizer | None = None,
+) -> tuple[TestClient, FakeGateway]:
+    gateway = gateway if gateway is not None else FakeGateway(responses)
+    app = build_app(
+        config,
+        gateway,
+        response_id=response_id,
+        created=created,
+        stage_cache=stage_cache,
+        metrics=metrics,
+        tokenizer=tokenizer,
     )
-    app = create_app(config=config, gateway=gateway, state=state)
     return TestClient(app), gateway
 
 
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+
+from adapter_critic.admission import AdmissionController, AdmissionRejectedError, configured_limits
+from adapter_critic.circuit_breaker import is_breaker_failure
+from adapter_critic.config import AppConfig, ConcurrencyLimitConfig, HedgeConfig, StageTarget
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.hedging import Hedger
+from adapter_critic.load_balancer import is_replica_failure
+from adapter_critic.metrics import AppMetrics, MeteredGateway
+from adapter_critic.upstream import TokenUsage, UpstreamDelta, UpstreamResult, stage_gateway
+
+MESSAGES = [ChatMessage(role="user", content="hi")]
+KEY = ("api", "https://api.example", "api-model")
+
+
+class _HoldingGateway:
+    def __init__(self, hold_seconds: float) -> None:
+        self.hold_seconds = hold_seconds
+        self.active = 0
+        self.peak = 0
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await anyio.sleep(self.hold_seconds)
+        finally:
+            self.active -= 1
+        return UpstreamResult(content=model, usage=TokenUsage())
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        result = await self.complete(model=model, base_url=base_url, messages=messages)
+        yield UpstreamDelta(content=result.content, finish_reason="stop")
+
+
+async def _call(controller: AdmissionController, gateway: _HoldingGateway, limit: ConcurrencyLimitConfig) -> None:
+    await controller.wrap(gateway, role="api", limit=limit).complete(
+        model="api-model", base_url="https://api.example", messages=MESSAGES
+    )
+
+
+@pytest.mark.anyio
+async def test_calls_beyond_the_limit_wait_for_a_slot() -> None:
+    metrics = AppMetrics(base_urls=[KEY[1]])
+    controller = AdmissionController(metrics)
+    gateway = _HoldingGateway(0.02)
+    limit = ConcurrencyLimitConfig(max_concurrency=2, max_queue=8, max_queue_ms=5000)
+
+    async with anyio.create_task_group() as task_group:
+        for _ in range(6):
+            task_group.start_soon(_call, controller, gateway, limit)
+
+    assert gateway.peak == 2
+    assert metrics.admission_wait.count(KEY) == 6
+    assert metrics.admission_queue_depth.value(KEY) == 0
+    assert metrics.admission_in_flight.value(KEY) == 0
+    assert controller.in_flight(role="api", model="api-model", base_url="https://api.example/") == 0
+
+
+@pytest.mark.anyio
+async def test_full_queue_rejects_with_429() -> None:
+    metrics = AppMetrics(base_urls=[KEY[1]])
+    controller = AdmissionController(metrics)
+    gateway = _HoldingGateway(0.2)
+    limit = ConcurrencyLimitConfig(max_concurrency=1, max_queue=0, retry_after_seconds=3)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(_call, controller, gateway, limit)
+        await anyio.sleep(0.01)
+        with pytest.raises(AdmissionRejectedError) as excinfo:
+            await _call(controller, gateway, limit)
+
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after_seconds == 3
+    assert metrics.admission_rejections.value((*KEY, "queue_full")) == 1
+
+
+@pytest.mark.anyio
+async def test_queue_wait_past_max_queue_ms_rejects_with_503() -> None:
+    metrics = AppMetrics(base_urls=[KEY[1]])
+    controller = AdmissionController(metrics)
+    gateway = _HoldingGateway(0.3)
+    limit = ConcurrencyLimitConfig(max_concurrency=1, max_queue=1, max_queue_ms=20)
+    depth_while_waiting: list[int] = []
+
+    async def observe_queue() -> None:
+        await anyio.sleep(0.01)
+        depth_while_waiting.append(
+            controller.queue_depth(role="api", model="api-model", base_url="https://api.example")
+        )
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(_call, controller, gateway, limit)
+        await anyio.sleep(0.01)
+        task_group.start_soon(observe_queue)
+        with pytest.raises(AdmissionRejectedError) as excinfo:
+            await _call(controller, gateway, limit)
+
+    assert excinfo.value.status_code == 503
+    assert depth_while_waiting == [1]
+    assert metrics.admission_rejections.value((*KEY, "queue_timeout")) == 1
+    assert gateway.peak == 1
+
+
+@pytest.mark.anyio
+async def test_api_and_side_stages_use_separate_slots_for_a_shared_target() -> None:
+    gateway = _HoldingGateway(0.05)
+    limit = ConcurrencyLimitConfig(max_concurrency=1, max_queue=4, max_queue_ms=5000)
+    metered = MeteredGateway(
+        gateway,
+        AppMetrics(),
+        served_model="served",
+        mode="adapter",
+        admission=AdmissionController(),
+        concurrency={"api": limit, "adapter": limit},
+    )
+
+    async def call(stage: str) -> None:
+        await stage_gateway(metered, stage).complete(
+            model="api-model", base_url="https://api.example", messages=MESSAGES
+        )
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(call, "api")
+        task_group.start_soon(call, "adapter")
+    assert gateway.peak == 2
+
+    gateway.peak = 0
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(call, "api_draft")
+        task_group.start_soon(call, "api_final")
+    assert gateway.peak == 1
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("max_queue", [0, 4])
+async def test_hedged_calls_hold_their_own_slot(max_queue: int) -> None:
+    metrics = AppMetrics(base_urls=[KEY[1]])
+    gateway = _HoldingGateway(0.1)
+    limit = ConcurrencyLimitConfig(max_concurrency=1, max_queue=max_queue, max_queue_ms=5000)
+    hedger = Hedger(metrics)
+    metered = MeteredGateway(
+        gateway,
+        metrics,
+        served_model="served",
+        mode="direct",
+        hedger=hedger,
+        hedging={"api": HedgeConfig(initial_delay_ms=10, max_hedge_rate=1.0)},
+        admission=AdmissionController(metrics),
+        concurrency={"api": limit},
+    )
+
+    result = await stage_gateway(metered, "api").complete(
+        model="api-model", base_url="https://api.example", messages=MESSAGES
+    )
+
+    assert result.content == "api-model"
+    assert hedger.stats(served_model="served", stage="api").hedges_fired == 1
+    assert gateway.peak == 1
+    assert metrics.admission_in_flight.value(KEY) == 0
+
+
+@pytest.mark.anyio
+async def test_hedge_to_another_target_uses_that_targets_configured_limit() -> None:
+    gateway = _HoldingGateway(0.1)
+    primary = {"model": "api-model", "base_url": "https://api.example"}
+    replica = {"model": "replica-model", "base_url": "https://replica.example"}
+    one = {"max_concurrency": 1, "max_queue": 0}
+    config = AppConfig.model_validate(
+        {
+            "served_models": {
+                "served": {"mode": "direct", "api": {**primary, "concurrency": one}},
+                "other": {"mode": "direct", "api": {**replica, "concurrency": one}},
+            }
+        }
+    )
+    controller = AdmissionController.from_config(config)
+    assert controller is not None
+    metered = MeteredGateway(
+        gateway,
+        AppMetrics(),
+        served_model="served",
+        mode="direct",
+        hedger=Hedger(),
+        hedging={
+            "api": HedgeConfig(initial_delay_ms=10, max_hedge_rate=1.0, target=StageTarget.model_validate(replica))
+        },
+        admission=controller,
+        concurrency={"api": ConcurrencyLimitConfig.model_validate(one)},
+    )
+    in_flight: list[int] = []
+
+    async def observe_replica() -> None:
+        await anyio.sleep(0.05)
+        in_flight.append(controller.in_flight(role="api", model="replica-model", base_url="https://replica.example"))
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(observe_replica)
+        await stage_gateway(metered, "api").complete(
+            model="api-model", base_url="https://api.example", messages=MESSAGES
+        )
+
+    assert in_flight == [1]
+
+
+def test_conflicting_limits_for_the_same_upstream_are_rejected() -> None:
+    target = {"model": "api-model", "base_url": "https://api.example"}
+    config = AppConfig.model_validate(
+        {
+            "served_models": {
+                "one": {"mode": "direct", "api": {**target, "concurrency": {"max_concurrency": 4}}},
+                "two": {"mode": "direct", "api": {**target, "concurrency": {"max_concurrency": 8}}},
+            }
+        }
+    )
+
+    with pytest.raises(ValueError, match="conflicting concurrency"):
+        configured_limits(config)
+
+
+def test_rejections_are_local_errors_not_upstream_failures() -> None:
+    rejection = AdmissionRejectedError(
+        role="api", model="api-model", base_url="https://api.example", reason="queue_full", retry_after_seconds=1
+    )
+
+    assert not isinstance(rejection, httpx.HTTPError)
+    assert not is_breaker_failure(rejection)
+    assert not is_replica_failure(rejection)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+
+from adapter_critic.circuit_breaker import CircuitBreakerGateway, CircuitOpenError
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.upstream import TokenUsage, UpstreamResult
+from tests.helpers import StreamFromCompleteMixin
+
+MESSAGES = [ChatMessage(role="user", content="hi")]
+BASE_URL = "https://adapter.example/v1"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _ScriptedGateway(StreamFromCompleteMixin):
+    def __init__(self, clock: _Clock) -> None:
+        self.outcomes: list[Exception | float] = []
+        self.calls = 0
+        self._clock = clock
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        del model, base_url, messages, api_key_env, request_options
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else 0.0
+        if isinstance(outcome, Exception):
+            raise outcome
+        self._clock.now += outcome
+        return UpstreamResult(content="ok", usage=TokenUsage())
+
+
+class _SlowFirstGateway(_ScriptedGateway):
+    def __init__(self, clock: _Clock) -> None:
+        super().__init__(clock)
+        self.slow_started = anyio.Event()
+        self.release = anyio.Event()
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        if not self.slow_started.is_set():
+            self.slow_started.set()
+            await self.release.wait()
+            return UpstreamResult(content="late", usage=TokenUsage())
+        return await super().complete(model=model, base_url=base_url, messages=messages)
+
+
+def _connect_error() -> httpx.ConnectError:
+    return httpx.ConnectError("refused", request=httpx.Request("POST", BASE_URL))
+
+
+async def _call(gateway: CircuitBreakerGateway, model: str = "adapter-model") -> UpstreamResult:
+    return await gateway.complete(model=model, base_url=BASE_URL, messages=MESSAGES)
+
+
+@pytest.mark.anyio
+async def test_breaker_opens_after_consecutive_failures_and_fast_fails() -> None:
+    clock = _Clock()
+    upstream = _ScriptedGateway(clock)
+    breaker = CircuitBreakerGateway(upstream, failure_threshold=2, open_seconds=10.0, clock=clock)
+    upstream.outcomes = [_connect_error(), _connect_error()]
+
+    for _ in range(2):
+        with pytest.raises(httpx.ConnectError):
+            await _call(breaker)
+
+    assert breaker.state(model="adapter-model", base_url=BASE_URL) == "open"
+    with pytest.raises(CircuitOpenError) as exc_info:
+        await _call(breaker)
+    assert upstream.calls == 2
+    assert exc_info.value.retry_after_seconds == 10.0
+    assert exc_info.value.base_url == BASE_URL
+    assert not isinstance(exc_info.value, httpx.HTTPError)
+
+    assert (await _call(breaker, model="other-model")).content == "ok"
+
+
+@pytest.mark.anyio
+async def test_breaker_half_opens_with_a_probe_and_closes_on_success() -> None:
+    clock = _Clock()
+    upstream = _ScriptedGateway(clock)
+    breaker = CircuitBreakerGateway(upstream, failure_threshold=1, open_seconds=5.0, clock=clock)
+    upstream.outcomes = [_connect_error(), _connect_error()]
+    with pytest.raises(httpx.ConnectError):
+        await _call(breaker)
+
+    clock.now = 6.0
+    with pytest.raises(httpx.ConnectError):
+        await _call(breaker)
+    assert breaker.state(model="adapter-model", base_url=BASE_URL) == "open"
+
+    clock.now = 12.0
+    assert (await _call(breaker)).content == "ok"
+    assert breaker.state(model="adapter-model", base_url=BASE_URL) == "closed"
+    assert upstream.calls == 3
+
+
+@pytest.mark.anyio
+async def test_late_success_from_before_the_trip_does_not_close_an_open_circuit() -> None:
+    clock = _Clock()
+    upstream = _SlowFirstGateway(clock)
+    breaker = CircuitBreakerGateway(upstream, failure_threshold=1, open_seconds=10.0, clock=clock)
+    upstream.outcomes = [_connect_error()]
+    late: list[UpstreamResult] = []
+
+    async def slow_call() -> None:
+        late.append(await _call(breaker))
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(slow_call)
+        await upstream.slow_started.wait()
+        with pytest.raises(httpx.ConnectError):
+            await _call(breaker)
+        upstream.release.set()
+
+    assert late[0].content == "late"
+    assert breaker.state(model="adapter-model", base_url=BASE_URL) == "open"
+    with pytest.raises(CircuitOpenError):
+        await _call(breaker)
+
+
+@pytest.mark.anyio
+async def test_latency_breaches_count_as_failures_but_client_errors_do_not() -> None:
+    clock = _Clock()
+    upstream = _ScriptedGateway(clock)
+    breaker = CircuitBreakerGateway(upstream, failure_threshold=2, latency_threshold_seconds=1.0, clock=clock)
+    bad_request = httpx.HTTPStatusError(
+        "bad request",
+        request=httpx.Request("POST", BASE_URL),
+        response=httpx.Response(400),
+    )
+    upstream.outcomes = [5.0, bad_request, 5.0, 5.0]
+
+    await _call(breaker)
+    with pytest.raises(httpx.HTTPStatusError):
+        await _call(breaker)
+    await _call(breaker)
+    assert breaker.state(model="adapter-model", base_url=BASE_URL) == "closed"
+
+    await _call(breaker)
+    assert breaker.state(model="adapter-model", base_url=BASE_URL) == "open"
+
+
+@pytest.mark.anyio
+async def test_streams_are_guarded_by_the_same_circuit() -> None:
+    clock = _Clock()
+    upstream = _ScriptedGateway(clock)
+    breaker = CircuitBreakerGateway(upstream, failure_threshold=1, clock=clock)
+    upstream.outcomes = [_connect_error()]
+
+    with pytest.raises(httpx.ConnectError):
+        async for _ in breaker.stream(model="adapter-model", base_url=BASE_URL, messages=MESSAGES):
+            pass
+    with pytest.raises(CircuitOpenError):
+        await _call(breaker)
@@ -180,3 +180,79 @@ def test_stage_api_key_var_alias_is_resolved() -> None:
     runtime = resolve_runtime_config(config, "served-direct", AdapterCriticOverrides())
     assert runtime is not None
     assert runtime.api.api_key_env == "GROQ_API_KEY"
+
+
+def test_adapter_streaming_override_wins_over_served_config() -> None:
+    config = AppConfig.model_validate(
+        {
+            "served_models": {
+                "served-adapter": {
+                    "mode": "adapter",
+                    "api": {"model": "api-model", "base_url": "https://api.example"},
+                    "adapter": {"model": "adapter-model", "base_url": "https://adapter.example"},
+                    "adapter_streaming": "speculative",
+                    "adapter_speculative_release_ms": 250,
+                }
+            }
+        }
+    )
+    runtime = resolve_runtime_config(config, "served-adapter", AdapterCriticOverrides())
+    assert runtime is not None
+    assert runtime.adapter_streaming == "speculative"
+    assert runtime.adapter_speculative_release_ms == 250
+
+    overridden = resolve_runtime_config(
+        config,
+        "served-adapter",
+        AdapterCriticOverrides(adapter_streaming="blocking", adapter_speculative_release_ms=50),
+    )
+    assert overridden is not None
+    assert overridden.adapter_streaming == "blocking"
+    assert overridden.adapter_speculative_release_ms == 50
+
+
+def test_prompt_layout_override_wins_over_served_config() -> None:
+    config = AppConfig.model_validate(
+        {
+            "served_models": {
+                "served-critic": {
+                    "mode": "critic",
+                    "api": {"model": "api-model", "base_url": "https://api.example"},
+                    "prompt_layout": "prefix_cache",
+                }
+            }
+        }
+    )
+    runtime = resolve_runtime_config(config, "served-critic", AdapterCriticOverrides())
+    assert runtime is not None
+    assert runtime.prompt_layout == "prefix_cache"
+
+    overridden = resolve_runtime_config(config, "served-critic", AdapterCriticOverrides(prompt_layout="standard"))
+    assert overridden is not None
+    assert overridden.prompt_layout == "standard"
+
+
+def test_stage_context_budget_survives_model_override() -> None:
+    config = AppConfig.model_validate(
+        {
+            "served_models": {
+                "served-critic": {
+                    "mode": "critic",
+                    "api": {"model": "api-default", "base_url": "https://api.example"},
+                    "critic": {
+                        "model": "critic-default",
+                        "base_url": "https://critic.example",
+                        "context_budget": {"max_tokens": 2048, "strategy": "summarize_tool_results"},
+                    },
+                }
+            }
+        }
+    )
+    runtime = resolve_runtime_config(config, "served-critic", AdapterCriticOverrides(critic_model="critic-small"))
+    assert runtime is not None
+    assert runtime.critic is not None
+    assert runtime.critic.model == "critic-small"
+    assert runtime.critic.context_budget is not None
+    assert runtime.critic.context_budget.max_tokens == 2048
+    assert runtime.critic.context_budget.strategy == "summarize_tool_results"
+    assert runtime.api.context_budget is None
@@ -121,3 +121,13 @@ def test_tool_related_fields_are_preserved_for_direct_upstream_calls() -> None:
     assert tool_extra is not None
     assert assistant_extra["tool_calls"][0]["id"] == "call_cancel"
     assert tool_extra["tool_call_id"] == "call_cancel"
+
+
+def test_parse_stream_flag_is_not_forwarded_as_request_option() -> None:
+    payload = _base_payload()
+    payload["stream"] = True
+    payload["stream_options"] = {"include_usage": True}
+    payload["temperature"] = 0
+    parsed = parse_request_payload(payload)
+    assert parsed.stream is True
+    assert parsed.request_options == {"temperature": 0}
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import anyio
+import pytest
+
+from adapter_critic.config import AppConfig, resolve_runtime_config
+from adapter_critic.contracts import AdapterCriticOverrides
+from adapter_critic.deadlines import Deadline, budget_skip_reason, stage_allowed, stage_scope
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_remaining_budget_tracks_the_clock() -> None:
+    clock = _Clock()
+    deadline = Deadline(budget_ms=500, clock=clock)
+    assert deadline.remaining_seconds() == pytest.approx(0.5)
+
+    clock.now += 0.2
+    assert deadline.remaining_seconds() == pytest.approx(0.3)
+    assert deadline.allows_stage()
+
+    clock.now += 0.4
+    assert deadline.remaining_seconds() == pytest.approx(-0.1)
+    assert not deadline.allows_stage()
+
+
+def test_budget_is_measured_from_request_start() -> None:
+    clock = _Clock()
+    deadline = Deadline(budget_ms=500, started=99.8, clock=clock)
+    assert deadline.remaining_seconds() == pytest.approx(0.3)
+
+
+def test_min_stage_budget_and_reserved_stages() -> None:
+    clock = _Clock()
+    deadline = Deadline(budget_ms=1000, min_stage_ms=300, clock=clock)
+    assert deadline.allows_stage(reserve_stages=2)
+    assert not deadline.allows_stage(reserve_stages=3)
+
+    clock.now += 0.75
+    assert not deadline.allows_stage()
+    assert deadline.remaining_seconds(reserve_stages=1) == pytest.approx(-0.05)
+
+
+def test_missing_deadline_allows_every_stage() -> None:
+    assert stage_allowed(None, reserve_stages=10)
+    assert budget_skip_reason("critic") == "critic skipped: latency budget exhausted"
+
+
+@pytest.mark.anyio
+async def test_stage_scope_cancels_once_budget_is_spent() -> None:
+    deadline = Deadline(budget_ms=20)
+    finished = False
+    with stage_scope(deadline) as scope:
+        await anyio.sleep(1)
+        finished = True
+    assert not finished
+    assert scope.cancelled_caught
+
+
+def test_deadline_is_built_from_resolved_runtime() -> None:
+    config = AppConfig.model_validate(
+        {
+            "served_models": {
+                "served-critic": {
+                    "mode": "critic",
+                    "api": {"model": "api-model", "base_url": "https://api.example"},
+                    "critic": {"model": "critic-model", "base_url": "https://critic.example"},
+                    "latency_budget_ms": 2000,
+                    "min_stage_budget_ms": 250,
+                },
+                "served-direct": {
+                    "mode": "direct",
+                    "api": {"model": "api-model", "base_url": "https://api.example"},
+                },
+            }
+        }
+    )
+    runtime = resolve_runtime_config(config, "served-critic", AdapterCriticOverrides())
+    assert runtime is not None
+    assert (runtime.latency_budget_ms, runtime.min_stage_budget_ms) == (2000, 250)
+
+    overridden = resolve_runtime_config(
+        config, "served-critic", AdapterCriticOverrides(latency_budget_ms=800, min_stage_budget_ms=100)
+    )
+    assert overridden is not None
+    deadline = Deadline.from_runtime(overridden)
+    assert deadline is not None
+    assert (deadline.budget_ms, deadline.min_stage_ms) == (800, 100)
+
+    direct = resolve_runtime_config(config, "served-direct", AdapterCriticOverrides())
+    assert direct is not None
+    assert Deadline.from_runtime(direct) is None
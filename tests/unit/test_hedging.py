@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+
+from adapter_critic.config import HedgeConfig, StageTarget
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.hedging import Hedger, latency_percentile
+from adapter_critic.metrics import AppMetrics, MeteredGateway
+from adapter_critic.upstream import TokenUsage, UpstreamDelta, UpstreamResult, stage_gateway
+
+MESSAGES = [ChatMessage(role="user", content="hi")]
+
+
+class _DelayedGateway:
+    def __init__(self, delays: dict[str, list[float]], failing: set[str] | None = None) -> None:
+        self.delays = delays
+        self.failing = failing or set()
+        self.started: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        self.started.append(model)
+        delays = self.delays[model]
+        delay = delays.pop(0) if len(delays) > 1 else delays[0]
+        try:
+            await anyio.sleep(delay)
+        except BaseException:
+            self.cancelled.append(model)
+            raise
+        if model in self.failing:
+            raise httpx.ConnectError("refused", request=httpx.Request("POST", base_url))
+        return UpstreamResult(content=f"from {model}", usage=TokenUsage())
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        result = await self.complete(model=model, base_url=base_url, messages=messages)
+        yield UpstreamDelta(content=result.content, finish_reason="stop")
+
+
+async def _call(
+    hedger: Hedger, gateway: _DelayedGateway, policy: HedgeConfig, model: str = "primary"
+) -> UpstreamResult:
+    return await hedger.complete(
+        gateway,
+        served_model="served",
+        stage="api",
+        policy=policy,
+        model="primary",
+        base_url="https://api.example",
+        messages=MESSAGES,
+    )
+
+
+def test_latency_percentile_uses_nearest_rank() -> None:
+    samples = [float(value) for value in range(1, 101)]
+    assert latency_percentile(samples, 95) == 95.0
+    assert latency_percentile(samples, 50) == 50.0
+    assert latency_percentile([3.0], 99) == 3.0
+
+
+@pytest.mark.anyio
+async def test_slow_primary_is_hedged_to_alternate_target_and_cancelled() -> None:
+    metrics = AppMetrics()
+    hedger = Hedger(metrics)
+    gateway = _DelayedGateway({"primary": [5.0], "alternate": [0.0]})
+    policy = HedgeConfig(
+        initial_delay_ms=10,
+        max_hedge_rate=1.0,
+        target=StageTarget(model="alternate", base_url="https://alt.example"),
+    )
+
+    result = await _call(hedger, gateway, policy)
+
+    assert result.content == "from alternate"
+    assert gateway.started == ["primary", "alternate"]
+    assert gateway.cancelled == ["primary"]
+    stats = hedger.stats(served_model="served", stage="api")
+    assert (stats.calls, stats.hedges_fired, stats.hedges_won) == (1, 1, 1)
+    assert metrics.hedges_fired.value(("served", "api")) == 1
+    assert metrics.hedges_won.value(("served", "api")) == 1
+
+
+@pytest.mark.anyio
+async def test_fast_primary_never_fires_a_hedge() -> None:
+    hedger = Hedger()
+    gateway = _DelayedGateway({"primary": [0.0]})
+
+    result = await _call(hedger, gateway, HedgeConfig(initial_delay_ms=1000, max_hedge_rate=1.0))
+
+    assert result.content == "from primary"
+    assert gateway.started == ["primary"]
+    assert hedger.stats(served_model="served", stage="api").hedges_fired == 0
+
+
+@pytest.mark.anyio
+async def test_primary_that_wins_after_hedge_fired_cancels_the_hedge() -> None:
+    hedger = Hedger()
+    gateway = _DelayedGateway({"primary": [0.05], "alternate": [5.0]})
+    policy = HedgeConfig(
+        initial_delay_ms=10, max_hedge_rate=1.0, target=StageTarget(model="alternate", base_url="https://alt.example")
+    )
+
+    result = await _call(hedger, gateway, policy)
+
+    assert result.content == "from primary"
+    assert gateway.cancelled == ["alternate"]
+    stats = hedger.stats(served_model="served", stage="api")
+    assert (stats.hedges_fired, stats.hedges_won) == (1, 0)
+
+
+@pytest.mark.anyio
+async def test_hedge_rate_is_capped() -> None:
+    hedger = Hedger()
+    gateway = _DelayedGateway({"primary": [0.05]})
+    policy = HedgeConfig(initial_delay_ms=1, max_hedge_rate=0.25)
+
+    for _ in range(8):
+        await _call(hedger, gateway, policy)
+
+    stats = hedger.stats(served_model="served", stage="api")
+    assert stats.calls == 8
+    assert stats.hedges_fired == 2
+
+
+@pytest.mark.anyio
+async def test_primary_failure_before_hedge_is_raised_without_hedging() -> None:
+    hedger = Hedger()
+    gateway = _DelayedGateway({"primary": [0.0]}, failing={"primary"})
+
+    with pytest.raises(httpx.ConnectError):
+        await _call(hedger, gateway, HedgeConfig(initial_delay_ms=1000, max_hedge_rate=1.0))
+
+    assert gateway.started == ["primary"]
+
+
+@pytest.mark.anyio
+async def test_hedge_covers_a_primary_that_fails_after_it_fired() -> None:
+    hedger = Hedger()
+    gateway = _DelayedGateway({"primary": [0.05], "alternate": [0.1]}, failing={"primary"})
+    policy = HedgeConfig(
+        initial_delay_ms=10, max_hedge_rate=1.0, target=StageTarget(model="alternate", base_url="https://alt.example")
+    )
+
+    result = await _call(hedger, gateway, policy)
+
+    assert result.content == "from alternate"
+
+
+@pytest.mark.anyio
+async def test_latency_samples_only_include_primary_calls_that_complete() -> None:
+    hedger = Hedger()
+    policy = HedgeConfig(
+        initial_delay_ms=10, max_hedge_rate=1.0, target=StageTarget(model="alternate", base_url="https://alt.example")
+    )
+
+    await _call(hedger, _DelayedGateway({"primary": [5.0], "alternate": [0.05]}), policy)
+    await _call(hedger, _DelayedGateway({"primary": [0.02]}), policy)
+    with pytest.raises(httpx.ConnectError):
+        await _call(hedger, _DelayedGateway({"primary": [0.0]}, failing={"primary"}), policy)
+
+    samples = list(hedger._latencies[("served", "api")])
+    assert len(samples) == 1
+    assert 0.02 <= samples[0] < 0.06
+
+
+def test_delay_follows_observed_percentile_after_min_samples() -> None:
+    hedger = Hedger()
+    policy = HedgeConfig(percentile=90, initial_delay_ms=700, min_delay_ms=20, min_samples=10)
+    assert hedger.delay_seconds(policy, served_model="served", stage="api") == pytest.approx(0.7)
+
+    for value in range(1, 11):
+        hedger._record_latency(("served", "api"), value / 100)
+    assert hedger.delay_seconds(policy, served_model="served", stage="api") == pytest.approx(0.09)
+
+    floor_policy = policy.model_copy(update={"min_delay_ms": 500})
+    assert hedger.delay_seconds(floor_policy, served_model="served", stage="api") == pytest.approx(0.5)
+
+
+@pytest.mark.anyio
+async def test_metered_gateway_hedges_only_configured_stages() -> None:
+    metrics = AppMetrics()
+    hedger = Hedger(metrics)
+    gateway = _DelayedGateway({"primary": [0.2, 0.2, 0.0]})
+    metered = MeteredGateway(
+        gateway,
+        metrics,
+        served_model="served",
+        mode="critic",
+        hedger=hedger,
+        hedging={"api_draft": HedgeConfig(initial_delay_ms=10, max_hedge_rate=1.0)},
+    )
+
+    await stage_gateway(metered, "critic").complete(model="primary", base_url="https://api.example", messages=MESSAGES)
+    await stage_gateway(metered, "api_draft").complete(
+        model="primary", base_url="https://api.example", messages=MESSAGES
+    )
+
+    assert gateway.started == ["primary", "primary", "primary"]
+    assert metered.stage_calls == {"critic": 1, "api_draft": 1}
+    assert hedger.stats(served_model="served", stage="critic").calls == 0
+    assert hedger.stats(served_model="served", stage="api_draft").hedges_won == 1
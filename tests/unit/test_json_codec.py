@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from adapter_critic.json_codec import HAS_ORJSON, FastJSONResponse, dumps, dumps_str, loads
+
+PAYLOAD = {
+    "model": "m",
+    "messages": [
+        {"role": "user", "content": "héllo"},
+        {
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [{"id": "c1", "type": "function", "function": {"name": "f", "arguments": '{"a":1}'}}],
+        },
+    ],
+    "temperature": 0.5,
+}
+
+BACKENDS = [pytest.param(True, id="orjson"), pytest.param(False, id="stdlib")] if HAS_ORJSON else [False]
+
+
+@pytest.mark.parametrize("fast", BACKENDS)
+def test_codec_round_trips_compact_utf8_json(fast: bool) -> None:
+    encoded = dumps(PAYLOAD, fast=fast)
+
+    assert json.loads(encoded) == PAYLOAD
+    assert loads(encoded, fast=fast) == PAYLOAD
+    assert "héllo".encode() in encoded
+    assert b", " not in encoded
+
+
+@pytest.mark.parametrize("fast", BACKENDS)
+def test_codec_stringifies_unknown_values_and_falls_back_on_big_ints(fast: bool) -> None:
+    assert loads(dumps({"value": object, "big": 2**70}, fast=fast), fast=fast) == {"value": str(object), "big": 2**70}
+    assert dumps_str({1: "a"}, fast=fast) == '{"1":"a"}'
+
+
+@pytest.mark.parametrize("fast", BACKENDS)
+def test_codec_rejects_invalid_json_with_value_error(fast: bool) -> None:
+    with pytest.raises(ValueError):
+        loads("{not json", fast=fast)
+
+
+def test_fast_json_response_renders_compact_body() -> None:
+    response = FastJSONResponse({"a": [1, 2]}, headers={"X-Test": "1"})
+
+    assert response.body == b'{"a":[1,2]}'
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["x-test"] == "1"
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import Any
+
+from loguru import logger
+
+from adapter_critic.logging_setup import LazyLogArg
+
+
+def test_lazy_log_arg_is_only_rendered_when_a_sink_accepts_the_level() -> None:
+    calls: list[str] = []
+    records: list[str] = []
+
+    def render(value: str) -> str:
+        calls.append(value)
+        return value.upper()
+
+    def capture(message: Any) -> None:
+        records.append(message.record["message"])
+
+    logger.remove()
+    sink_id = logger.add(capture, level="INFO")
+    try:
+        logger.debug("payload={}", LazyLogArg(render, "skipped"))
+        logger.info("payload={}", LazyLogArg(render, "kept"))
+    finally:
+        logger.remove(sink_id)
+
+    assert calls == ["kept"]
+    assert records == ["payload=KEPT"]
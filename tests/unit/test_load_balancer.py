@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import contextlib
+import random
+from collections.abc import AsyncIterator
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+
+from adapter_critic.config import AppConfig, ReplicaTarget, resolve_runtime_config
+from adapter_critic.contracts import AdapterCriticOverrides, ChatMessage
+from adapter_critic.health import HealthTarget, collect_health_targets
+from adapter_critic.load_balancer import LoadBalancingGateway, replica_pools
+from adapter_critic.upstream import TokenUsage, UpstreamDelta, UpstreamResult
+
+MESSAGES = [ChatMessage(role="user", content="hi")]
+POOL_URL = "https://pool.example/v1"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _RecordingGateway:
+    def __init__(self, failing: set[str] | None = None) -> None:
+        self.failing = failing or set()
+        self.base_urls: list[str] = []
+
+    async def complete(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> UpstreamResult:
+        self.base_urls.append(base_url)
+        if base_url in self.failing:
+            raise httpx.ConnectError("refused", request=httpx.Request("POST", base_url))
+        return UpstreamResult(content=base_url, usage=TokenUsage())
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        messages: list[ChatMessage],
+        api_key_env: str | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> AsyncIterator[UpstreamDelta]:
+        self.base_urls.append(base_url)
+        yield UpstreamDelta(content=base_url, finish_reason="stop")
+
+
+def _balancer(
+    gateway: _RecordingGateway, weights: dict[str, float], clock: _Clock | None = None
+) -> LoadBalancingGateway:
+    replicas = [ReplicaTarget(base_url=url, weight=weight) for url, weight in weights.items()]
+    return LoadBalancingGateway(
+        gateway,
+        {POOL_URL: replicas},
+        eject_seconds=10,
+        clock=clock if clock is not None else _Clock(),
+        rng=random.Random(7),
+    )
+
+
+def _config(**api: Any) -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "served_models": {
+                "served-direct": {"mode": "direct", "api": {"model": "api-model", "base_url": POOL_URL, **api}},
+            }
+        }
+    )
+
+
+@pytest.mark.anyio
+async def test_calls_are_routed_to_replicas_and_other_targets_pass_through() -> None:
+    gateway = _RecordingGateway()
+    balancer = _balancer(gateway, {"https://r1.example/v1": 1, "https://r2.example/v1": 1})
+
+    result = await balancer.complete(model="m", base_url=POOL_URL + "/", messages=MESSAGES)
+    deltas = [delta async for delta in balancer.stream(model="m", base_url=POOL_URL, messages=MESSAGES)]
+    await balancer.complete(model="m", base_url="https://other.example/v1", messages=MESSAGES)
+
+    assert result.content in {"https://r1.example/v1", "https://r2.example/v1"}
+    assert deltas[0].content in {"https://r1.example/v1", "https://r2.example/v1"}
+    assert gateway.base_urls[-1] == "https://other.example/v1"
+    assert sum(replica.requests for replica in balancer.replicas(POOL_URL)) == 2
+    assert all(replica.in_flight == 0 for replica in balancer.replicas(POOL_URL))
+
+
+def test_pick_prefers_fewer_outstanding_requests_and_lower_latency() -> None:
+    balancer = _balancer(_RecordingGateway(), {"https://r1.example/v1": 1, "https://r2.example/v1": 1})
+    first, second = balancer.replicas(POOL_URL)
+
+    first.in_flight = 3
+    assert all(balancer.pick(POOL_URL) is second for _ in range(20))
+
+    first.in_flight = 0
+    first.ewma_seconds = 2.0
+    second.ewma_seconds = 0.2
+    second.in_flight = 2
+    assert all(balancer.pick(POOL_URL) is second for _ in range(20))
+
+
+def test_idle_picks_follow_replica_weights() -> None:
+    balancer = _balancer(
+        _RecordingGateway(),
+        {"https://r1.example/v1": 8, "https://r2.example/v1": 1, "https://r3.example/v1": 1},
+    )
+    picks = [balancer.pick(POOL_URL) for _ in range(1000)]
+    heavy_share = sum(1 for replica in picks if replica is not None and replica.weight == 8) / len(picks)
+    assert heavy_share > 0.6
+
+
+@pytest.mark.anyio
+async def test_failing_replica_is_ejected_until_cooldown_expires() -> None:
+    clock = _Clock()
+    gateway = _RecordingGateway(failing={"https://r1.example/v1"})
+    balancer = _balancer(gateway, {"https://r1.example/v1": 1, "https://r2.example/v1": 1}, clock)
+
+    for _ in range(10):
+        with contextlib.suppress(httpx.ConnectError):
+            await balancer.complete(model="m", base_url=POOL_URL, messages=MESSAGES)
+    assert balancer.replicas(POOL_URL)[0].ejected_until == 10
+
+    gateway.base_urls.clear()
+    for _ in range(10):
+        await balancer.complete(model="m", base_url=POOL_URL, messages=MESSAGES)
+    assert set(gateway.base_urls) == {"https://r2.example/v1"}
+
+    clock.now = 11
+    assert balancer.replicas(POOL_URL)[0].available(clock.now)
+
+
+def test_health_results_skip_unhealthy_replicas_and_fail_open() -> None:
+    balancer = _balancer(_RecordingGateway(), {"https://r1.example/v1": 1, "https://r2.example/v1": 1})
+
+    balancer.apply_health(
+        [
+            {"base_url": "https://r1.example/v1", "ok": False},
+            {"base_url": "https://r2.example/v1", "ok": True},
+            {"base_url": "https://unrelated.example/v1", "ok": False},
+        ]
+    )
+    picks = [balancer.pick(POOL_URL) for _ in range(20)]
+    assert {replica.base_url for replica in picks if replica is not None} == {"https://r2.example/v1"}
+
+    balancer.apply_health([{"base_url": "https://r2.example/v1", "ok": False}])
+    assert balancer.pick(POOL_URL) is not None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_background_health_poll_readmits_ejected_replica(monkeypatch: pytest.MonkeyPatch) -> None:
+    probes: list[list[str]] = []
+
+    async def fake_probe_targets(targets: list[HealthTarget], *, timeout_seconds: float) -> list[dict[str, Any]]:
+        probes.append([target.base_url for target in targets])
+        return [{"base_url": target.base_url, "ok": True} for target in targets]
+
+    monkeypatch.setattr("adapter_critic.load_balancer.probe_targets", fake_probe_targets)
+    clock = _Clock()
+    balancer = LoadBalancingGateway(
+        _RecordingGateway(),
+        {POOL_URL: [ReplicaTarget(base_url="https://r1.example/v1"), ReplicaTarget(base_url="https://r2.example/v1")]},
+        eject_seconds=60,
+        health_targets=[HealthTarget(model="m", base_url="https://r1.example/v1", api_key_env=None)],
+        health_interval_seconds=0.01,
+        clock=clock,
+    )
+    replica = balancer.replicas(POOL_URL)[0]
+    replica.ejected_until = 60
+    replica.probe_ok = False
+
+    await balancer.start()
+    with anyio.fail_after(1):
+        while not probes:
+            await anyio.sleep(0.01)
+    await balancer.aclose()
+
+    assert probes[0] == ["https://r1.example/v1"]
+    assert replica.available(clock.now)
+    probe_count = len(probes)
+    await anyio.sleep(0.03)
+    assert len(probes) == probe_count
+
+
+def test_health_targets_expand_replicas() -> None:
+    config = _config(replicas=[{"base_url": "https://r1.example/v1"}, {"base_url": "https://r2.example/v1/"}])
+    assert [target.base_url for target in collect_health_targets(config)] == [
+        "https://r1.example/v1",
+        "https://r2.example/v1",
+    ]
+    assert list(replica_pools(config)) == [POOL_URL.lower()]
+
+
+def test_conflicting_replica_lists_are_rejected() -> None:
+    config = AppConfig.model_validate(
+        {
+            "served_models": {
+                "a": {"mode": "direct", "api": {"model": "m", "base_url": POOL_URL, "replicas": [{"base_url": "x"}]}},
+                "b": {"mode": "direct", "api": {"model": "m", "base_url": POOL_URL, "replicas": [{"base_url": "y"}]}},
+            }
+        }
+    )
+    with pytest.raises(ValueError, match="conflicting replicas"):
+        replica_pools(config)
+
+
+def test_base_url_override_drops_configured_replicas() -> None:
+    config = _config(replicas=[{"base_url": "https://r1.example/v1"}])
+    runtime = resolve_runtime_config(config, "served-direct", AdapterCriticOverrides())
+    assert runtime is not None
+    assert [replica.base_url for replica in runtime.api.replicas] == ["https://r1.example/v1"]
+
+    overridden = resolve_runtime_config(
+        config, "served-direct", AdapterCriticOverrides(api_base_url="https://direct.example/v1")
+    )
+    assert overridden is not None
+    assert overridden.api.replicas == []
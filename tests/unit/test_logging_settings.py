@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+from loguru import logger
+
+from adapter_critic.logging_setup import (
+    LOG_FILE_PATH,
+    LoggingSettings,
+    SamplingFilter,
+    configure_logging,
+    parse_sample_rates,
+    resolve_logging_settings,
+    shutdown_logging,
+)
+
+
+def test_logging_settings_resolve_from_env() -> None:
+    settings = resolve_logging_settings(
+        {
+            "LOGGING_LEVEL": "debug",
+            "LOGGING_ENQUEUE": "false",
+            "LOGGING_ROTATION": "00:00",
+            "LOGGING_RETENTION": "5",
+            "LOGGING_COMPRESSION": "off",
+            "LOGGING_SAMPLE_RATES": "upstream parsed=0.01, upstream raw response=2,broken,=0.5,bad=x",
+        }
+    )
+
+    assert settings == LoggingSettings(
+        level="DEBUG",
+        enqueue=False,
+        rotation="00:00",
+        retention=5,
+        compression=None,
+        sample_rates={"upstream parsed": 0.01, "upstream raw response": 1.0},
+    )
+    assert resolve_logging_settings({}) == LoggingSettings()
+
+
+def test_sampling_filter_drops_matching_debug_lines_but_never_warnings() -> None:
+    records: list[str] = []
+
+    def capture(message: Any) -> None:
+        records.append(message.record["message"])
+
+    logger.remove()
+    sink_id = logger.add(
+        capture,
+        level="DEBUG",
+        filter=SamplingFilter(parse_sample_rates("upstream parsed=0,upstream request=1")),
+    )
+    try:
+        for index in range(20):
+            logger.debug("upstream parsed model=m index={}", index)
+        logger.debug("upstream request model=m")
+        logger.warning("upstream parsed model=m but slow")
+        logger.info("unrelated")
+    finally:
+        logger.remove(sink_id)
+
+    assert records == ["upstream request model=m", "upstream parsed model=m but slow", "unrelated"]
+
+
+def test_configure_logging_enqueues_and_flushes_on_shutdown(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    level = configure_logging(LoggingSettings(level="INFO", sample_rates={"noisy": 0.0}))
+    logger.info("noisy line")
+    logger.info("kept line")
+    shutdown_logging()
+
+    assert level == "INFO"
+    written = (tmp_path / LOG_FILE_PATH).read_text()
+    assert "kept line" in written
+    assert "noisy line" not in written
+    assert "kept line" in capsys.readouterr().out
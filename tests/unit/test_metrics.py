@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from adapter_critic.metrics import Counter, Histogram
+
+
+def test_counter_renders_prometheus_text() -> None:
+    counter = Counter("requests_total", "Requests.", ("mode",))
+    counter.inc(("direct",))
+    counter.inc(("direct",), 2)
+    counter.inc(('say "hi"',))
+
+    assert counter.value(("direct",)) == 3
+    assert counter.render() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{mode="direct"} 3',
+        'requests_total{mode="say \\"hi\\""} 1',
+    ]
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    histogram = Histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, ("api",))
+    histogram.observe(0.5, ("api",))
+    histogram.observe(5.0, ("api",))
+
+    assert histogram.count(("api",)) == 3
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{stage="api",le="0.1"} 1',
+        'latency_seconds_bucket{stage="api",le="1"} 2',
+        'latency_seconds_bucket{stage="api",le="+Inf"} 3',
+        'latency_seconds_sum{stage="api"} 5.55',
+        'latency_seconds_count{stage="api"} 3',
+    ]
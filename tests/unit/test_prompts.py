@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import json
+from typing import Any
+
+from adapter_critic.config import ContextBudgetConfig
 from adapter_critic.contracts import ChatMessage
 from adapter_critic.prompts import (
     ADAPTER_RESPONSE_FORMAT,
     ADAPTER_SYSTEM_PROMPT,
+    RenderMemo,
     append_advisor_guidance_to_last_user_message,
     build_adapter_messages,
     build_advisor_messages,
     build_critic_messages,
+    fit_history,
 )
+from adapter_critic.token_counter import DEFAULT_TOKENIZER
 
 
 def test_critic_prompt_contains_required_inputs() -> None:
@@ -172,3 +179,149 @@ def test_append_advisor_guidance_adds_user_message_when_missing() -> None:
     assert updated[-1].content is not None
     assert "[ADVISOR_GUIDANCE]" in updated[-1].content
     assert "verify required fields" in updated[-1].content
+
+
+def test_prefix_cache_layout_keeps_request_specific_content_out_of_system_prompt() -> None:
+    messages = [ChatMessage(role="user", content="book a flight")]
+    tools = [{"type": "function", "function": {"name": "book", "parameters": {"type": "object"}}}]
+    required = build_adapter_messages(
+        messages=messages,
+        draft="draft",
+        request_options={"tools": tools, "tool_choice": "required"},
+        layout="prefix_cache",
+    )
+    plain = build_adapter_messages(messages=messages, draft="draft", layout="prefix_cache")
+
+    assert required[0] == plain[0]
+    content = required[1].content
+    assert content is not None
+    assert content.index('"name": "book"') < content.index("[user] book a flight")
+    assert content.index("[user] book a flight") < content.index('Tool choice for this request:\n"required"')
+    assert content.endswith("Latest API draft:\ndraft")
+
+
+def test_prefix_cache_layout_prefix_is_stable_across_turns() -> None:
+    turn = [
+        ChatMessage(role="system", content="sys rule"),
+        ChatMessage(role="user", content="question"),
+    ]
+    next_turn = [*turn, ChatMessage(role="assistant", content="answer"), ChatMessage(role="user", content="more")]
+    options = {"tools": [{"type": "function", "function": {"name": "lookup"}}], "tool_choice": "auto"}
+
+    first = build_critic_messages(
+        messages=turn, system_prompt="sys rule", draft="one", request_options=options, layout="prefix_cache"
+    )
+    second = build_critic_messages(
+        messages=next_turn, system_prompt="sys rule", draft="two", request_options=options, layout="prefix_cache"
+    )
+
+    assert first[0] == second[0]
+    first_content = first[1].content
+    second_content = second[1].content
+    assert first_content is not None and second_content is not None
+    stable_prefix = first_content[: first_content.index("[user] question") + len("[user] question")]
+    assert second_content.startswith(stable_prefix)
+    assert stable_prefix.index("System instructions:\nsys rule") < stable_prefix.index("Conversation history:")
+
+
+def test_render_memo_serializes_each_distinct_payload_once() -> None:
+    memo = RenderMemo(max_entries=2)
+    tools: list[dict[str, Any]] = [
+        {"type": "function", "function": {"name": "lookup", "parameters": {"type": "object"}}}
+    ]
+
+    first = memo.render_json({"tools": tools})
+    second = memo.render_json({"tools": json.loads(json.dumps(tools))})
+
+    assert first == second == json.dumps({"tools": tools}, indent=2, sort_keys=True)
+    assert (memo.stats.hits, memo.stats.misses) == (1, 1)
+
+    tools[0]["function"]["name"] = "renamed"
+    assert '"renamed"' in memo.render_json({"tools": tools})
+    memo.render_json("auto")
+    assert len(memo) == 2
+    memo.render_json({"tools": []})
+    assert memo.stats.misses == 4
+    assert len(memo) == 2
+
+
+def _tool_turn(index: int, result: str) -> list[ChatMessage]:
+    call = {"id": f"call_{index}", "type": "function", "function": {"name": "read", "arguments": "{}"}}
+    return [
+        ChatMessage(role="user", content=f"step {index}"),
+        ChatMessage.model_validate({"role": "assistant", "content": "", "tool_calls": [call]}),
+        ChatMessage.model_validate({"role": "tool", "tool_call_id": f"call_{index}", "content": result}),
+    ]
+
+
+def _agent_history(turns: int, result: str = "x" * 400) -> list[ChatMessage]:
+    history = [ChatMessage(role="system", content="sys rule")]
+    for index in range(turns):
+        history.extend(_tool_turn(index, result))
+    return history
+
+
+def test_fit_history_without_budget_is_a_no_op() -> None:
+    history = _agent_history(3)
+
+    fitted, history_fit = fit_history(history, None)
+
+    assert fitted is history
+    assert history_fit is None
+
+
+def test_fit_history_keeps_system_and_most_recent_turns_within_budget() -> None:
+    history = _agent_history(5)
+    per_turn = DEFAULT_TOKENIZER.count_messages(history[1:4])
+    budget = ContextBudgetConfig(max_tokens=DEFAULT_TOKENIZER.count_messages(history[:1]) + 2 * per_turn)
+
+    fitted, history_fit = fit_history(history, budget)
+
+    assert fitted == [history[0], *history[-6:]]
+    assert history_fit is not None
+    assert history_fit.dropped_messages == 9
+    assert history_fit.kept_tokens <= budget.max_tokens
+    assert history_fit.saved_tokens == 3 * per_turn
+    assert json.loads(history_fit.telemetry())["saved_tokens"] == 3 * per_turn
+
+
+def test_fit_history_caps_turns_and_always_keeps_the_latest_turn() -> None:
+    history = _agent_history(4)
+
+    capped, _ = fit_history(history, ContextBudgetConfig(max_tokens=100_000, keep_last_turns=1))
+    starved, starved_fit = fit_history(history, ContextBudgetConfig(max_tokens=1))
+
+    assert capped == [history[0], *history[-3:]]
+    assert starved == capped
+    assert starved_fit is not None and starved_fit.kept_tokens > starved_fit.max_tokens
+
+
+def test_fit_history_clips_old_tool_results_before_dropping_turns() -> None:
+    history = _agent_history(3, result="y" * 2000)
+    budget = ContextBudgetConfig(max_tokens=700, strategy="summarize_tool_results", tool_result_max_tokens=16)
+
+    fitted, history_fit = fit_history(history, budget)
+
+    assert len(fitted) == len(history)
+    assert fitted[3].content is not None and fitted[3].content.startswith("y" * 64 + "\n[tool result truncated:")
+    assert fitted[-1] == history[-1]
+    assert history_fit is not None
+    assert history_fit.clipped_tool_results == 2
+    assert history_fit.dropped_messages == 0
+    assert history_fit.kept_tokens <= budget.max_tokens
+
+
+def test_fit_history_head_tail_keeps_task_and_recent_messages_without_orphan_tool_results() -> None:
+    history = _agent_history(6)
+    budget = ContextBudgetConfig(
+        max_tokens=DEFAULT_TOKENIZER.count_messages(history[:2] + history[-4:]), strategy="head_tail"
+    )
+
+    fitted, history_fit = fit_history(history, budget)
+
+    assert fitted[:2] == history[:2]
+    assert fitted[2].role != "tool"
+    assert fitted[-1] == history[-1]
+    assert history_fit is not None
+    assert history_fit.kept_tokens <= budget.max_tokens
+    assert history_fit.dropped_messages == len(history) - len(fitted)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from adapter_critic.config import AppConfig, resolve_runtime_config
+from adapter_critic.contracts import AdapterCriticOverrides, ChatMessage
+from adapter_critic.metrics import AppMetrics
+from adapter_critic.response_cache import ResponseCache, is_deterministic_request, response_cache_key
+from adapter_critic.upstream import TokenUsage
+from adapter_critic.workflows.direct import WorkflowOutput
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _output(text: str) -> WorkflowOutput:
+    return WorkflowOutput(
+        final_text=text,
+        intermediate={"api": text},
+        stage_usage={"api": TokenUsage(prompt_tokens=1, completion_tokens=1, total_tokens=2)},
+    )
+
+
+def test_cache_key_ignores_non_semantic_options(base_config: AppConfig) -> None:
+    runtime = resolve_runtime_config(base_config, "served-direct", AdapterCriticOverrides())
+    assert runtime is not None
+    messages = [ChatMessage(role="user", content="hello")]
+
+    base_key = response_cache_key(runtime, messages, {"temperature": 0})
+    assert response_cache_key(runtime, messages, {"temperature": 0, "user": "alice"}) == base_key
+    assert response_cache_key(runtime, messages, {"temperature": 0, "max_tokens": 5}) != base_key
+    assert response_cache_key(runtime, [ChatMessage(role="user", content="bye")], {"temperature": 0}) != base_key
+
+
+def test_only_zero_temperature_is_deterministic() -> None:
+    assert is_deterministic_request({"temperature": 0})
+    assert is_deterministic_request({"temperature": 0.0})
+    assert not is_deterministic_request({"temperature": 0.7})
+    assert not is_deterministic_request({})
+
+
+@pytest.mark.anyio
+async def test_cache_evicts_least_recently_used_and_expires_entries() -> None:
+    clock = _Clock()
+    metrics = AppMetrics()
+    cache = ResponseCache(max_entries=2, ttl_seconds=10, clock=clock, metrics=metrics)
+
+    await cache.put("a", _output("A"))
+    await cache.put("b", _output("B"))
+    assert await cache.get("a") is not None
+    await cache.put("c", _output("C"))
+
+    assert await cache.get("b") is None
+    assert cache.stats.evictions == 1
+
+    clock.now += 11
+    assert await cache.get("a") is None
+    assert cache.stats.expirations == 1
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+    assert [metrics.response_cache_events.value((event,)) for event in ("hit", "miss", "eviction", "expiration")] == [
+        1,
+        2,
+        1,
+        1,
+    ]
+    assert 'adapter_critic_response_cache_events_total{event="eviction"} 1' in metrics.render()
+
+
+@pytest.mark.anyio
+async def test_sqlite_tier_survives_restart(tmp_path: Path) -> None:
+    clock = _Clock()
+    path = tmp_path / "cache.sqlite3"
+    first = ResponseCache(sqlite_path=path, clock=clock)
+    await first.put("key", _output("persisted"))
+    first.close()
+
+    second = ResponseCache(sqlite_path=path, clock=clock)
+    restored = await second.get("key")
+    assert restored is not None
+    assert restored.final_text == "persisted"
+    assert second.stats.disk_hits == 1
+
+    clock.now += 301
+    third = ResponseCache(sqlite_path=path, clock=clock)
+    assert await third.get("key") is None
+    second.close()
+    third.close()
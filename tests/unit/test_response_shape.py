@@ -1,6 +1,12 @@
 from __future__ import annotations
 
-from adapter_critic.response_shape import has_valid_tool_calls, infer_finish_reason, normalize_tool_calls
+from adapter_critic.response_shape import (
+    candidate_rejection_reason,
+    has_valid_tool_calls,
+    infer_finish_reason,
+    normalize_tool_calls,
+    requires_tool_call,
+)
 
 
 def test_normalize_tool_calls_empty_list_to_none() -> None:
@@ -88,3 +94,15 @@ def test_infer_finish_reason_uses_message_fields() -> None:
     )
     assert infer_finish_reason("tool_calls", tool_calls=[]) == "stop"
     assert infer_finish_reason("length", tool_calls=None) == "length"
+
+
+def test_candidate_rejection_reason_requires_content_or_call() -> None:
+    assert candidate_rejection_reason(content="", tool_calls=None, require_call=False) == (
+        "assistant message has empty content and no calls"
+    )
+    assert candidate_rejection_reason(content="answer", tool_calls=None, require_call=True) == (
+        "request requires a tool call"
+    )
+    assert candidate_rejection_reason(content="answer", tool_calls=None, require_call=False) is None
+    assert requires_tool_call({"tool_choice": {"type": "function", "function": {"name": "lookup"}}})
+    assert not requires_tool_call({"tool_choice": "auto"})
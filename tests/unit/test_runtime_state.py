@@ -6,9 +6,10 @@ from adapter_critic.config import AppConfig
 from adapter_critic.contracts import ChatMessage
 from adapter_critic.runtime import build_runtime_state
 from adapter_critic.upstream import UpstreamResult
+from tests.helpers import StreamFromCompleteMixin
 
 
-class DummyGateway:
+class DummyGateway(StreamFromCompleteMixin):
     async def complete(
         self,
         *,
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from adapter_critic.config import StageTarget
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.metrics import AppMetrics
+from adapter_critic.stage_cache import StageCache, stage_cache_key
+from adapter_critic.upstream import TokenUsage, UpstreamResult
+
+TARGET = StageTarget(model="adapter-model", base_url="https://adapter.example")
+
+
+def test_stage_cache_key_depends_on_target_messages_and_options() -> None:
+    messages = [ChatMessage(role="user", content="review")]
+    key = stage_cache_key(TARGET, messages, {"response_format": {"type": "json_object"}})
+
+    assert key == stage_cache_key(TARGET, list(messages), {"response_format": {"type": "json_object"}})
+    assert key != stage_cache_key(TARGET, messages)
+    assert key != stage_cache_key(TARGET.model_copy(update={"model": "other"}), messages)
+    assert key != stage_cache_key(TARGET, [ChatMessage(role="user", content="other")])
+
+
+def test_stage_cache_hit_reports_zero_cached_usage_and_evicts_lru() -> None:
+    metrics = AppMetrics()
+    cache = StageCache(max_entries=1, metrics=metrics)
+    result = UpstreamResult(content='{"decision":"lgtm"}', usage=TokenUsage(prompt_tokens=5, total_tokens=5))
+
+    cache.put("first", result)
+    hit = cache.get("first", stage="adapter")
+    assert hit is not None
+    assert hit.content == result.content
+    assert hit.usage.model_dump() == {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cached": True}
+
+    cache.put("second", result)
+    assert cache.get("first", stage="adapter") is None
+    assert len(cache) == 1
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.stores, cache.stats.evictions) == (1, 1, 2, 1)
+    assert metrics.stage_cache_lookups.value(("adapter", "hit")) == 1
+    assert metrics.stage_cache_lookups.value(("adapter", "miss")) == 1
+    assert metrics.stage_cache_lookups.value(("critic", "hit")) == 0
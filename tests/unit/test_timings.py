@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from adapter_critic.timings import RequestTimings, measure
+
+
+def test_request_timings_accumulate_stage_calls_and_overhead() -> None:
+    timings = RequestTimings(started=10.0, received_at=9.5)
+    timings.record_stage("adapter", 0.01)
+    timings.record_stage("adapter", 0.02)
+    timings.add_overhead("prompt_rendering", 0.001)
+    timings.add_overhead("prompt_rendering", 0.002)
+
+    payload = timings.as_payload()
+
+    assert payload["stages"] == {"adapter": [10.0, 20.0]}
+    assert payload["overhead"] == {"prompt_rendering": 3.0}
+    assert payload["queueing_ms"] == 500.0
+
+
+def test_measure_is_a_no_op_without_timings() -> None:
+    with measure(None, "parse"):
+        pass
+
+    timings = RequestTimings()
+    with measure(timings, "parse"):
+        pass
+
+    assert set(timings.as_payload()["overhead"].keys()) == {"parse"}
+    assert timings.as_payload()["queueing_ms"] is None
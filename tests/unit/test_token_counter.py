@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import base64
+from pathlib import Path
+
+import pytest
+
+from adapter_critic.config import TokenizerConfig
+from adapter_critic.contracts import ChatMessage
+from adapter_critic.token_counter import MESSAGE_OVERHEAD_TOKENS, ApproxTokenCounter, Tokenizer
+
+
+def _write_bpe_file(path: Path) -> str:
+    tokens = [bytes([value]) for value in range(256)] + [b"he", b"ll", b"hell", b"hello"]
+    path.write_text("".join(f"{base64.b64encode(token).decode()} {rank}\n" for rank, token in enumerate(tokens)))
+    return str(path)
+
+
+def test_approx_counter_rounds_up_and_truncates_on_character_budget() -> None:
+    counter = ApproxTokenCounter()
+
+    assert counter.count_text("") == 0
+    assert counter.count_text("abcde") == 2
+    assert counter.truncate_text("abcdefghij", 2) == "abcdefgh"
+
+
+def test_tokenizer_caches_per_message_counts_in_bounded_lru() -> None:
+    tokenizer = Tokenizer(cache_entries=2)
+    first = ChatMessage(role="user", content="a" * 40)
+    call = {"id": "call_1", "type": "function", "function": {"name": "read", "arguments": "{}"}}
+    second = ChatMessage.model_validate({"role": "assistant", "content": "", "tool_calls": [call]})
+
+    assert tokenizer.count_message(first) == MESSAGE_OVERHEAD_TOKENS + 10
+    assert tokenizer.count_message(first.model_copy()) == MESSAGE_OVERHEAD_TOKENS + 10
+    assert tokenizer.count_message(second) > MESSAGE_OVERHEAD_TOKENS
+    assert (tokenizer.stats.hits, tokenizer.stats.misses) == (1, 2)
+
+    tokenizer.count_message(ChatMessage(role="user", content="third"))
+    tokenizer.count_message(first)
+    assert len(tokenizer) == 2
+    assert tokenizer.stats.misses == 4
+
+
+def test_prompt_count_includes_tool_definitions() -> None:
+    tokenizer = Tokenizer()
+    messages = [ChatMessage(role="user", content="hi")]
+    tools = [{"type": "function", "function": {"name": "lookup", "parameters": {"type": "object"}}}]
+
+    assert tokenizer.count_prompt(messages, {"tools": tools}) > tokenizer.count_prompt(messages, {})
+
+
+def test_tokenizer_without_bpe_file_falls_back_to_character_estimate() -> None:
+    tokenizer = Tokenizer.from_config(TokenizerConfig(cache_entries=64))
+
+    assert isinstance(tokenizer.counter, ApproxTokenCounter)
+    assert not tokenizer.exact
+    assert tokenizer.count_message(ChatMessage(role="user", content="abcd")) == MESSAGE_OVERHEAD_TOKENS + 1
+    assert len(tokenizer) == 0
+
+
+def test_tokenizer_loads_local_bpe_ranks(tmp_path: Path) -> None:
+    pytest.importorskip("tiktoken")
+    tokenizer = Tokenizer.from_config(TokenizerConfig(bpe_file=_write_bpe_file(tmp_path / "tiny.tiktoken")))
+
+    assert tokenizer.exact
+    assert tokenizer.count_text("hello") == 1
+    assert tokenizer.count_text("hello world") == 7
+    assert tokenizer.truncate_text("hello world", 3) == "hello w"
+    assert tokenizer.truncate_text("hello", 3) == "hello"
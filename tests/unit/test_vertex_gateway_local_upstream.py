@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+import json
 import socket
 import threading
 import time
-from collections.abc import Callable, Iterator
-from typing import Any
+from collections.abc import AsyncIterator, Callable, Iterator
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
 
 import pytest
 import uvicorn
 from anthropic.lib.vertex._client import AsyncAnthropicVertex as SDKAsyncAnthropicVertex
 from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 
+from adapter_critic import vertex_gateway as vertex_gateway_module
 from adapter_critic.contracts import ChatMessage
+from adapter_critic.streaming import DeltaAccumulator
 from adapter_critic.vertex_gateway import VertexAICompatibleHttpGateway
 
 
@@ -104,6 +109,7 @@ async def test_vertex_gateway_local_text_response_mapping(
         ],
         request_options={"max_tokens": 32, "temperature": 0},
     )
+    await gateway.aclose()
 
     assert capture["path"] == (
         "v1/projects/test-project/locations/us-east5/publishers/anthropic/models/claude-sonnet-4-5@20250929:rawPredict"
@@ -161,6 +167,7 @@ async def test_vertex_gateway_local_tool_use_mapping(
         messages=[ChatMessage(role="user", content="cancel reservation EHGLP3")],
         request_options={"max_tokens": 64},
     )
+    await gateway.aclose()
 
     payload = capture["payload"]
     assert payload["messages"] == [{"role": "user", "content": "cancel reservation EHGLP3"}]
@@ -200,6 +207,7 @@ async def test_vertex_gateway_accepts_empty_content_list_end_turn(
         messages=[ChatMessage(role="user", content="hello")],
         request_options={"max_tokens": 32},
     )
+    await gateway.aclose()
 
     assert capture["path"] == (
         "v1/projects/test-project/locations/us-east5/publishers/anthropic/models/claude-sonnet-4-5@20250929:rawPredict"
@@ -207,3 +215,144 @@ async def test_vertex_gateway_accepts_empty_content_list_end_turn(
     assert result.content == ""
     assert result.finish_reason == "stop"
     assert result.tool_calls is None
+
+
+class _FakeCredentials:
+    def __init__(self, *, token: str, expires_in_seconds: float) -> None:
+        self.token = token
+        self.expiry = datetime.now(UTC).replace(tzinfo=None) + timedelta(seconds=expires_in_seconds)
+        self.refresh_count = 0
+
+
+@pytest.mark.anyio
+async def test_vertex_gateway_reuses_client_and_refreshes_expiring_credentials(
+    fake_vertex_auth_token: None,
+    upstream_server_factory: Callable[[dict[str, Any], dict[str, Any]], str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    del fake_vertex_auth_token
+    capture: dict[str, Any] = {}
+    base_url = upstream_server_factory(
+        {
+            "id": "msg_reuse",
+            "type": "message",
+            "role": "assistant",
+            "model": "claude-sonnet-4-5@20250929",
+            "content": [{"type": "text", "text": "pong"}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": 5, "output_tokens": 1},
+        },
+        capture,
+    )
+
+    created_clients: list[SDKAsyncAnthropicVertex] = []
+
+    class _CountingVertexClient(SDKAsyncAnthropicVertex):
+        def __init__(self, **kwargs: Any) -> None:
+            super().__init__(**kwargs)
+            created_clients.append(self)
+
+    def _fake_refresh(credentials: Any) -> None:
+        credentials.refresh_count += 1
+        credentials.token = "refreshed-token"
+        credentials.expiry = datetime.now(UTC).replace(tzinfo=None) + timedelta(hours=1)
+
+    monkeypatch.setattr(vertex_gateway_module, "AsyncAnthropicVertex", _CountingVertexClient)
+    monkeypatch.setattr(vertex_gateway_module, "_refresh_google_credentials", _fake_refresh)
+
+    gateway = VertexAICompatibleHttpGateway(timeout_seconds=5.0, credential_refresh_margin_seconds=300.0)
+    for _ in range(2):
+        result = await gateway.complete(
+            model="claude-sonnet-4-5@20250929",
+            base_url=f"{base_url}/v1/projects/test-project/locations/us-east5",
+            messages=[ChatMessage(role="user", content="ping")],
+            request_options={"max_tokens": 8},
+        )
+        assert result.content == "pong"
+
+    assert len(created_clients) == 1
+
+    expiring = _FakeCredentials(token="old-token", expires_in_seconds=60)
+    created_clients[0].credentials = cast(Any, expiring)
+    assert await gateway.refresh_credentials() == 1
+    assert expiring.refresh_count == 1
+    assert expiring.token == "refreshed-token"
+    assert await gateway.refresh_credentials() == 0
+
+    await gateway.aclose()
+    assert created_clients[0].is_closed()
+
+
+@pytest.mark.anyio
+async def test_vertex_gateway_local_stream_maps_text_and_tool_use_events(fake_vertex_auth_token: None) -> None:
+    del fake_vertex_auth_token
+    events: list[dict[str, Any]] = [
+        {
+            "type": "message_start",
+            "message": {
+                "id": "msg_stream",
+                "type": "message",
+                "role": "assistant",
+                "model": "claude-sonnet-4-5@20250929",
+                "content": [],
+                "stop_reason": None,
+                "usage": {"input_tokens": 12, "output_tokens": 0},
+            },
+        },
+        {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+        {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "checking"}},
+        {"type": "content_block_stop", "index": 0},
+        {
+            "type": "content_block_start",
+            "index": 1,
+            "content_block": {"type": "tool_use", "id": "toolu_1", "name": "lookup", "input": {}},
+        },
+        {"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": '{"id":'}},
+        {"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": "7}"}},
+        {"type": "content_block_stop", "index": 1},
+        {"type": "message_delta", "delta": {"stop_reason": "tool_use"}, "usage": {"output_tokens": 5}},
+        {"type": "message_stop"},
+    ]
+
+    app = FastAPI()
+
+    @app.post("/{path:path}")
+    async def stream_raw_predict(path: str) -> StreamingResponse:
+        assert path.endswith(":streamRawPredict")
+
+        async def body() -> AsyncIterator[str]:
+            for event in events:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    server, thread, base_url = _start_server(app)
+    gateway = VertexAICompatibleHttpGateway(timeout_seconds=5.0)
+    try:
+        deltas = [
+            delta
+            async for delta in gateway.stream(
+                model="claude-sonnet-4-5@20250929",
+                base_url=f"{base_url}/v1/projects/test-project/locations/us-east5",
+                messages=[ChatMessage(role="user", content="look up 7")],
+                request_options={"max_tokens": 32},
+            )
+        ]
+    finally:
+        await gateway.aclose()
+        server.should_exit = True
+        thread.join(timeout=3)
+
+    accumulator = DeltaAccumulator()
+    for delta in deltas:
+        accumulator.add(delta)
+    result = accumulator.result()
+
+    assert result.content == "checking"
+    assert result.finish_reason == "tool_calls"
+    assert result.tool_calls == [
+        {"id": "toolu_1", "type": "function", "function": {"name": "lookup", "arguments": '{"id":7}'}}
+    ]
+    assert result.usage.prompt_tokens == 12
+    assert result.usage.completion_tokens == 5
+    assert result.usage.total_tokens == 17